@@ -228,6 +228,10 @@ class ViewBuilder(object):
 
     _collection_name = None
 
+    # Next links carry a cursor of the sort key values of the last item
+    # instead of its id, see utils.encode_page_cursor
+    _cursor_pagination = False
+
     def _get_links(self, request, identifier):
         return [{"rel": "self",
                  "href": self._get_href_link(request, identifier), },
@@ -238,6 +242,9 @@ class ViewBuilder(object):
         """Return href string with proper limit and marker params."""
         params = request.params.copy()
         params["marker"] = identifier
+        if self._cursor_pagination:
+            # The cursor already points past the skipped items
+            params.pop("offset", None)
         prefix = self._update_link_prefix(get_request_url(request),
                                           CONF.osapi_karbor_base_URL)
         url = os.path.join(prefix,
@@ -301,7 +308,9 @@ class ViewBuilder(object):
                             collection_name):
         links = []
         last_item = items[-1]
-        if id_key in last_item:
+        if self._cursor_pagination:
+            last_item_id = self._get_page_cursor(request, last_item)
+        elif id_key in last_item:
             last_item_id = last_item[id_key]
         else:
             last_item_id = last_item["id"]
@@ -312,6 +321,15 @@ class ViewBuilder(object):
         })
         return links
 
+    def _get_page_cursor(self, request, item):
+        """Return the cursor of the page following item."""
+        sort_keys, __ = get_sort_params(request.params.copy())
+        for key in ('created_at', 'id'):
+            if key not in sort_keys:
+                sort_keys.append(key)
+        return utils.encode_page_cursor(
+            {key: item.get(key) for key in sort_keys})
+
     def _update_link_prefix(self, orig_url, prefix):
         if not prefix:
             return orig_url
@@ -49,6 +49,7 @@ class OperationLogViewBuilder(common.ViewBuilder):
     """Model a server API response as a python dictionary."""
 
     _collection_name = "operation_logs"
+    _cursor_pagination = True
 
     def detail(self, request, operation_log):
         """Detailed view of a single operation_log."""
@@ -112,6 +113,7 @@ class OperationLogsController(wsgi.Controller):
     def show(self, req, id):
         """Return data about the given OperationLogs."""
         context = req.environ['karbor.context']
+        context.read_replica = True
 
         LOG.info("Show operation log with id: %s", id, context=context)
 
@@ -132,6 +134,7 @@ class OperationLogsController(wsgi.Controller):
 
         """
         context = req.environ['karbor.context']
+        context.read_replica = True
 
         LOG.info("Show operation log list", context=context)
 
@@ -130,6 +130,7 @@ class PlansController(wsgi.Controller):
     def show(self, req, id):
         """Return data about the given plan."""
         context = req.environ['karbor.context']
+        context.read_replica = True
 
         LOG.info("Show plan with id: %s", id, context=context)
 
@@ -163,21 +164,16 @@ class PlansController(wsgi.Controller):
             raise exc.HTTPServerError(reason=msg)
 
         try:
-            reserve_opts = {'plans': -1}
-            reservations = QUOTAS.reserve(context,
-                                          project_id=project_id,
-                                          **reserve_opts)
+            QUOTAS.allocate(context, project_id=project_id, plans=-1)
         except Exception:
             LOG.exception("Failed to update usages deleting plan.")
-        else:
-            QUOTAS.commit(context, reservations,
-                          project_id=project_id)
         LOG.info("Delete plan request issued successfully.",
                  resource={'id': plan.id})
 
     def index(self, req):
         """Returns a list of plans, transformed through view builder."""
         context = req.environ['karbor.context']
+        context.read_replica = True
 
         LOG.info("Show plan list", context=context)
 
@@ -269,8 +265,7 @@ class PlansController(wsgi.Controller):
         }
 
         try:
-            reserve_opts = {'plans': 1}
-            reservations = QUOTAS.reserve(context, **reserve_opts)
+            QUOTAS.allocate(context, plans=1)
         except exception.OverQuota as e:
             quota.process_reserve_over_quota(
                 context, e,
@@ -278,14 +273,16 @@ class PlansController(wsgi.Controller):
         try:
             plan = objects.Plan(context=context, **plan_properties)
             plan.create()
-            QUOTAS.commit(context, reservations)
         except Exception:
             with excutils.save_and_reraise_exception():
                 try:
                     if plan and 'id' in plan:
                         plan.destroy()
                 finally:
-                    QUOTAS.rollback(context, reservations)
+                    try:
+                        QUOTAS.allocate(context, plans=-1)
+                    except Exception:
+                        LOG.exception("Failed to release the plan quota.")
 
         retval = self._view_builder.detail(req, plan)
 
@@ -14,7 +14,6 @@
 
 from oslo_config import cfg
 from oslo_log import log as logging
-from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 
 from webob import exc
@@ -377,20 +376,8 @@ class ProvidersController(wsgi.Controller):
                 'created_by': constants.MANUAL
             }
 
-        checkpoint_extra_info = None
-        if extra_info is not None:
-            checkpoint_extra_info = jsonutils.dumps(extra_info)
-        checkpoint_properties = {
-            'project_id': context.project_id,
-            'status': constants.CHECKPOINT_STATUS_PROTECTING,
-            'provider_id': provider_id,
-            "protection_plan": {
-                "id": plan.get("id"),
-                "name": plan.get("name"),
-                "resources": plan.get("resources"),
-            },
-            "extra_info": checkpoint_extra_info
-        }
+        checkpoint_properties = protection_api.get_checkpoint_properties(
+            context, plan, extra_info)
         try:
             checkpoint_id = self.protection_api.protect(context, plan,
                                                         checkpoint_properties)
@@ -111,6 +111,7 @@ class QuotaClassesController(wsgi.Controller):
                         context, quota_class_name, key, value)
                 except exception.AdminRequired:
                     raise exc.HTTPForbidden()
+        QUOTAS.invalidate_limits()
 
         LOG.info("Update quota class successfully.",
                  resource={'id': quota_class_name})
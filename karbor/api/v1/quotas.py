@@ -154,6 +154,7 @@ class QuotasController(wsgi.Controller):
                     db.quota_create(context, project_id, key, value)
                 except exception.AdminRequired:
                     raise exc.HTTPForbidden()
+        QUOTAS.invalidate_limits(project_id)
 
         LOG.info("Update quotas successfully.",
                  resource={'id': project_id})
@@ -51,6 +51,7 @@ class RestoreViewBuilder(common.ViewBuilder):
     """Model a server API response as a python dictionary."""
 
     _collection_name = "restores"
+    _cursor_pagination = True
 
     def detail(self, request, restore):
         """Detailed view of a single restore."""
@@ -114,6 +115,7 @@ class RestoresController(wsgi.Controller):
     def show(self, req, id):
         """Return data about the given restore."""
         context = req.environ['karbor.context']
+        context.read_replica = True
 
         LOG.info("Show restore with id: %s", id, context=context)
 
@@ -133,6 +135,7 @@ class RestoresController(wsgi.Controller):
     def index(self, req):
         """Returns a list of restores, transformed through view builder."""
         context = req.environ['karbor.context']
+        context.read_replica = True
 
         LOG.info("Show restore list", context=context)
 
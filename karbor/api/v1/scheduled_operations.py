@@ -162,6 +162,7 @@ class ScheduledOperationController(wsgi.Controller):
         LOG.debug('Get scheduled operation(%s) start', id)
 
         context = req.environ['karbor.context']
+        context.read_replica = True
         operation = self._get_operation_by_id(context, id)
         context.can(scheduled_operation_policy.GET_POLICY, operation)
 
@@ -171,6 +172,7 @@ class ScheduledOperationController(wsgi.Controller):
         """Returns a list of operations, transformed through view builder."""
 
         context = req.environ['karbor.context']
+        context.read_replica = True
         context.can(scheduled_operation_policy.GET_ALL_POLICY)
 
         params = req.params.copy()
@@ -189,6 +189,7 @@ class TriggersController(wsgi.Controller):
         LOG.debug('Get trigger(%s) start', id)
 
         context = req.environ['karbor.context']
+        context.read_replica = True
         trigger = self._get_trigger_by_id(context, id)
 
         context.can(trigger_policy.GET_POLICY, trigger)
@@ -198,6 +199,7 @@ class TriggersController(wsgi.Controller):
         """Returns a list of triggers, transformed through view builder."""
 
         context = req.environ['karbor.context']
+        context.read_replica = True
         context.can(trigger_policy.GET_ALL_POLICY)
 
         params = req.params.copy()
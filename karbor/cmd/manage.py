@@ -78,21 +78,73 @@ class DbCommands(object):
 
     @args('age_in_days', type=int,
           help='Purge deleted rows older than age in days')
-    def purge(self, age_in_days):
+    @args('--batch_size', type=int, default=None,
+          help='Number of rows deleted per transaction, defaults to the '
+               'purge_batch_size option')
+    @args('--dry_run', action='store_true', default=False,
+          help='Only print the number of rows which would be purged')
+    @args('--archive', metavar='<path>', default=None,
+          help='Append the purged rows to this gzip file, one JSON '
+               'document per line, before deleting them. A row may be '
+               'appended twice when its batch failed, deduplicate the '
+               'rows on their table and id')
+    def purge(self, age_in_days, batch_size=None, dry_run=False,
+              archive=None):
         """Purge deleted rows older than a given age from karbor tables."""
         age_in_days = int(age_in_days)
         if age_in_days <= 0:
             print(_("Must supply a positive, non-zero value for age"))
             sys.exit(1)
+        if batch_size is not None and batch_size <= 0:
+            print(_("Must supply a positive, non-zero value for batch size"))
+            sys.exit(1)
         ctxt = context.get_admin_context()
 
         try:
-            db.purge_deleted_rows(ctxt, age_in_days)
+            purged = db.purge_deleted_rows(ctxt, age_in_days,
+                                           batch_size=batch_size,
+                                           dry_run=dry_run,
+                                           archive_path=archive)
         except Exception as e:
             print(_("Purge command failed, check karbor-manage "
                     "logs for more details. %s") % e)
             sys.exit(1)
 
+        if dry_run:
+            msg = _("%(table)s: %(rows)d rows would be purged")
+        else:
+            msg = _("%(table)s: %(rows)d rows purged")
+        for table, rows in sorted(purged.items()):
+            print(msg % {'table': table, 'rows': rows})
+
+    def rebuild_name_ngrams(self):
+        """Rebuild the trigram index of the names for the ngram search."""
+        ctxt = context.get_admin_context()
+        rebuilt = db.name_ngrams_rebuild(ctxt)
+        for table, rows in sorted(rebuilt.items()):
+            print(_("%(table)s: %(rows)d names indexed") %
+                  {'table': table, 'rows': rows})
+
+    def check_indexes(self):
+        """Report the missing and the unused indexes of the database."""
+        ctxt = context.get_admin_context()
+        report = db.check_indexes(ctxt)
+
+        for table, index, columns in report['missing']:
+            print(_("Missing index %(index)s on %(table)s(%(columns)s)") %
+                  {'index': index, 'table': table,
+                   'columns': ', '.join(columns)})
+
+        if report['unused'] is None:
+            print(_("The database does not report unused indexes"))
+        else:
+            for table, index in report['unused']:
+                print(_("Unused index %(index)s on %(table)s") %
+                      {'index': index, 'table': table})
+
+        if report['missing']:
+            sys.exit(1)
+
 
 class VersionCommands(object):
     """Class for exposing the codebase version."""
@@ -98,6 +98,10 @@ OPERATION_STATE_REGISTERED = 'registered'
 OPERATION_STATE_RUNNING = 'running'
 OPERATION_STATE_DELETED = 'deleted'
 
+# number of shards the trigger executions are spread over, must not change
+# once trigger executions exist
+TRIGGER_EXECUTION_SHARDS = 64
+
 # scheduled operation run type
 OPERATION_RUN_TYPE_EXECUTE = 'execute'
 OPERATION_RUN_TYPE_RESUME = 'resume'
@@ -40,6 +40,41 @@ CONF.import_group('keystone_authtoken',
                   'keystonemiddleware.auth_token')
 
 
+def get_token_info(access_info):
+    """Build the v3 token body of an AccessInfo from its public attributes
+
+    The body is the auth_token_info of the request contexts, from which
+    create_user_auth_plugin rebuilds the AccessInfo of the token.
+    """
+    def _isotime(value):
+        return value.isoformat() if value else None
+
+    token = {
+        'expires_at': _isotime(access_info.expires),
+        'issued_at': _isotime(access_info.issued),
+        'user': {
+            'id': access_info.user_id,
+            'name': access_info.username,
+            'domain': {'id': access_info.user_domain_id,
+                       'name': access_info.user_domain_name},
+        },
+        'roles': [{'id': role_id, 'name': role_name}
+                  for role_id, role_name in zip(access_info.role_ids or [],
+                                                access_info.role_names or [])],
+        'catalog': access_info.service_catalog.catalog,
+    }
+    if access_info.project_id:
+        token['project'] = {
+            'id': access_info.project_id,
+            'name': access_info.project_name,
+            'domain': {'id': access_info.project_domain_id,
+                       'name': access_info.project_domain_name},
+        }
+    if access_info.trust_id:
+        token['OS-TRUST:trust'] = {'id': access_info.trust_id}
+    return {'token': token}
+
+
 class KarborKeystonePlugin(object):
     """Contruct a keystone client plugin with karbor user
 
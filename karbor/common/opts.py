@@ -20,12 +20,15 @@ import karbor.common.config
 import karbor.db.api
 import karbor.exception
 import karbor.service
+import karbor.services.operationengine.engine.executors.base as executor_base  # noqa
 import karbor.services.operationengine.engine.executors.green_thread_executor as green_thread_executor  # noqa
 import karbor.services.operationengine.engine.executors.thread_pool_executor as thread_pool_executor  # noqa
 import karbor.services.operationengine.engine.triggers.timetrigger as time_trigger  # noqa
 import karbor.services.operationengine.karbor_client
 import karbor.services.operationengine.manager
 import karbor.services.operationengine.operations.base as base
+import karbor.services.operationengine.operations.retention_operation as retention_operation  # noqa
+import karbor.services.operationengine.user_trust_manager
 import karbor.services.protection.clients.cinder
 import karbor.services.protection.clients.glance
 import karbor.services.protection.clients.manila
@@ -33,7 +36,9 @@ import karbor.services.protection.clients.neutron
 import karbor.services.protection.clients.nova
 import karbor.services.protection.flows.restore
 import karbor.services.protection.flows.worker
+import karbor.services.protection.flows.workflow
 import karbor.services.protection.manager
+import karbor.services.protection.record_writer
 import karbor.wsgi.eventlet_server
 
 __all__ = ['list_opts']
@@ -43,7 +48,11 @@ _opts = [
         karbor.common.config.keystone_client_opts))),
     ('operationengine', list(itertools.chain(
         green_thread_executor.green_thread_executor_opts,
-        karbor.services.operationengine.manager.trigger_manager_opts))),
+        executor_base.dispatch_opts,
+        karbor.services.operationengine.manager.trigger_manager_opts,
+        karbor.services.operationengine.user_trust_manager.user_trust_opts,
+        base.protect_dispatch_opts,
+        retention_operation.retention_opts))),
     ('karbor_client', list(itertools.chain(
         karbor.common.config.service_client_opts))),
     ('cinder_client', list(itertools.chain(
@@ -75,7 +84,9 @@ _opts = [
         base.record_operation_log_executor_opts,
         karbor.services.protection.flows.restore.sync_status_opts,
         karbor.services.protection.flows.worker.workflow_opts,
+        karbor.services.protection.flows.workflow.persistence_opts,
         karbor.services.protection.manager.protection_manager_opts,
+        karbor.services.protection.record_writer.record_writer_opts,
         karbor.wsgi.eventlet_server.socket_opts,
         karbor.exception.exc_log_opts,
         karbor.service.service_opts)))]
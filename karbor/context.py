@@ -40,7 +40,7 @@ class RequestContext(context.RequestContext):
                  timestamp=None, request_id=None, auth_token=None,
                  overwrite=True, quota_class=None, service_catalog=None,
                  domain=None, user_domain=None, project_domain=None,
-                 auth_token_info=None):
+                 auth_token_info=None, read_replica=False):
         """Initialize RequestContext.
 
         :param read_deleted: 'no' indicates deleted records are hidden, 'yes'
@@ -49,6 +49,10 @@ class RequestContext(context.RequestContext):
 
         :param overwrite: Set to False to ensure that the greenthread local
             copy of the index is not overwritten.
+
+        :param read_replica: True lets the database reads of the request
+            run on the database.slave_connection replica, it is not sent
+            over RPC.
         """
 
         super(RequestContext, self).__init__(auth_token=auth_token,
@@ -62,6 +66,7 @@ class RequestContext(context.RequestContext):
         self.roles = roles or []
         self.project_name = project_name
         self.read_deleted = read_deleted
+        self.read_replica = read_replica
         self.remote_address = remote_address
         if not timestamp:
             timestamp = timeutils.utcnow()
@@ -40,6 +40,38 @@ db_opts = [
     cfg.BoolOpt('enable_new_services',
                 default=True,
                 help='Services to be added to the available pool on create'),
+    cfg.IntOpt('purge_batch_size',
+               default=1000,
+               min=1,
+               help='Number of deleted rows removed in each transaction '
+                    'when purging the database'),
+    cfg.FloatOpt('purge_batch_interval',
+                 default=0.1,
+                 min=0,
+                 help='Seconds to sleep between two purge batches of a '
+                      'table, leaving room for the other transactions'),
+    cfg.StrOpt('name_filter_mode',
+               default='regex',
+               choices=['regex', 'prefix', 'ngram'],
+               help='How the name filter of the plan, trigger and scheduled '
+                    'operation lists matches. "regex" matches a regular '
+                    'expression by scanning the table. "prefix" matches the '
+                    'names starting with the filter using the name index. '
+                    '"ngram" matches the names containing the filter using '
+                    'an index of their trigrams maintained on write, '
+                    'filters shorter than three characters match as '
+                    'prefixes. Run "karbor-manage db rebuild_name_ngrams" '
+                    'after switching to "ngram".'),
+    cfg.IntOpt('replica_max_staleness',
+               default=10,
+               min=0,
+               help='Seconds during which the plans, restores, operation '
+                    'logs, triggers, scheduled operations and checkpoint '
+                    'records of a project are read from the primary '
+                    'database after this process wrote some of them. The '
+                    'other reads of these resources go to the '
+                    '[database]/slave_connection replica when it is set, '
+                    'this should exceed its replication lag.'),
 ]
 
 
@@ -205,6 +237,11 @@ def trigger_execution_get_next(context):
     return IMPL.trigger_execution_get_next(context)
 
 
+def trigger_execution_get_by_trigger_ids(context, trigger_ids):
+    """Get the trigger executions of the given triggers."""
+    return IMPL.trigger_execution_get_by_trigger_ids(context, trigger_ids)
+
+
 def trigger_execution_delete(context, id, trigger_id):
     return IMPL.trigger_execution_delete(context, id, trigger_id)
 
@@ -213,6 +250,27 @@ def trigger_execution_update(context, id, current_time, new_time):
     return IMPL.trigger_execution_update(context, id, current_time, new_time)
 
 
+def trigger_execution_claim_due(context, time, limit, get_next_time,
+                                shards=None, retry_time=None):
+    """Claim up to limit trigger executions due at time.
+
+    Each claimed execution is rescheduled to get_next_time(execution), or
+    deleted when it returns None, in the same transaction. Concurrent
+    callers claim disjoint executions. When shards is given, only the
+    executions of these shards are claimed. The executions for which
+    get_next_time raises are not claimed, they are rescheduled to
+    retry_time, or deleted when it is None.
+
+    Returns a tuple of the list of (execution, next_time) tuples, where
+    execution keeps the execution time it was claimed at, and of the
+    number of due executions selected, which is below limit when no more
+    executions are due.
+    """
+    return IMPL.trigger_execution_claim_due(context, time, limit,
+                                            get_next_time, shards=shards,
+                                            retry_time=retry_time)
+
+
 ###################
 
 
@@ -334,6 +392,20 @@ def scheduled_operation_state_update(context, operation_id, values):
     return IMPL.scheduled_operation_state_update(context, operation_id, values)
 
 
+def scheduled_operation_state_update_all(context, operation_ids, values):
+    """Set the given properties on several scheduled operation states.
+
+    :param context: The security context
+    :param operation_ids: Operation_ids of the scheduled operation states
+    :param values: Dictionary containing scheduled operation state properties
+                   to be updated
+
+    :returns: The number of updated scheduled operation states
+    """
+    return IMPL.scheduled_operation_state_update_all(context, operation_ids,
+                                                     values)
+
+
 def scheduled_operation_state_delete(context, operation_id):
     """Delete a scheduled operation state from the database.
 
@@ -432,6 +504,33 @@ def scheduled_operation_log_delete_oldest(context, operation_id,
                                                       excepted_states)
 
 
+def scheduled_operation_log_delete_all_oldest(context, retained_num,
+                                              excepted_states=None,
+                                              batch_size=None):
+    """Delete the oldest logs of all the scheduled operations at once.
+
+    :param context: The security context
+    :param retained_num: The number of retained logs of each operation
+    :param excepted_states: If the state of log is in excepted_states,
+                            it will not be deleted.
+    :param batch_size: The maximum number of logs deleted in each
+                       transaction
+    :returns: The number of deleted logs
+    """
+    return IMPL.scheduled_operation_log_delete_all_oldest(
+        context, retained_num, excepted_states=excepted_states,
+        batch_size=batch_size)
+
+
+def scheduled_operation_log_delete_all_oldest_supported(context):
+    """Whether the database can delete the oldest logs of all operations.
+
+    The deletion ranks the logs with a window function, which MySQL before
+    8.0 and MariaDB before 10.2 do not support.
+    """
+    return IMPL.scheduled_operation_log_delete_all_oldest_supported(context)
+
+
 def scheduled_operation_log_get_all_by_filters_sort(
         context, filters, limit=None, marker=None,
         sort_keys=None, sort_dirs=None):
@@ -650,6 +749,25 @@ def checkpoint_record_update(context, checkpoint_record_id, values):
     return IMPL.checkpoint_record_update(context, checkpoint_record_id, values)
 
 
+def checkpoint_record_create_or_update(context, values):
+    """Create a checkpoint record, or update the one with the same id.
+
+    A deleted record is restored.
+    """
+    return IMPL.checkpoint_record_create_or_update(context, values)
+
+
+def checkpoint_records_reconcile(context, provider_id, records, before):
+    """Resynchronize the checkpoint records of a provider with its bank.
+
+    The records values are created or updated, the other records of the
+    provider created before the given time are deleted. Returns the number
+    of records updated and deleted.
+    """
+    return IMPL.checkpoint_records_reconcile(context, provider_id, records,
+                                             before)
+
+
 def checkpoint_record_destroy(context, checkpoint_record_id):
     """Destroy the checkpoint record or raise if it does not exist."""
     return IMPL.checkpoint_record_destroy(context, checkpoint_record_id)
@@ -668,13 +786,45 @@ def checkpoint_record_get_all_by_filters_sort(
         sort_keys=sort_keys, sort_dirs=sort_dirs)
 
 
-def purge_deleted_rows(context, age_in_days):
+def purge_deleted_rows(context, age_in_days, batch_size=None,
+                       dry_run=False, archive_path=None):
     """Purge deleted rows older than given age from karbor tables
 
+    The rows are deleted in batches of batch_size, each in its own
+    transaction, so an interrupted purge resumes where it stopped when run
+    again.
+
     Raises InvalidParameterValue if age_in_days is incorrect.
-    :returns: number of deleted rows
+    :param batch_size: rows per batch, defaults to CONF.purge_batch_size
+    :param dry_run: only count the rows which would be purged
+    :param archive_path: gzip file the purged rows are appended to, as one
+                         JSON document per line, before being deleted. The
+                         rows of a batch failing to commit are appended
+                         again by the next purge, the readers deduplicate
+                         the rows on their table and id.
+    :returns: dict of the number of purged rows per table
+    """
+    return IMPL.purge_deleted_rows(context, age_in_days=age_in_days,
+                                   batch_size=batch_size, dry_run=dry_run,
+                                   archive_path=archive_path)
+
+
+def name_ngrams_rebuild(context):
+    """Rebuild the trigram index of the plan, trigger and operation names
+
+    :returns: dict of the number of indexed rows per table
     """
-    return IMPL.purge_deleted_rows(context, age_in_days=age_in_days)
+    return IMPL.name_ngrams_rebuild(context)
+
+
+def check_indexes(context):
+    """Compare the indexes of the database with the ones of the models
+
+    :returns: dict with the 'missing' indexes, as (table, index, columns)
+              tuples, and the 'unused' indexes, as (table, index) tuples,
+              or None for 'unused' if the database doesn't report it
+    """
+    return IMPL.check_indexes(context)
 
 
 ####################
@@ -793,6 +943,12 @@ def quota_reserve(context, resources, quotas, deltas, expire,
                               until_refresh, max_age, project_id=project_id)
 
 
+def quota_allocate(context, quotas, deltas, project_id=None):
+    """Check quotas and apply deltas to the usages without reservations."""
+    return IMPL.quota_allocate(context, quotas, deltas,
+                               project_id=project_id)
+
+
 def reservation_commit(context, reservations, project_id=None):
     """Commit quota reservations."""
     return IMPL.reservation_commit(context, reservations,
@@ -14,6 +14,8 @@
 
 import datetime as dt
 import functools
+import gzip
+import os
 import re
 import six
 import sys
@@ -28,8 +30,10 @@ from oslo_db import options
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils as sqlalchemyutils
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
+import sqlalchemy
 from sqlalchemy import MetaData
 from sqlalchemy.orm import joinedload
 from sqlalchemy.schema import Table
@@ -37,9 +41,11 @@ from sqlalchemy.sql import expression
 from sqlalchemy.sql.expression import literal_column
 from sqlalchemy.sql import func
 
+from karbor.common import constants
 from karbor.db.sqlalchemy import models
 from karbor import exception
 from karbor.i18n import _
+from karbor import utils
 
 
 CONF = cfg.CONF
@@ -50,6 +56,19 @@ options.set_defaults(CONF, connection='sqlite:///$state_path/karbor.sqlite')
 _LOCK = threading.Lock()
 _FACADE = None
 _GET_METHODS = {}
+# Keeps the IN lists of the plan resource deletes under the bound
+# parameters limit of the backends
+_RESOURCE_DELETE_CHUNK = 500
+# Checkpoint records written or deleted in each transaction of their
+# reconciliation with the banks
+_CHECKPOINT_RECORD_SYNC_CHUNK = 500
+_NAME_NGRAM_SIZE = 3
+_NAME_NGRAM_INSERT_BATCH = 10000
+# project_id -> time of the last write of this process, None tracks the
+# writes of all the projects
+_LAST_WRITES = {}
+# time at which the expired entries of _LAST_WRITES were last dropped
+_LAST_WRITES_PRUNED = 0
 
 
 def _create_facade_lazily():
@@ -72,7 +91,84 @@ def get_engine():
 
 def get_session(**kwargs):
     facade = _create_facade_lazily()
-    return facade.get_session(**kwargs)
+    session = facade.get_session(**kwargs)
+    if CONF.database.slave_connection and not kwargs.get('use_slave'):
+        sqlalchemy.event.listen(session, 'after_flush', _record_writes)
+    return session
+
+
+def _record_write(project_id):
+    """Record a write of the rows of a project by this process
+
+    The flushes of the sessions are recorded by _record_writes, the
+    functions writing with Query.update(), Query.delete() or the bulk
+    insertions record the projects they wrote themselves.
+    """
+    if project_id and CONF.database.slave_connection:
+        now = time.time()
+        _prune_writes(now)
+        _LAST_WRITES[project_id] = now
+        _LAST_WRITES[None] = now
+
+
+def _prune_writes(now):
+    """Drop the writes older than CONF.replica_max_staleness
+
+    Such writes no longer keep the reads on the primary database, dropping
+    them at most once per staleness period bounds _LAST_WRITES to the
+    projects written recently.
+    """
+    global _LAST_WRITES_PRUNED
+    if now - _LAST_WRITES_PRUNED < CONF.replica_max_staleness:
+        return
+    _LAST_WRITES_PRUNED = now
+    for project_id, last_write in list(_LAST_WRITES.items()):
+        if now - last_write >= CONF.replica_max_staleness:
+            _LAST_WRITES.pop(project_id, None)
+
+
+def _record_writes(session, flush_context):
+    for obj in set(session.new) | set(session.dirty) | set(session.deleted):
+        _record_write(getattr(obj, 'project_id', None))
+
+
+def _use_replica(context, project_id=None):
+    """Whether a read only query may run on the slave_connection replica
+
+    Only the requests which set context.read_replica, the list and show
+    API calls, read from the replica: the other callers may read the rows
+    they are about to write. The rows of a project are read from the
+    primary database for CONF.replica_max_staleness seconds after this
+    process wrote some of them, so that the replication lag does not hide
+    recent writes. Queries across all the projects wait for the writes of
+    any project.
+    """
+    if (not CONF.database.slave_connection or
+            not getattr(context, 'read_replica', False)):
+        return False
+    if project_id is None and not context.is_admin:
+        project_id = context.project_id
+    last_write = _LAST_WRITES.get(project_id)
+    return (last_write is None or
+            time.time() - last_write >= CONF.replica_max_staleness)
+
+
+def _get_read_session(context, project_id=None):
+    return get_session(use_slave=_use_replica(context, project_id))
+
+
+def _replica_get(get_func, context, *args, **kwargs):
+    """Run a get on the replica, then on the primary if it found nothing
+
+    A row created by another process may not be replicated yet.
+    """
+    if not _use_replica(context):
+        return get_func(context, *args, **kwargs)
+    try:
+        return get_func(context, *args,
+                        session=get_session(use_slave=True), **kwargs)
+    except exception.NotFound:
+        return get_func(context, *args, **kwargs)
 
 
 def dispose_engine():
@@ -384,7 +480,62 @@ def get_by_id(context, model, id, *args, **kwargs):
 
 
 def trigger_get(context, id):
-    return _trigger_get(context, id)
+    return _replica_get(_trigger_get, context, id)
+
+
+def _get_name_ngrams(name):
+    name = (name or u'').lower()
+    return set(name[i:i + _NAME_NGRAM_SIZE]
+               for i in range(len(name) - _NAME_NGRAM_SIZE + 1))
+
+
+def _name_ngram_mappings(table_name, row_id, name):
+    return [{'table_name': table_name, 'row_id': row_id, 'gram': gram}
+            for gram in _get_name_ngrams(name)]
+
+
+def _name_ngrams_update(session, table_name, row_id, name=None):
+    """Replace the trigrams indexed for the name of a row.
+
+    Only maintained in the ngram name filter mode, a name of None removes
+    the trigrams of a deleted row.
+    """
+    if CONF.name_filter_mode != 'ngram':
+        return
+    with session.begin(subtransactions=True):
+        session.query(models.NameNgram).filter_by(
+            table_name=table_name, row_id=row_id
+        ).delete(synchronize_session=False)
+        mappings = _name_ngram_mappings(table_name, row_id, name)
+        if mappings:
+            session.bulk_insert_mappings(models.NameNgram, mappings)
+
+
+@require_admin_context
+def name_ngrams_rebuild(context):
+    session = get_session()
+    rebuilt = {}
+    for model in (models.Plan, models.Trigger, models.ScheduledOperation):
+        table_name = model.__tablename__
+        rebuilt[table_name] = 0
+        with session.begin():
+            session.query(models.NameNgram).filter_by(
+                table_name=table_name).delete(synchronize_session=False)
+            mappings = []
+            query = model_query(context, model.id, model.name,
+                                session=session, read_deleted='no')
+            for row_id, name in query:
+                mappings.extend(_name_ngram_mappings(table_name, row_id,
+                                                     name))
+                rebuilt[table_name] += 1
+                if len(mappings) >= _NAME_NGRAM_INSERT_BATCH:
+                    session.bulk_insert_mappings(models.NameNgram, mappings)
+                    mappings = []
+            if mappings:
+                session.bulk_insert_mappings(models.NameNgram, mappings)
+        LOG.info("Indexed the names of %(rows)d rows from table=%(table)s",
+                 {'rows': rebuilt[table_name], 'table': table_name})
+    return rebuilt
 
 
 def _trigger_get(context, id, session=None):
@@ -404,7 +555,11 @@ def trigger_create(context, values):
 
     trigger_ref = models.Trigger()
     trigger_ref.update(values)
-    trigger_ref.save(get_session())
+    session = get_session()
+    with session.begin():
+        trigger_ref.save(session)
+        _name_ngrams_update(session, 'triggers', trigger_ref.id,
+                            trigger_ref.name)
     return trigger_ref
 
 
@@ -417,6 +572,8 @@ def trigger_update(context, id, values):
         trigger_ref = _trigger_get(context, id, session=session)
         trigger_ref.update(values)
         trigger_ref.save(session)
+        if 'name' in values:
+            _name_ngrams_update(session, 'triggers', id, trigger_ref.name)
     return trigger_ref
 
 
@@ -427,6 +584,7 @@ def trigger_delete(context, id):
     with session.begin():
         trigger_ref = _trigger_get(context, id, session=session)
         trigger_ref.delete(session=session)
+        _name_ngrams_update(session, 'triggers', id)
 
 
 def _trigger_list_query(context, session, **kwargs):
@@ -447,7 +605,7 @@ def _trigger_list_process_filters(query, filters):
 
 def trigger_get_all_by_filters_sort(context, filters, limit=None, marker=None,
                                     sort_keys=None, sort_dirs=None):
-    session = get_session()
+    session = _get_read_session(context, (filters or {}).get('project_id'))
     with session.begin():
         query = _generate_paginate_query(context, session, marker, limit,
                                          sort_keys, sort_dirs, filters,
@@ -510,6 +668,8 @@ def trigger_execution_create(context, trigger_id, time):
         'id': uuidutils.generate_uuid(),
         'trigger_id': trigger_id,
         'execution_time': time,
+        'shard': utils.get_shard(trigger_id,
+                                 constants.TRIGGER_EXECUTION_SHARDS),
     })
     trigger_ex_ref.save(get_session())
     return trigger_ex_ref
@@ -539,6 +699,123 @@ def trigger_execution_delete(context, id, trigger_id):
         return deleted == 1
 
 
+def trigger_execution_claim_due(context, time, limit, get_next_time,
+                                shards=None, retry_time=None):
+    session = get_session()
+    claimed = []
+    selected = []
+    try:
+        with session.begin():
+            query = model_query(
+                context, models.TriggerExecution, session=session
+            ).filter(
+                models.TriggerExecution.execution_time <= time
+            )
+            if shards is not None:
+                query = query.filter(
+                    models.TriggerExecution.shard.in_(shards))
+            query = query.order_by(
+                models.TriggerExecution.execution_time
+            ).limit(limit)
+
+            # Without SKIP LOCKED, claim each execution with a
+            # compare-and-swap instead.
+            skip_locked = _supports_skip_locked(session)
+            if skip_locked:
+                query = query.with_for_update(skip_locked=True)
+            selected = query.all()
+            executions = []
+            # Moved to retry_time, so that they are not selected first by
+            # every claim and do not hold back the other executions
+            failed = []
+            for execution in selected:
+                try:
+                    next_time = get_next_time(execution)
+                except Exception:
+                    LOG.exception("Unable to compute the next time of "
+                                  "trigger execution %(id)s, retrying it "
+                                  "at %(retry_time)s",
+                                  {'id': execution.id,
+                                   'retry_time': retry_time})
+                    failed.append((execution, retry_time))
+                    continue
+                executions.append((execution, next_time))
+
+            if skip_locked:
+                _trigger_executions_reschedule(context, session,
+                                               executions + failed)
+                claimed = executions
+            else:
+                claimed = [
+                    (execution, next_time)
+                    for execution, next_time in executions
+                    if _trigger_execution_swap(context, session, execution,
+                                               next_time)]
+                for execution, next_time in failed:
+                    _trigger_execution_swap(context, session, execution,
+                                            next_time)
+    except Exception:
+        LOG.exception("Unable to claim due trigger executions")
+        raise
+    return claimed, len(selected)
+
+
+def _supports_skip_locked(session):
+    dialect = session.bind.dialect
+    version = tuple(dialect.server_version_info or ())
+    if dialect.name == 'postgresql':
+        return version >= (9, 5)
+    if dialect.name == 'mysql':
+        mariadb, version = _mysql_server_version(version)
+        return version >= ((10, 6) if mariadb else (8, 0, 1))
+    return False
+
+
+def _mysql_server_version(version):
+    """Split a MySQL dialect server version into (MariaDB, numbers)"""
+    if 'MariaDB' not in version:
+        return False, version
+    numbers = [part for part in version if isinstance(part, int)]
+    # Older clients see a MariaDB version behind a 5.5.5- prefix
+    if numbers[:3] == [5, 5, 5]:
+        numbers = numbers[3:]
+    return True, tuple(numbers)
+
+
+def _trigger_executions_reschedule(context, session, executions):
+    next_times = {execution.id: next_time
+                  for execution, next_time in executions if next_time}
+    deleted_ids = [execution.id
+                   for execution, next_time in executions if not next_time]
+    if next_times:
+        model_query(
+            context, models.TriggerExecution, session=session
+        ).filter(
+            models.TriggerExecution.id.in_(list(next_times))
+        ).update({
+            "execution_time": expression.case(
+                next_times, value=models.TriggerExecution.id)
+        }, synchronize_session=False)
+    if deleted_ids:
+        model_query(
+            context, models.TriggerExecution, session=session
+        ).filter(
+            models.TriggerExecution.id.in_(deleted_ids)
+        ).delete(synchronize_session=False)
+
+
+def _trigger_execution_swap(context, session, execution, next_time):
+    query = model_query(
+        context, models.TriggerExecution, session=session
+    ).filter_by(id=execution.id, execution_time=execution.execution_time)
+    if next_time:
+        result = query.update({"execution_time": next_time},
+                              synchronize_session=False)
+    else:
+        result = query.delete(synchronize_session=False)
+    return result == 1
+
+
 def trigger_execution_get_next(context):
     session = get_session()
     try:
@@ -560,12 +837,19 @@ def trigger_execution_get_next(context):
         return result
 
 
+def trigger_execution_get_by_trigger_ids(context, trigger_ids):
+    if not trigger_ids:
+        return []
+    return model_query(context, models.TriggerExecution).filter(
+        models.TriggerExecution.trigger_id.in_(trigger_ids)).all()
+
+
 ###################
 
 
 def scheduled_operation_get(context, id, columns_to_join=[]):
-    return _scheduled_operation_get(context, id,
-                                    columns_to_join=columns_to_join)
+    return _replica_get(_scheduled_operation_get, context, id,
+                        columns_to_join=columns_to_join)
 
 
 def _scheduled_operation_get(context, id, columns_to_join=[], session=None):
@@ -588,7 +872,11 @@ def scheduled_operation_create(context, values):
 
     operation_ref = models.ScheduledOperation()
     operation_ref.update(values)
-    operation_ref.save(get_session())
+    session = get_session()
+    with session.begin():
+        operation_ref.save(session)
+        _name_ngrams_update(session, 'scheduled_operations',
+                            operation_ref.id, operation_ref.name)
     return operation_ref
 
 
@@ -602,6 +890,9 @@ def scheduled_operation_update(context, id, values):
                                                  session=session)
         operation_ref.update(values)
         operation_ref.save(session)
+        if 'name' in values:
+            _name_ngrams_update(session, 'scheduled_operations', id,
+                                operation_ref.name)
     return operation_ref
 
 
@@ -614,6 +905,7 @@ def scheduled_operation_delete(context, id):
                                                  session=session)
         session.delete(operation_ref)
         session.flush()
+        _name_ngrams_update(session, 'scheduled_operations', id)
 
 
 def _scheduled_operation_list_query(context, session, **kwargs):
@@ -638,7 +930,7 @@ def scheduled_operation_get_all_by_filters_sort(
         context, filters, limit=None, marker=None,
         sort_keys=None, sort_dirs=None):
 
-    session = get_session()
+    session = _get_read_session(context, (filters or {}).get('project_id'))
     with session.begin():
         query = _generate_paginate_query(
             context, session, marker, limit,
@@ -691,6 +983,21 @@ def scheduled_operation_state_update(context, operation_id, values):
     return state_ref
 
 
+@oslo_db_api.wrap_db_retry(max_retries=5, retry_on_deadlock=True)
+def scheduled_operation_state_update_all(context, operation_ids, values):
+    if not operation_ids:
+        return 0
+
+    values = dict(values, updated_at=timeutils.utcnow())
+    session = get_session()
+    with session.begin():
+        return model_query(
+            context, models.ScheduledOperationState, session=session
+        ).filter(
+            models.ScheduledOperationState.operation_id.in_(operation_ids)
+        ).update(values, synchronize_session=False)
+
+
 def scheduled_operation_state_delete(context, operation_id):
     """Delete a ScheduledOperationState record."""
 
@@ -814,6 +1121,54 @@ def scheduled_operation_log_delete_oldest(context, operation_id,
             filters).delete(synchronize_session=False)
 
 
+def scheduled_operation_log_delete_all_oldest(context, retained_num,
+                                              excepted_states=None,
+                                              batch_size=None):
+    table = models.ScheduledOperationLog
+    session = get_session()
+    # The logs are ranked once, the ids to delete are then deleted in
+    # batches so that each transaction stays short
+    row_number = func.row_number().over(
+        partition_by=table.operation_id,
+        order_by=(table.created_at.desc(), table.id.desc()))
+    ranked = model_query(
+        context, table.id, table.state, row_number.label('row_number'),
+        session=session).subquery()
+    query = session.query(ranked.c.id).filter(
+        ranked.c.row_number > retained_num)
+    if excepted_states:
+        query = query.filter(ranked.c.state.notin_(excepted_states))
+    log_ids = [row.id for row in query]
+    if not log_ids:
+        return 0
+
+    batch_size = batch_size or len(log_ids)
+    deleted = 0
+    for start in range(0, len(log_ids), batch_size):
+        with session.begin():
+            deleted += model_query(
+                context, table, session=session).filter(
+                    table.id.in_(log_ids[start:start + batch_size])
+            ).delete(synchronize_session=False)
+    return deleted
+
+
+def scheduled_operation_log_delete_all_oldest_supported(context):
+    return _supports_window_functions(get_engine().dialect)
+
+
+def _supports_window_functions(dialect):
+    version = tuple(dialect.server_version_info or ())
+    if dialect.name == 'sqlite':
+        return version >= (3, 25)
+    if dialect.name == 'postgresql':
+        return True
+    if dialect.name == 'mysql':
+        mariadb, version = _mysql_server_version(version)
+        return version >= ((10, 2) if mariadb else (8, 0))
+    return False
+
+
 def _scheduled_operation_log_list_query(context, session, **kwargs):
     query = model_query(context, models.ScheduledOperationLog,
                         session=session)
@@ -847,18 +1202,22 @@ def scheduled_operation_log_get_all_by_filters_sort(
 ###################
 
 
-def _resource_refs(resource_list, meta_class):
-    resource_refs = []
-    if resource_list:
-        for resource in resource_list:
-            resource_ref = meta_class()
-            resource_ref['resource_id'] = resource['id']
-            resource_ref['resource_type'] = resource['type']
-            resource_ref['resource_name'] = resource['name']
-            resource_ref['resource_extra_info'] = resource.get(
-                'extra_info', None)
-            resource_refs.append(resource_ref)
-    return resource_refs
+def _resource_mappings(plan_id, resource_list):
+    mappings = []
+    for resource in resource_list or []:
+        mappings.append({
+            'plan_id': plan_id,
+            'resource_id': resource['id'],
+            'resource_type': resource['type'],
+            'resource_name': resource['name'],
+            'resource_extra_info': resource.get('extra_info', None),
+        })
+    return mappings
+
+
+def _resource_key(resource):
+    return (resource['resource_id'], resource['resource_type'],
+            resource['resource_name'], resource['resource_extra_info'])
 
 
 @require_context
@@ -891,46 +1250,64 @@ def _plan_resources_get_query(context, plan_id, model, session=None):
     ).filter_by(plan_id=plan_id)
 
 
-@require_context
-def _resource_create(context, values):
-    resource_ref = models.Resource()
-    resource_ref.update(values)
-    session = get_session()
-    with session.begin():
-        resource_ref.save(session)
-        return resource_ref
+def _plan_resources_update(context, plan_id, resources, session=None):
+    """Replace the resources of a plan in a single transaction.
 
+    Only the difference with the current resources is written: the rows
+    of the removed resources are deleted, the added resources are inserted
+    in bulk and the rows of the unchanged resources are kept.
 
-@require_context
-def _plan_resources_update(context, plan_id, resources, session=None):
+    :returns: the resource rows in the order of resources, the inserted
+              ones are transient instances without id
+    """
     session = session or get_session()
-    now = timeutils.utcnow()
-    with session.begin():
-        model_query(
-            context,
-            models.Resource,
-            session=session
-        ).filter_by(
-            plan_id=plan_id
-        ).update({
-            'deleted': True,
-            'deleted_at': now,
-            'updated_at': literal_column('updated_at')
-        })
-    resources_list = []
-    for resource in resources:
-        resource['plan_id'] = plan_id
-        resource['resource_id'] = resource.pop('id')
-        resource['resource_type'] = resource.pop('type')
-        resource['resource_name'] = resource.pop('name')
-        resource['resource_extra_info'] = resource.pop(
-            'extra_info', None)
-        resource_ref = _resource_create(context, resource)
-        resources_list.append(resource_ref)
+    with session.begin(subtransactions=True):
+        _record_write(_plan_project_id(session, plan_id))
+        existing = {}
+        query = _plan_resources_get_query(context, plan_id, models.Resource,
+                                          session=session)
+        for resource_ref in query:
+            existing.setdefault(_resource_key(resource_ref),
+                                []).append(resource_ref)
+
+        resources_list = []
+        added = []
+        for mapping in _resource_mappings(plan_id, resources):
+            resource_refs = existing.get(_resource_key(mapping))
+            if resource_refs:
+                resources_list.append(resource_refs.pop())
+            else:
+                added.append(mapping)
+                resources_list.append(models.Resource(**mapping))
+
+        removed_ids = [resource_ref.id
+                       for resource_refs in existing.values()
+                       for resource_ref in resource_refs]
+        now = timeutils.utcnow()
+        for start in range(0, len(removed_ids), _RESOURCE_DELETE_CHUNK):
+            model_query(
+                context,
+                models.Resource,
+                session=session
+            ).filter(
+                models.Resource.id.in_(
+                    removed_ids[start:start + _RESOURCE_DELETE_CHUNK])
+            ).update({
+                'deleted': True,
+                'deleted_at': now,
+                'updated_at': literal_column('updated_at')
+            }, synchronize_session=False)
+        if added:
+            session.bulk_insert_mappings(models.Resource, added)
 
     return resources_list
 
 
+def _plan_project_id(session, plan_id):
+    return session.query(models.Plan.project_id).filter_by(
+        id=plan_id).scalar()
+
+
 @require_context
 def _plan_get(context, plan_id, session=None, joined_load=True):
     result = _plan_get_query(context, session=session, project_only=True,
@@ -945,8 +1322,8 @@ def _plan_get(context, plan_id, session=None, joined_load=True):
 
 @require_context
 def plan_create(context, values):
-    values['resources'] = _resource_refs(values.get('resources'),
-                                         models.Resource)
+    values = dict(values)
+    resources = values.pop('resources', None)
 
     plan_ref = models.Plan()
     if not values.get('id'):
@@ -956,13 +1333,21 @@ def plan_create(context, values):
     session = get_session()
     with session.begin():
         session.add(plan_ref)
+        if resources:
+            # The plan row must exist before the bulk insert of the
+            # resources referencing it
+            session.flush()
+            session.bulk_insert_mappings(
+                models.Resource, _resource_mappings(values['id'], resources))
+        _name_ngrams_update(session, 'plans', values['id'],
+                            values.get('name'))
 
     return _plan_get(context, values['id'], session=session)
 
 
 @require_context
 def plan_get(context, plan_id):
-    return _plan_get(context, plan_id)
+    return _replica_get(_plan_get, context, plan_id)
 
 
 @require_admin_context
@@ -971,6 +1356,7 @@ def plan_destroy(context, plan_id):
     session = get_session()
     now = timeutils.utcnow()
     with session.begin():
+        _record_write(_plan_project_id(session, plan_id))
         model_query(
             context,
             models.Plan,
@@ -993,6 +1379,7 @@ def plan_destroy(context, plan_id):
             'deleted_at': now,
             'updated_at': literal_column('updated_at')
         })
+        _name_ngrams_update(session, 'plans', plan_id)
 
 
 @require_context
@@ -1009,6 +1396,8 @@ def plan_update(context, plan_id, values):
 
         plan_ref = _plan_get(context, plan_id, session=session)
         plan_ref.update(values)
+        if 'name' in values:
+            _name_ngrams_update(session, 'plans', plan_id, plan_ref.name)
 
         return plan_ref
 
@@ -1045,7 +1434,7 @@ def plan_get_all(context, marker, limit, sort_keys=None, sort_dirs=None,
                     function for more information
     :returns: list of matching plans
     """
-    session = get_session()
+    session = _get_read_session(context)
     with session.begin():
         # Generate the query
         query = _generate_paginate_query(context, session, marker, limit,
@@ -1081,7 +1470,7 @@ def plan_get_all_by_project(context, project_id, marker, limit,
                     function for more information
     :returns: list of matching plans
     """
-    session = get_session()
+    session = _get_read_session(context, project_id)
     with session.begin():
         authorize_project_context(context, project_id)
         # Add in the project filter without modifying the given filters
@@ -1126,7 +1515,7 @@ def restore_create(context, values):
 
 @require_context
 def restore_get(context, restore_id):
-    return _restore_get(context, restore_id)
+    return _replica_get(_restore_get, context, restore_id)
 
 
 @require_context
@@ -1208,7 +1597,7 @@ def restore_get_all(context, marker, limit, sort_keys=None, sort_dirs=None,
     if filters and not is_valid_model_filters(models.Restore, filters):
         return []
 
-    session = get_session()
+    session = _get_read_session(context)
     with session.begin():
         # Generate the query
         query = _generate_paginate_query(context, session, marker, limit,
@@ -1248,7 +1637,7 @@ def restore_get_all_by_project(context, project_id, marker, limit,
     if filters and not is_valid_model_filters(models.Restore, filters):
         return []
 
-    session = get_session()
+    session = _get_read_session(context, project_id)
     with session.begin():
         authorize_project_context(context, project_id)
         # Add in the project filter without modifying the given filters
@@ -1291,7 +1680,7 @@ def operation_log_create(context, values):
 
 @require_context
 def operation_log_get(context, operation_log_id):
-    return _operation_log_get(context, operation_log_id)
+    return _replica_get(_operation_log_get, context, operation_log_id)
 
 
 @require_context
@@ -1361,7 +1750,7 @@ def operation_log_get_all(context, marker, limit, sort_keys=None,
     if filters and not is_valid_model_filters(models.OperationLog, filters):
         return []
 
-    session = get_session()
+    session = _get_read_session(context)
     with session.begin():
         # Generate the query
         query = _generate_paginate_query(context, session, marker, limit,
@@ -1402,7 +1791,7 @@ def operation_log_get_all_by_project(context, project_id, marker, limit,
     if filters and not is_valid_model_filters(models.OperationLog, filters):
         return []
 
-    session = get_session()
+    session = _get_read_session(context, project_id)
     with session.begin():
         authorize_project_context(context, project_id)
         # Add in the project filter without modifying the given filters
@@ -1589,9 +1978,105 @@ def checkpoint_record_create(context, values):
         return checkpoint_record_ref
 
 
+@require_admin_context
+def checkpoint_record_create_or_update(context, values):
+    session = get_session()
+    with session.begin():
+        return _checkpoint_record_create_or_update(context, values, session)
+
+
+def _checkpoint_record_create_or_update(context, values, session):
+    checkpoint_record_ref = model_query(
+        context, models.CheckpointRecord, session=session,
+        read_deleted='yes').filter_by(id=values['id']).first()
+    if checkpoint_record_ref is None:
+        checkpoint_record_ref = models.CheckpointRecord()
+    return _checkpoint_record_save(checkpoint_record_ref, values, session)
+
+
+def _checkpoint_record_save(checkpoint_record_ref, values, session):
+    """Write values to a checkpoint record, restoring it if it was deleted"""
+    checkpoint_record_ref.update(values)
+    checkpoint_record_ref.deleted = False
+    checkpoint_record_ref.deleted_at = None
+    checkpoint_record_ref.save(session)
+    return checkpoint_record_ref
+
+
+def _checkpoint_record_changed_since(checkpoint_record_ref, before):
+    return any(timestamp is not None and timestamp >= before
+               for timestamp in (checkpoint_record_ref.updated_at,
+                                 checkpoint_record_ref.deleted_at))
+
+
+def _checkpoint_record_matches(checkpoint_record_ref, values):
+    return (not checkpoint_record_ref.deleted and
+            checkpoint_record_ref.checkpoint_status ==
+            values['checkpoint_status'] and
+            checkpoint_record_ref.extend_info == values.get('extend_info'))
+
+
+@require_admin_context
+def checkpoint_records_reconcile(context, provider_id, records, before):
+    session = get_session()
+    # The records written after the bank was listed come from the
+    # write-through of the checkpoints, they are newer than the listing
+    # and are kept as they are. The unchanged records are not written.
+    updated = 0
+    for start in range(0, len(records), _CHECKPOINT_RECORD_SYNC_CHUNK):
+        chunk = records[start:start + _CHECKPOINT_RECORD_SYNC_CHUNK]
+        with session.begin():
+            query = model_query(
+                context, models.CheckpointRecord, session=session,
+                read_deleted='yes').filter(
+                    models.CheckpointRecord.id.in_(
+                        [values['id'] for values in chunk]))
+            refs = {ref.id: ref for ref in query}
+            for values in chunk:
+                ref = refs.get(values['id'])
+                if ref is None:
+                    ref = models.CheckpointRecord()
+                elif (_checkpoint_record_changed_since(ref, before) or
+                        _checkpoint_record_matches(ref, values)):
+                    continue
+                _checkpoint_record_save(ref, values, session)
+                updated += 1
+
+    unchanged = expression.and_(
+        models.CheckpointRecord.created_at < before,
+        expression.or_(models.CheckpointRecord.updated_at.is_(None),
+                       models.CheckpointRecord.updated_at < before))
+    stale = model_query(
+        context, models.CheckpointRecord.id,
+        models.CheckpointRecord.project_id, session=session,
+        read_deleted='no').filter(
+            models.CheckpointRecord.provider_id == provider_id,
+            unchanged)
+    record_ids = set(values['id'] for values in records)
+    stale_ids = []
+    for row in stale:
+        if row.id not in record_ids:
+            stale_ids.append(row.id)
+            _record_write(row.project_id)
+    deleted = 0
+    for start in range(0, len(stale_ids), _CHECKPOINT_RECORD_SYNC_CHUNK):
+        chunk = stale_ids[start:start + _CHECKPOINT_RECORD_SYNC_CHUNK]
+        with session.begin():
+            query = model_query(context, models.CheckpointRecord,
+                                session=session, read_deleted='no')
+            deleted += query.filter(models.CheckpointRecord.id.in_(chunk),
+                                    unchanged).update(
+                {'deleted': True,
+                 'deleted_at': timeutils.utcnow(),
+                 'updated_at': literal_column('updated_at')},
+                synchronize_session=False)
+    return {'updated': updated, 'deleted': deleted}
+
+
 @require_context
 def checkpoint_record_get(context, checkpoint_record_id):
-    return _checkpoint_record_get(context, checkpoint_record_id)
+    return _replica_get(_checkpoint_record_get, context,
+                        checkpoint_record_id)
 
 
 @require_context
@@ -1646,6 +2131,13 @@ def _checkpoint_record_list_process_filters(query, filters):
         models.CheckpointRecord, query, filters,
         regex_match_filter_names)
 
+    if query is not None and filters.get('created_at_min'):
+        query = query.filter(models.CheckpointRecord.created_at >=
+                             filters['created_at_min'])
+    if query is not None and filters.get('created_at_max'):
+        query = query.filter(models.CheckpointRecord.created_at <
+                             filters['created_at_max'])
+
     return query
 
 
@@ -1653,7 +2145,7 @@ def checkpoint_record_get_all_by_filters_sort(
         context, filters, limit=None, marker=None,
         sort_keys=None, sort_dirs=None):
 
-    session = get_session()
+    session = _get_read_session(context, (filters or {}).get('project_id'))
     with session.begin():
         query = _generate_paginate_query(
             context, session, marker, limit,
@@ -1734,6 +2226,10 @@ def _list_common_process_regex_filter(model, query, filters, legal_keys):
         if not isinstance(value, six.string_types):
             continue
 
+        if key == 'name' and CONF.name_filter_mode != 'regex':
+            query = _process_name_search(model, query, value)
+            continue
+
         column_attr = getattr(model, key)
         if db_regexp_op == 'LIKE':
             query = query.filter(column_attr.op(db_regexp_op)(
@@ -1744,6 +2240,35 @@ def _list_common_process_regex_filter(model, query, filters, legal_keys):
     return query
 
 
+def _escape_like(value):
+    return value.replace(u'!', u'!!').replace(u'%', u'!%').replace(u'_', u'!_')
+
+
+def _process_name_search(model, query, value):
+    """Filter query on the names matching value without a table scan.
+
+    The names starting with value are matched with the name index. In the
+    ngram mode, the names containing value are matched among the rows
+    which have all the trigrams of value in the name_ngrams table.
+    """
+    grams = _get_name_ngrams(value)
+    if CONF.name_filter_mode != 'ngram' or not grams:
+        return query.filter(
+            model.name.like(_escape_like(value) + u'%', escape=u'!'))
+
+    ngram = models.NameNgram
+    candidates = sqlalchemy.select([ngram.row_id]).where(
+        ngram.table_name == model.__tablename__
+    ).where(
+        ngram.gram.in_(grams)
+    ).group_by(
+        ngram.row_id
+    ).having(func.count(ngram.gram) == len(grams))
+    return query.filter(model.id.in_(candidates)).filter(
+        func.lower(model.name).like(
+            u'%' + _escape_like(value.lower()) + u'%', escape=u'!'))
+
+
 PAGINATION_HELPERS = {
     models.Plan: (_plan_get_query, _process_plan_filters, _plan_get),
     models.Restore: (_restore_get_query, _process_restore_filters,
@@ -1795,8 +2320,9 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
 
     :param context: context to query under
     :param session: the session to use
-    :param marker: the last item of the previous page; we returns the next
-                    results after this value.
+    :param marker: the last item of the previous page, or a cursor of its
+                   sort key values as built by utils.encode_page_cursor;
+                   we returns the next results after this value.
     :param limit: maximum number of items to return
     :param sort_keys: list of attributes by which results should be sorted,
                       paired with corresponding item in sort_dirs
@@ -1827,7 +2353,12 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
 
     marker_object = None
     if marker is not None:
-        marker_object = get(context, marker, session=session)
+        cursor = utils.decode_page_cursor(marker)
+        if cursor is not None:
+            marker_object = _get_cursor_marker(paginate_type, sort_keys,
+                                               cursor)
+        else:
+            marker_object = get(context, marker, session=session)
 
     query = sqlalchemyutils.paginate_query(query, paginate_type, limit,
                                            sort_keys,
@@ -1838,6 +2369,38 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
     return query
 
 
+def _get_cursor_marker(model, sort_keys, cursor):
+    """Build a transient marker row from the values of a page cursor.
+
+    The keyset condition of the next page only needs the sort key values
+    of the marker, so they are taken from the cursor instead of loading
+    the marker row.
+    """
+    values = {}
+    for sort_key in sort_keys:
+        if not hasattr(model, sort_key):
+            # Left to paginate_query to reject
+            continue
+        if sort_key not in cursor:
+            msg = _("Pagination cursor has no value for sort key "
+                    "%s") % sort_key
+            raise exception.InvalidInput(reason=msg)
+        value = cursor[sort_key]
+        column = model.__table__.columns.get(sort_key)
+        if (value is not None and column is not None and
+                isinstance(column.type, sqlalchemy.DateTime)):
+            try:
+                value = timeutils.parse_strtime(
+                    value, utils.PAGE_CURSOR_TIME_FORMAT)
+            except (TypeError, ValueError):
+                msg = _("Invalid value %(value)s for sort key %(key)s in "
+                        "pagination cursor") % {'value': value,
+                                                'key': sort_key}
+                raise exception.InvalidInput(reason=msg)
+        values[sort_key] = value
+    return model(**values)
+
+
 def process_sort_params(sort_keys, sort_dirs, default_keys=None,
                         default_dir='asc'):
     """Process the sort parameters to include default keys.
@@ -1910,7 +2473,8 @@ def process_sort_params(sort_keys, sort_dirs, default_keys=None,
 
 
 @require_admin_context
-def purge_deleted_rows(context, age_in_days):
+def purge_deleted_rows(context, age_in_days, batch_size=None,
+                       dry_run=False, archive_path=None):
     """Purge deleted rows older than age from karbor tables."""
     try:
         age_in_days = int(age_in_days)
@@ -1922,6 +2486,11 @@ def purge_deleted_rows(context, age_in_days):
         msg = _('Must supply a positive value for age')
         LOG.exception(msg)
         raise exception.InvalidParameterValue(msg)
+    if batch_size is None:
+        batch_size = CONF.purge_batch_size
+    if batch_size <= 0:
+        msg = _('Must supply a positive value for batch size')
+        raise exception.InvalidParameterValue(msg)
 
     engine = get_engine()
     session = get_session()
@@ -1945,24 +2514,123 @@ def purge_deleted_rows(context, age_in_days):
         else:
             tables.append(tbl)
 
-    for table in tables:
-        t = Table(table, metadata, autoload=True)
-        LOG.info('Purging deleted rows older than age=%(age)d days from '
-                 'table=%(table)s', {'age': age_in_days, 'table': table})
-        deleted_age = timeutils.utcnow() - dt.timedelta(days=age_in_days)
+    deleted_age = timeutils.utcnow() - dt.timedelta(days=age_in_days)
+    archive = gzip.open(archive_path, 'ab') if archive_path else None
+    purged = {}
+    try:
+        for table in tables:
+            t = Table(table, metadata, autoload=True)
+            if dry_run:
+                purged[table] = session.query(t).filter(
+                    t.c.deleted_at < deleted_age).count()
+                LOG.info("Would delete %(row)d rows from table=%(table)s",
+                         {'row': purged[table], 'table': table})
+                continue
+
+            LOG.info('Purging deleted rows older than age=%(age)d days '
+                     'from table=%(table)s', {'age': age_in_days,
+                                              'table': table})
+            purged[table] = _purge_table(session, t, deleted_age,
+                                         batch_size, archive)
+            LOG.info("Deleted %(row)d rows from table=%(table)s",
+                     {'row': purged[table], 'table': table})
+    finally:
+        if archive is not None:
+            archive.close()
+    return purged
+
+
+def _purge_table(session, table, deleted_age, batch_size, archive=None):
+    """Delete the rows of table deleted before deleted_age in batches.
+
+    The rows of each batch are written to archive and synced to disk
+    before the batch is committed on its own, and the next one waits for
+    CONF.purge_batch_interval. The rows of a batch failing to commit are
+    archived again by the next run.
+    """
+    pk = list(table.primary_key.columns)[0]
+    rows_purged = 0
+    while True:
         try:
             with session.begin():
-                result = session.execute(
-                    t.delete()
-                    .where(t.c.deleted_at < deleted_age))
+                ids = [row[0] for row in session.query(pk).filter(
+                    table.c.deleted_at < deleted_age).order_by(
+                    pk).limit(batch_size)]
+                if not ids:
+                    break
+                if archive is not None:
+                    _archive_rows(archive, table, session.execute(
+                        table.select().where(pk.in_(ids))))
+                session.execute(table.delete().where(pk.in_(ids)))
         except db_exc.DBReferenceError:
             LOG.exception('DBError detected when purging from '
-                          'table=%(table)s', {'table': table})
+                          'table=%(table)s', {'table': table.name})
             raise
 
-        rows_purged = result.rowcount
-        LOG.info("Deleted %(row)d rows from table=%(table)s",
-                 {'row': rows_purged, 'table': table})
+        rows_purged += len(ids)
+        LOG.debug("Deleted %(row)d rows from table=%(table)s so far",
+                  {'row': rows_purged, 'table': table.name})
+        if len(ids) < batch_size:
+            break
+        time.sleep(CONF.purge_batch_interval)
+    return rows_purged
+
+
+def _archive_rows(archive, table, rows):
+    for row in rows:
+        archive.write(jsonutils.dump_as_bytes(
+            {'table': table.name, 'row': dict(row)}))
+        archive.write(b'\n')
+    archive.flush()
+    os.fsync(archive.fileno())
+
+
+_UNUSED_INDEXES_QUERIES = {
+    'mysql': "SELECT object_name, index_name FROM sys.schema_unused_indexes "
+             "WHERE object_schema = DATABASE()",
+    'postgresql': "SELECT relname, indexrelname FROM pg_stat_user_indexes "
+                  "WHERE idx_scan = 0",
+}
+
+
+@require_admin_context
+def check_indexes(context):
+    engine = get_engine()
+    inspector = sqlalchemy.inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    missing = []
+    for table in models.BASE.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing = [tuple(index['column_names'])
+                    for index in inspector.get_indexes(table.name)]
+        existing.extend(
+            tuple(constraint['column_names']) for constraint in
+            inspector.get_unique_constraints(table.name))
+        existing.append(tuple(inspector.get_pk_constraint(
+            table.name)['constrained_columns']))
+        for index in table.indexes:
+            columns = tuple(column.name for column in index.columns)
+            # An index starting with the same columns serves the queries
+            # of this one too.
+            if not any(index_columns[:len(columns)] == columns
+                       for index_columns in existing):
+                missing.append((table.name, index.name, columns))
+
+    unused = None
+    query = _UNUSED_INDEXES_QUERIES.get(engine.dialect.name)
+    if query:
+        try:
+            unused = [(row[0], row[1]) for row in
+                      engine.execute(query) if row[0] in existing_tables]
+        except db_exc.DBError:
+            # sys.schema_unused_indexes needs MySQL 5.7, MariaDB lacks it
+            LOG.warning("The database does not report the unused indexes",
+                        exc_info=True)
+
+    return {'missing': missing, 'unused': unused}
 
 
 ###################
@@ -2374,6 +3042,57 @@ def quota_reserve(context, resources, quotas, deltas, expire,
     return reservations
 
 
+@require_context
+@_retry_on_deadlock
+def quota_allocate(context, quotas, deltas, project_id=None):
+    if project_id is None:
+        project_id = context.project_id
+    session = get_session()
+    with session.begin():
+        existing = set(
+            row.resource for row in
+            session.query(models.QuotaUsage.resource).
+            filter_by(project_id=project_id, deleted=False))
+
+        # NOTE: Each usage is changed by a conditional UPDATE instead of
+        #       locking and refreshing all the usages of the project, the
+        #       resources are visited in a stable order so that
+        #       concurrent allocations lock the rows in the same order.
+        overs = []
+        for resource in sorted(deltas):
+            delta = deltas[resource]
+            if resource not in existing:
+                quota_usage_create(context.elevated(), project_id, resource,
+                                   0, 0, None, session=session)
+            in_use = models.QuotaUsage.in_use
+            query = session.query(models.QuotaUsage).\
+                filter_by(project_id=project_id, resource=resource,
+                          deleted=False)
+            if delta > 0 and quotas[resource] >= 0:
+                query = query.filter(in_use + models.QuotaUsage.reserved +
+                                     delta <= quotas[resource])
+            if delta < 0:
+                value = expression.case([(in_use + delta < 0, 0)],
+                                        else_=in_use + delta)
+            else:
+                value = in_use + delta
+            updated = query.update({'in_use': value,
+                                    'updated_at': timeutils.utcnow()},
+                                   synchronize_session=False)
+            if not updated:
+                overs.append(resource)
+
+        if overs:
+            # Raising inside the transaction rolls back the usages
+            # already updated for the other resources.
+            usages = dict(
+                (resource, dict(in_use=row.in_use, reserved=row.reserved))
+                for resource, row in
+                _get_quota_usages(context, session, project_id).items())
+            raise exception.OverQuota(overs=sorted(overs), quotas=quotas,
+                                      usages=usages)
+
+
 def _quota_reservations(session, context, reservations):
     """Return the relevant reservations."""
 
@@ -0,0 +1,45 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+
+from sqlalchemy import Column, Index, Integer, MetaData, Table
+
+# Same as karbor.utils.get_shard(trigger_id,
+# karbor.common.constants.TRIGGER_EXECUTION_SHARDS) when this migration
+# was written.
+SHARDS = 64
+
+
+def _get_shard(trigger_id):
+    digest = hashlib.md5(trigger_id.encode('utf-8')).hexdigest()
+    return int(digest, 16) % SHARDS
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    trigger_executions = Table('trigger_executions', meta, autoload=True)
+    shard = Column('shard', Integer)
+    trigger_executions.create_column(shard)
+    Index('ix_trigger_executions_shard',
+          trigger_executions.c.shard).create(migrate_engine)
+
+    executions = list(migrate_engine.execute(
+        trigger_executions.select().with_only_columns(
+            [trigger_executions.c.id, trigger_executions.c.trigger_id])))
+    for execution in executions:
+        migrate_engine.execute(
+            trigger_executions.update().where(
+                trigger_executions.c.id == execution.id
+            ).values(shard=_get_shard(execution.trigger_id)))
@@ -0,0 +1,49 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from sqlalchemy import Index, MetaData, Table
+
+INDEXES = [
+    ('trigger_executions', 'ix_trigger_executions_shard_execution_time',
+     ('shard', 'execution_time')),
+    ('scheduled_operation_states',
+     'ix_scheduled_operation_states_service_id_state',
+     ('service_id', 'state')),
+    ('scheduled_operation_logs',
+     'ix_scheduled_operation_logs_operation_id_created_at',
+     ('operation_id', 'created_at')),
+    ('operation_logs', 'ix_operation_logs_project_id_created_at',
+     ('project_id', 'created_at')),
+    ('restores', 'ix_restores_project_id_created_at',
+     ('project_id', 'created_at')),
+    ('resources', 'ix_resources_plan_id_deleted', ('plan_id', 'deleted')),
+    # Declared by the models but not created by 003_add_quotas_table
+    ('quotas', 'ix_quotas_project_id', ('project_id',)),
+    ('quota_classes', 'ix_quota_classes_class_name', ('class_name',)),
+    ('quota_usages', 'ix_quota_usages_project_id', ('project_id',)),
+]
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, index_name, column_names in INDEXES:
+        table = Table(table_name, meta, autoload=True)
+        Index(index_name,
+              *[table.c[column_name] for column_name in column_names]
+              ).create(migrate_engine)
+
+    # Made redundant by ix_trigger_executions_shard_execution_time
+    trigger_executions = Table('trigger_executions', meta, autoload=True)
+    Index('ix_trigger_executions_shard',
+          trigger_executions.c.shard).drop(migrate_engine)
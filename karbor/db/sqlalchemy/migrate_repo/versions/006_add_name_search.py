@@ -0,0 +1,44 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer
+from sqlalchemy import MetaData, String, Table
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    for table_name in ('plans', 'triggers', 'scheduled_operations'):
+        table = Table(table_name, meta, autoload=True)
+        Index('ix_%s_name' % table_name, table.c.name).create(migrate_engine)
+
+    # New table
+    name_ngrams = Table(
+        'name_ngrams', meta,
+        Column('created_at', DateTime),
+        Column('updated_at', DateTime),
+        Column('deleted_at', DateTime),
+        Column('deleted', Boolean),
+        Column('id', Integer, primary_key=True, nullable=False,
+               autoincrement=True),
+        Column('table_name', String(length=64), nullable=False),
+        Column('row_id', String(length=36), nullable=False),
+        Column('gram', String(length=3), nullable=False),
+        mysql_engine='InnoDB'
+    )
+
+    name_ngrams.create()
+    Index('ix_name_ngrams_table_name_gram', name_ngrams.c.table_name,
+          name_ngrams.c.gram).create(migrate_engine)
+    Index('ix_name_ngrams_table_name_row_id', name_ngrams.c.table_name,
+          name_ngrams.c.row_id).create(migrate_engine)
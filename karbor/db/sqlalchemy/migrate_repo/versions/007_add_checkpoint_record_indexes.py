@@ -0,0 +1,31 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from sqlalchemy import Index, MetaData, Table
+
+INDEXES = [
+    ('ix_checkpoint_records_provider_id_project_id_created_at',
+     ('provider_id', 'project_id', 'created_at')),
+    ('ix_checkpoint_records_plan_id_project_id_created_at',
+     ('plan_id', 'project_id', 'created_at')),
+]
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    checkpoint_records = Table('checkpoint_records', meta, autoload=True)
+    for index_name, column_names in INDEXES:
+        Index(index_name,
+              *[checkpoint_records.c[column_name]
+                for column_name in column_names]).create(migrate_engine)
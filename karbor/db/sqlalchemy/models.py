@@ -18,7 +18,7 @@ from oslo_db.sqlalchemy import models
 from oslo_utils import timeutils
 from sqlalchemy import Column, Integer, String, Text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import DateTime, Boolean, ForeignKey
+from sqlalchemy import DateTime, Boolean, ForeignKey, Index
 from sqlalchemy import orm
 
 CONF = cfg.CONF
@@ -66,6 +66,9 @@ class Trigger(BASE, KarborBase):
     """Represents a trigger."""
 
     __tablename__ = 'triggers'
+    __table_args__ = (
+        Index('ix_triggers_name', 'name'),
+        KarborBase.__table_args__)
 
     id = Column(String(36), primary_key=True, nullable=False)
     name = Column(String(255), nullable=False)
@@ -74,20 +77,43 @@ class Trigger(BASE, KarborBase):
     properties = Column(Text, nullable=False)
 
 
+class NameNgram(BASE, KarborBase):
+    """Represents a trigram of the name of a plan, trigger or operation"""
+
+    __tablename__ = 'name_ngrams'
+    __table_args__ = (
+        Index('ix_name_ngrams_table_name_gram', 'table_name', 'gram'),
+        Index('ix_name_ngrams_table_name_row_id', 'table_name', 'row_id'),
+        KarborBase.__table_args__)
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    table_name = Column(String(64), nullable=False)
+    row_id = Column(String(36), nullable=False)
+    gram = Column(String(3), nullable=False)
+
+
 class TriggerExecution(BASE, KarborBase):
     """Represents a future trigger execition"""
 
     __tablename__ = 'trigger_executions'
+    __table_args__ = (
+        Index('ix_trigger_executions_shard_execution_time',
+              'shard', 'execution_time'),
+        KarborBase.__table_args__)
 
     id = Column(String(36), primary_key=True, nullable=False)
     trigger_id = Column(String(36), unique=True, nullable=False, index=True)
     execution_time = Column(DateTime, nullable=False, index=True)
+    shard = Column(Integer)
 
 
 class ScheduledOperation(BASE, KarborBase):
     """Represents a scheduled operation."""
 
     __tablename__ = 'scheduled_operations'
+    __table_args__ = (
+        Index('ix_scheduled_operations_name', 'name'),
+        KarborBase.__table_args__)
 
     id = Column(String(36), primary_key=True, nullable=False)
     name = Column(String(255), nullable=False)
@@ -113,6 +139,10 @@ class ScheduledOperationState(BASE, KarborBase):
     """Represents a scheduled operation state."""
 
     __tablename__ = 'scheduled_operation_states'
+    __table_args__ = (
+        Index('ix_scheduled_operation_states_service_id_state',
+              'service_id', 'state'),
+        KarborBase.__table_args__)
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
     operation_id = Column(String(36),
@@ -139,6 +169,10 @@ class ScheduledOperationLog(BASE, KarborBase):
     """Represents a scheduled operation log."""
 
     __tablename__ = 'scheduled_operation_logs'
+    __table_args__ = (
+        Index('ix_scheduled_operation_logs_operation_id_created_at',
+              'operation_id', 'created_at'),
+        KarborBase.__table_args__)
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
     operation_id = Column(String(36),
@@ -157,6 +191,9 @@ class Plan(BASE, KarborBase):
     """Represents a Plan."""
 
     __tablename__ = 'plans'
+    __table_args__ = (
+        Index('ix_plans_name', 'name'),
+        KarborBase.__table_args__)
     id = Column(String(36), primary_key=True)
     name = Column(String(255))
     description = Column(String(255))
@@ -170,6 +207,9 @@ class Resource(BASE, KarborBase):
     """Represents a resource in a plan."""
 
     __tablename__ = 'resources'
+    __table_args__ = (
+        Index('ix_resources_plan_id_deleted', 'plan_id', 'deleted'),
+        KarborBase.__table_args__)
     id = Column(Integer, primary_key=True)
     resource_id = Column(String(36))
     resource_type = Column(String(64))
@@ -187,6 +227,10 @@ class Restore(BASE, KarborBase):
     """Represents a Restore."""
 
     __tablename__ = 'restores'
+    __table_args__ = (
+        Index('ix_restores_project_id_created_at',
+              'project_id', 'created_at'),
+        KarborBase.__table_args__)
     id = Column(String(36), primary_key=True)
     project_id = Column(String(255))
     provider_id = Column(String(36))
@@ -202,6 +246,10 @@ class OperationLog(BASE, KarborBase):
     """Represents a operation log."""
 
     __tablename__ = 'operation_logs'
+    __table_args__ = (
+        Index('ix_operation_logs_project_id_created_at',
+              'project_id', 'created_at'),
+        KarborBase.__table_args__)
     id = Column(String(36), primary_key=True)
     project_id = Column(String(255))
     operation_type = Column(String(255))
@@ -235,6 +283,12 @@ class CheckpointRecord(BASE, KarborBase):
     """Represents a checkpoint record."""
 
     __tablename__ = 'checkpoint_records'
+    __table_args__ = (
+        Index('ix_checkpoint_records_provider_id_project_id_created_at',
+              'provider_id', 'project_id', 'created_at'),
+        Index('ix_checkpoint_records_plan_id_project_id_created_at',
+              'plan_id', 'project_id', 'created_at'),
+        KarborBase.__table_args__)
 
     id = Column(String(36), primary_key=True, nullable=False)
     project_id = Column(String(36), nullable=False)
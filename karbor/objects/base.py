@@ -70,6 +70,19 @@ class KarborObject(base.VersionedObject):
         # Return modified dict
         return changes
 
+    def karbor_obj_reset_saved_changes(self, updates):
+        """Resets the changes saved from a karbor_obj_get_changes snapshot.
+
+        The fields changed again since the snapshot was taken keep their
+        changes, so that they are written by the next save.
+        """
+        changes = self.karbor_obj_get_changes()
+        saved = [field for field, value in updates.items()
+                 if field in changes and changes[field] == value]
+        # An empty list of fields would reset all the changes
+        if saved:
+            self.obj_reset_changes(saved)
+
     @base.remotable_classmethod
     def get_by_id(cls, context, id, *args, **kwargs):
         # To get by id we need to have a model and for the model to
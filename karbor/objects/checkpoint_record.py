@@ -26,7 +26,8 @@ class CheckpointRecord(base.KarborPersistentObject, base.KarborObject,
                        base.KarborObjectDictCompat,
                        base.KarborComparableObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: Add create_or_update and reconcile
+    VERSION = '1.1'
 
     fields = {
         'id': fields.UUIDField(),
@@ -77,6 +78,17 @@ class CheckpointRecord(base.KarborPersistentObject, base.KarborObject,
         if self.id:
             db.checkpoint_record_destroy(self._context, self.id)
 
+    @base.remotable_classmethod
+    def create_or_update(cls, context, values):
+        db_checkpoint_record = db.checkpoint_record_create_or_update(
+            context, values)
+        return cls._from_db_object(context, cls(), db_checkpoint_record)
+
+    @base.remotable_classmethod
+    def reconcile(cls, context, provider_id, records, before):
+        return db.checkpoint_records_reconcile(context, provider_id, records,
+                                               before)
+
 
 @base.KarborObjectRegistry.register
 class CheckpointRecordList(base.ObjectListBase, base.KarborObject):
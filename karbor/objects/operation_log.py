@@ -66,11 +66,17 @@ class OperationLog(base.KarborPersistentObject, base.KarborObject,
         self._from_db_object(self._context, self, db_operation_log)
 
     @base.remotable
-    def save(self):
-        updates = self.karbor_obj_get_changes()
+    def save(self, updates=None):
+        """Save the changes of the operation log.
+
+        :param updates: save only this snapshot of the changes, taken with
+                        karbor_obj_get_changes
+        """
+        if updates is None:
+            updates = self.karbor_obj_get_changes()
         if updates:
             db.operation_log_update(self._context, self.id, updates)
-            self.obj_reset_changes()
+            self.karbor_obj_reset_saved_changes(updates)
 
     @base.remotable
     def destroy(self):
@@ -23,7 +23,8 @@ class ScheduledOperationLog(base.KarborPersistentObject, base.KarborObject,
                             base.KarborObjectDictCompat,
                             base.KarborComparableObject):
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: Add destroy_all_oldest
+    VERSION = '1.1'
 
     fields = {
         'id': fields.IntegerField(),
@@ -79,6 +80,16 @@ class ScheduledOperationLog(base.KarborPersistentObject, base.KarborObject,
         db.scheduled_operation_log_delete_oldest(
             context, operation_id, retained_num, excepted_states)
 
+    @base.remotable_classmethod
+    def destroy_all_oldest(cls, context, retained_num, excepted_states=[],
+                           batch_size=None):
+        return db.scheduled_operation_log_delete_all_oldest(
+            context, retained_num, excepted_states, batch_size)
+
+    @base.remotable_classmethod
+    def destroy_all_oldest_supported(cls, context):
+        return db.scheduled_operation_log_delete_all_oldest_supported(context)
+
 
 @base.KarborObjectRegistry.register
 class ScheduledOperationLogList(base.ObjectListBase, base.KarborObject):
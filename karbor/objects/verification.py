@@ -75,12 +75,19 @@ class Verification(base.KarborPersistentObject, base.KarborObject,
         self._from_db_object(self._context, self, db_verification)
 
     @base.remotable
-    def save(self):
-        updates = self.karbor_obj_get_changes()
-        self._convert_properties_to_db_format(updates)
-        if updates:
-            db.verification_update(self._context, self.id, updates)
-            self.obj_reset_changes()
+    def save(self, updates=None):
+        """Save the changes of the verification.
+
+        :param updates: save only this snapshot of the changes, taken with
+                        karbor_obj_get_changes
+        """
+        if updates is None:
+            updates = self.karbor_obj_get_changes()
+        db_updates = dict(updates)
+        self._convert_properties_to_db_format(db_updates)
+        if db_updates:
+            db.verification_update(self._context, self.id, db_updates)
+            self.karbor_obj_reset_saved_changes(updates)
 
     @base.remotable
     def destroy(self):
@@ -19,6 +19,7 @@
 """Quotas for shares."""
 
 import datetime
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -45,6 +46,13 @@ quota_opts = [
     cfg.IntOpt('max_age',
                default=0,
                help='number of seconds between subsequent usage refreshes'),
+    cfg.IntOpt('quota_limit_cache_ttl',
+               default=30,
+               min=0,
+               help='number of seconds the quota limits of a project are '
+                    'cached for the quota checks, 0 disables the cache. '
+                    'Limit updates made through the API of the same process '
+                    'invalidate the cache immediately'),
     cfg.StrOpt('quota_driver',
                default='karbor.quota.DbQuotaDriver',
                help='default driver to use for quota checks'), ]
@@ -60,6 +68,11 @@ class DbQuotaDriver(object):
     database.
     """
 
+    def __init__(self):
+        super(DbQuotaDriver, self).__init__()
+        # (project_id, quota_class) -> (expiration time, limits)
+        self._limits = {}
+
     def get_by_project(self, context, project_id, resource):
         """Get a specific quota by project."""
 
@@ -197,11 +210,40 @@ class DbQuotaDriver(object):
             raise exception.QuotaResourceUnknown(unknown=sorted(unknown))
 
         # Grab and return the quotas (without usages)
-        quotas = self.get_project_quotas(context, sub_resources,
-                                         project_id,
+        limits = self._get_limits(context, resources, project_id)
+
+        return dict((k, limits[k]) for k in sub_resources)
+
+    def _get_limits(self, context, resources, project_id):
+        """Return the limits of all the resources of a project
+
+        The limits are cached for CONF.quota_limit_cache_ttl seconds so
+        that the quota checks do not read the quota and quota class
+        tables on every call.
+        """
+
+        key = (project_id, context.quota_class)
+        now = time.time()
+        cached = self._limits.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        quotas = self.get_project_quotas(context, resources, project_id,
                                          context.quota_class, usages=False)
+        limits = dict((k, v['limit']) for k, v in quotas.items())
+        if CONF.quota_limit_cache_ttl:
+            self._limits[key] = (now + CONF.quota_limit_cache_ttl, limits)
+        return limits
 
-        return dict((k, v['limit']) for k, v in quotas.items())
+    def invalidate_limits(self, project_id=None):
+        """Drop the cached limits of a project, or of all the projects."""
+
+        if project_id is None:
+            self._limits.clear()
+            return
+        for key in list(self._limits):
+            if key[0] == project_id:
+                del self._limits[key]
 
     def limit_check(self, context, resources, values, project_id=None):
         """Check simple quota limits.
@@ -346,6 +388,34 @@ class DbQuotaDriver(object):
 
         db.reservation_rollback(context, reservations, project_id=project_id)
 
+    def allocate(self, context, resources, deltas, project_id=None):
+        """Check quotas and apply the deltas to the usages at once.
+
+        This is the fast path of reserve() followed by commit() for the
+        synchronous operations: each usage is updated by a single
+        conditional UPDATE, no reservation is created and the usages are
+        not refreshed.  Negative deltas release resources.
+
+        If any of the proposed values is over the defined quota, an
+        OverQuota exception will be raised and none of the usages is
+        changed.
+
+        :param context: The request context, for access checks.
+        :param resources: A dictionary of the registered resources.
+        :param deltas: A dictionary of the delta changes.
+        :param project_id: Specify the project_id if current context
+                           is admin and admin wants to impact on
+                           common user's tenant.
+        """
+
+        # If project_id is None, then we use the project_id in context
+        if project_id is None:
+            project_id = context.project_id
+
+        quotas = self._get_quotas(context, resources, deltas.keys(),
+                                  has_sync=True, project_id=project_id)
+        db.quota_allocate(context, quotas, deltas, project_id=project_id)
+
     def destroy_all_by_project(self, context, project_id):
         """Destroy all quotas, usages, and reservations associated with a project.
 
@@ -354,6 +424,7 @@ class DbQuotaDriver(object):
         """
 
         db.quota_destroy_all_by_project(context, project_id)
+        self.invalidate_limits(project_id)
 
     def expire(self, context):
         """Expire reservations.
@@ -733,6 +804,32 @@ class QuotaEngine(object):
                             "%(reservations)s") %
                           {"reservations": reservations})
 
+    def allocate(self, context, project_id=None, **deltas):
+        """Check quotas and apply the deltas to the usages at once.
+
+        The synchronous counterpart of reserve() followed by commit(),
+        the deltas are given as keyword arguments and negative deltas
+        release resources.  Raises OverQuota if any of the resources
+        would go over its limit, in which case no usage is changed.
+
+        :param context: The request context, for access checks.
+        :param project_id: Specify the project_id if current context
+                           is admin and admin wants to impact on
+                           common user's tenant.
+        """
+
+        self._driver.allocate(context, self._resources, deltas,
+                              project_id=project_id)
+
+    def invalidate_limits(self, project_id=None):
+        """Drop the cached limits after the quotas of a project changed.
+
+        :param project_id: The ID of the project whose quotas changed, or
+                           None when a quota class changed.
+        """
+
+        self._driver.invalidate_limits(project_id=project_id)
+
     def destroy_all_by_project(self, context, project_id):
         """Destroy all quotas, usages, and reservations associated with a
 
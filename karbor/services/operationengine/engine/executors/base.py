@@ -16,8 +16,30 @@ Executor which receives operations and run them.
 
 from abc import ABCMeta
 from abc import abstractmethod
+from datetime import datetime
+from datetime import timedelta
+from oslo_config import cfg
+from oslo_utils import timeutils
 import six
 
+from karbor import utils
+
+dispatch_opts = [
+    cfg.FloatOpt('dispatch_spread',
+                 default=0,
+                 min=0,
+                 max=0.9,
+                 help='Fraction of the window of a trigger over which its '
+                      'operations are spread, each operation always being '
+                      'delayed by the same part of it. 0 runs all the '
+                      'operations as soon as the trigger fires')
+]
+
+CONF = cfg.CONF
+CONF.register_opts(dispatch_opts, 'operationengine')
+
+_SPREAD_SLOTS = 1000
+
 
 @six.add_metaclass(ABCMeta)
 class BaseExecutor(object):
@@ -25,6 +47,23 @@ class BaseExecutor(object):
         self._operation_manager = operation_manager
         super(BaseExecutor, self).__init__()
 
+    @staticmethod
+    def _get_dispatch_delay(operation_id, expect_start_time, window_time):
+        """Get the seconds to wait before running an operation
+
+        The operations of a trigger are spread over the beginning of its
+        window, with an offset derived from the operation id, so they don't
+        all start at the same time and still run within the window.
+        """
+        spread = CONF.operationengine.dispatch_spread
+        if not spread or not window_time:
+            return 0
+
+        slot = utils.get_shard(operation_id, _SPREAD_SLOTS)
+        offset = window_time * spread * slot / _SPREAD_SLOTS
+        run_time = expect_start_time + timedelta(seconds=offset)
+        return max(0, timeutils.delta_seconds(datetime.utcnow(), run_time))
+
     @abstractmethod
     def execute_operation(self, operation_id, triggered_time,
                           expect_start_time, window_time, **kwargs):
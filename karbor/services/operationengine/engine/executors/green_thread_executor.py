@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import eventlet
 import greenlet
 
@@ -21,6 +22,7 @@ from oslo_utils import timeutils
 
 from karbor.common import constants
 from karbor import context
+from karbor import db
 from karbor import objects
 from karbor.services.operationengine.engine.executors import base
 
@@ -28,9 +30,15 @@ from karbor.services.operationengine.engine.executors import base
 green_thread_executor_opts = [
     cfg.IntOpt('max_concurrent_operations',
                default=0,
-               help='number of maximum concurrent running operations,'
+               help='number of maximum concurrent running operations, '
+                    'the next ones wait until their end time for run. '
                     '0 means no hard limit'
-               )
+               ),
+    cfg.FloatOpt('state_update_interval',
+                 default=0.5,
+                 min=0,
+                 help='Seconds during which the states of the finished '
+                      'operations are collected to be saved at once')
 ]
 
 CONF = cfg.CONF
@@ -44,6 +52,12 @@ class GreenThreadExecutor(base.BaseExecutor):
     def __init__(self, operation_manager):
         super(GreenThreadExecutor, self).__init__(operation_manager)
         self._operation_thread_map = {}
+        self._num_running = 0
+        self._pending = collections.deque()
+        # operation id -> timer submitting the operation after its delay
+        self._delayed = {}
+        self._registered_ids = set()
+        self._state_update_thread = None
 
     def execute_operation(self, operation_id, triggered_time,
                           expect_start_time, window_time, **kwargs):
@@ -53,11 +67,6 @@ class GreenThreadExecutor(base.BaseExecutor):
                         " finished", operation_id)
             return
 
-        num = CONF.operationengine.max_concurrent_operations
-        if num and len(self._operation_thread_map) >= num:
-            LOG.warning("The amount of concurrent running operations "
-                        "exceeds %d", num)
-            return
         self._operation_thread_map[operation_id] = None
 
         end_time_for_run = expect_start_time + timedelta(seconds=window_time)
@@ -85,12 +94,9 @@ class GreenThreadExecutor(base.BaseExecutor):
             'window_time': window_time,
             'run_type': constants.OPERATION_RUN_TYPE_EXECUTE
         }
-        try:
-            self._create_thread(self._run_operation, operation_id, param)
-        except Exception:
-            self._operation_thread_map.pop(operation_id, None)
-            LOG.exception("Execute operation (%s), and create green thread "
-                          "failed", operation_id)
+        delay = self._get_dispatch_delay(operation_id, expect_start_time,
+                                         window_time)
+        self._submit(operation_id, param, end_time_for_run, delay)
 
     def cancel_operation(self, operation_id):
         gt = self._operation_thread_map.get(operation_id, None)
@@ -99,6 +105,10 @@ class GreenThreadExecutor(base.BaseExecutor):
             # else, it will run until finishes its work.
             gt.cancel()
         else:
+            # A deferred operation is skipped once it is dequeued.
+            timer = self._delayed.pop(operation_id, None)
+            if timer is not None:
+                timer.cancel()
             self._operation_thread_map.pop(operation_id, None)
 
     def resume_operation(self, operation_id, **kwargs):
@@ -115,10 +125,17 @@ class GreenThreadExecutor(base.BaseExecutor):
             'window_time': window,
             'run_type': constants.OPERATION_RUN_TYPE_RESUME
         }
-        self._create_thread(self._run_operation, operation_id, param)
+        self._operation_thread_map[operation_id] = None
+        self._submit(operation_id, param, end_time)
 
     def shutdown(self):
-        for op_id, gt in self._operation_thread_map.items():
+        # The deferred operations are left in running state, they are
+        # resumed when the engine restarts.
+        self._pending.clear()
+        for timer in self._delayed.values():
+            timer.cancel()
+        self._delayed.clear()
+        for op_id, gt in list(self._operation_thread_map.items()):
             if gt is None:
                 continue
 
@@ -129,6 +146,57 @@ class GreenThreadExecutor(base.BaseExecutor):
                 pass
 
         self._operation_thread_map = {}
+        if self._state_update_thread is not None:
+            self._state_update_thread.cancel()
+            self._state_update_thread = None
+        self._update_registered_states()
+
+    def _submit(self, operation_id, param, end_time_for_run, delay=0):
+        """Run the operation, or defer it when no more can run now
+
+        A delayed operation is submitted once its delay expires, it does
+        not take the place of a running operation while it waits.
+        """
+        if delay:
+            self._delayed[operation_id] = eventlet.spawn_after(
+                delay, self._submit_delayed, operation_id, param,
+                end_time_for_run)
+            return
+
+        num = CONF.operationengine.max_concurrent_operations
+        if num and self._num_running >= num:
+            LOG.debug("The amount of concurrent running operations "
+                      "exceeds %(num)d, deferring operation(%(op_id)s)",
+                      {'num': num, 'op_id': operation_id})
+            self._pending.append((operation_id, param, end_time_for_run))
+            return
+
+        try:
+            self._create_thread(self._run_operation, operation_id, param)
+        except Exception:
+            self._operation_thread_map.pop(operation_id, None)
+            LOG.exception("Execute operation (%s), and create green thread "
+                          "failed", operation_id)
+
+    def _submit_delayed(self, operation_id, param, end_time_for_run):
+        del self._delayed[operation_id]
+        self._submit(operation_id, param, end_time_for_run)
+
+    def _submit_pending(self):
+        num = CONF.operationengine.max_concurrent_operations
+        while self._pending and not (num and self._num_running >= num):
+            operation_id, param, end_time_for_run = self._pending.popleft()
+            if operation_id not in self._operation_thread_map:
+                continue
+
+            if datetime.utcnow() > end_time_for_run:
+                LOG.warning("Operation(%s) was deferred beyond its end time "
+                            "for run, dropping it", operation_id)
+                self._operation_thread_map.pop(operation_id, None)
+                self._set_registered(operation_id)
+                continue
+
+            self._submit(operation_id, param, end_time_for_run)
 
     def _run_operation(self, operation_id, param):
 
@@ -155,34 +223,60 @@ class GreenThreadExecutor(base.BaseExecutor):
                 LOG.exception("Run operation(%s) failed", operation_id)
 
         finally:
-            self._update_operation_state(
-                operation_id,
-                {'state': constants.OPERATION_STATE_REGISTERED})
+            self._set_registered(operation_id)
 
     def _update_operation_state(self, operation_id, updates):
 
+        self._registered_ids.discard(operation_id)
         ctxt = context.get_admin_context()
         try:
-            state_ref = objects.ScheduledOperationState.get_by_operation_id(
-                ctxt, operation_id)
-            for item, value in updates.items():
-                setattr(state_ref, item, value)
-            state_ref.save()
+            updated = db.scheduled_operation_state_update_all(
+                ctxt, [operation_id], updates)
         except Exception:
             LOG.exception("Execute operation(%s), update state failed",
                           operation_id)
             return False
+        if not updated:
+            LOG.error("Execute operation(%s), state not found",
+                      operation_id)
+            return False
         return True
 
+    def _set_registered(self, operation_id):
+        """Set the operation back to registered state, in a later batch"""
+        self._registered_ids.add(operation_id)
+        if self._state_update_thread is None:
+            self._state_update_thread = eventlet.spawn_after(
+                CONF.operationengine.state_update_interval,
+                self._update_registered_states)
+
+    def _update_registered_states(self):
+        self._state_update_thread = None
+        operation_ids = list(self._registered_ids)
+        self._registered_ids.clear()
+        if not operation_ids:
+            return
+
+        try:
+            db.scheduled_operation_state_update_all(
+                context.get_admin_context(), operation_ids,
+                {'state': constants.OPERATION_STATE_REGISTERED})
+        except Exception:
+            LOG.exception("Update state of operations(%s) failed",
+                          operation_ids)
+
     def _on_gt_done(self, gt, *args, **kwargs):
         op_id = args[0]
+        self._num_running -= 1
         try:
             del self._operation_thread_map[op_id]
         except Exception:
             LOG.warning("Unknown operation id(%s) received, "
                         "when the green thread exit", op_id)
+        self._submit_pending()
 
     def _create_thread(self, function, operation_id, param):
         gt = eventlet.spawn(function, operation_id, param)
         self._operation_thread_map[operation_id] = gt
+        self._num_running += 1
         gt.link(self._on_gt_done, operation_id)
@@ -55,7 +55,10 @@ class ScheduledOperationExecutor(base.BaseExecutor):
             'window_time': window_time,
             'run_type': constants.OPERATION_RUN_TYPE_EXECUTE
         }
-        self._execute_operation(operation_id, self._run_operation, param)
+        delay = self._get_dispatch_delay(operation_id, expect_start_time,
+                                         window_time)
+        self._execute_operation(operation_id, self._run_operation, param,
+                                delay)
 
     def resume_operation(self, operation_id, **kwargs):
         end_time = kwargs.get('end_time_for_run')
@@ -122,7 +125,8 @@ class ScheduledOperationExecutor(base.BaseExecutor):
         return True
 
     @abstractmethod
-    def _execute_operation(self, operation_id, funtion, param):
+    def _execute_operation(self, operation_id, funtion, param, delay=0):
+        """Run function after delay seconds"""
         pass
 
     @abstractmethod
@@ -14,6 +14,7 @@ from collections import defaultdict
 from concurrent import futures
 from oslo_config import cfg
 from oslo_log import log as logging
+import threading
 from threading import RLock
 
 from karbor.services.operationengine.engine.executors import \
@@ -67,23 +68,33 @@ class ThreadPoolExecutor(base_executor.ScheduledOperationExecutor):
             return any(self._check_functions[item](operation_id)
                        for item in check_items)
 
-    def _execute_operation(self, operation_id, function, param):
+    def _execute_operation(self, operation_id, function, param, delay=0):
 
         def callback(f):
             self._finish_operation(operation_id)
 
-        with self._lock:
-            self._operation_to_run[operation_id] += 1
-
+        def submit():
             try:
                 f = self._pool.submit(function, operation_id, param)
                 f.add_done_callback(callback)
 
             except Exception:
-                self._operation_to_run[operation_id] -= 1
-                LOG.exception("Submit operation(%(o_id)s) failed.",
+                self._finish_operation(operation_id)
+                LOG.exception("Submit operation(%s) failed.",
                               operation_id)
 
+        with self._lock:
+            self._operation_to_run[operation_id] += 1
+
+        if delay:
+            # Wait outside of the pool, so the delayed operations don't
+            # hold its threads.
+            timer = threading.Timer(delay, submit)
+            timer.daemon = True
+            timer.start()
+        else:
+            submit()
+
     def _finish_operation(self, operation_id):
         with self._lock:
             self._operation_to_run[operation_id] -= 1
@@ -57,6 +57,19 @@ class BaseTrigger(object):
     def check_configuration(cls):
         pass
 
+    @classmethod
+    def restore_triggers(cls, triggers, executor):
+        """Create the objects of triggers which already exist
+
+        Called with batches of triggers when the engine starts, so
+        subclasses can load in bulk what the triggers need.
+
+        :param triggers: list of (trigger_id, trigger_property) tuples
+        :returns: list of the trigger objects
+        """
+        return [cls(trigger_id, trigger_property, executor)
+                for trigger_id, trigger_property in triggers]
+
     def has_operations(self):
         return (len(self._operation_ids) != 0)
 
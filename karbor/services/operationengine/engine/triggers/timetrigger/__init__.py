@@ -36,6 +36,17 @@ time_trigger_opts = [
                help='Interval, in seconds, in which Karbor will poll for '
                     'trigger events'),
 
+    cfg.IntOpt('trigger_claim_batch_size',
+               default=100,
+               help='Maximum number of due trigger executions a multi_node '
+                    'operation engine claims from the database at once'),
+
+    cfg.BoolOpt('trigger_sharding',
+                default=True,
+                help='Whether multi_node operation engines split the trigger '
+                     'executions between the live engines with a consistent '
+                     'hash, instead of all of them polling every trigger'),
+
     cfg.StrOpt('scheduling_strategy',
                default='multi_node',
                help='Time trigger scheduling strategy '
@@ -0,0 +1,46 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import hashlib
+
+
+class HashRing(object):
+    """Consistent hash ring of nodes
+
+    Each node is placed at several points of the ring and a key belongs to
+    the node of the first point following the hash of the key. When a node
+    joins or leaves the ring, only the keys next to its points move.
+    """
+
+    def __init__(self, nodes, replicas=32):
+        super(HashRing, self).__init__()
+        self.nodes = frozenset(nodes)
+        self._ring = sorted(
+            (self._hash('%s-%d' % (node, replica)), node)
+            for node in self.nodes for replica in range(replicas))
+        self._points = [point for point, node in self._ring]
+
+    @staticmethod
+    def _hash(key):
+        return int(hashlib.md5(key.encode('utf-8')).hexdigest(), 16)
+
+    def get_node(self, key):
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._points, self._hash(key))
+        return self._ring[index % len(self._ring)][1]
+
+    def get_shards(self, node, shards):
+        """List the shards, out of range(shards), belonging to node"""
+        return [shard for shard in range(shards)
+                if self.get_node(str(shard)) == node]
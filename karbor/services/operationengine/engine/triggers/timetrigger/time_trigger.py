@@ -13,7 +13,10 @@
 from datetime import datetime
 from datetime import timedelta
 import eventlet
+from eventlet import event
 import functools
+import heapq
+import itertools
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -28,22 +31,83 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
-class TriggerOperationGreenThread(object):
-    def __init__(self, first_run_time, function):
-        super(TriggerOperationGreenThread, self).__init__()
-        self._is_sleeping = True
-        self._pre_run_time = None
-        self._running = False
+class TriggerScheduler(object):
+    """Runs the time triggers from a single greenthread
+
+    The next run times of the triggers are kept in a heap. The scheduler
+    sleeps until the earliest one and spawns a greenthread which triggers
+    the operations of that job, so the number of sleeping greenthreads
+    does not grow with the number of triggers. Removed or rescheduled
+    entries are only marked as cancelled and dropped when they reach the
+    top of the heap.
+    """
+
+    def __init__(self):
+        super(TriggerScheduler, self).__init__()
+        self._heap = []
+        self._counter = itertools.count()
+        self._wakeup = event.Event()
         self._thread = None
 
+    def add(self, job, run_time):
+        entry = [run_time, next(self._counter), job]
+        job.entry = entry
+        heapq.heappush(self._heap, entry)
+        if self._thread is None:
+            self._thread = eventlet.spawn(self._run)
+        elif self._heap[0] is entry and not self._wakeup.ready():
+            self._wakeup.send()
+
+    def remove(self, job):
+        if job.entry is not None:
+            job.entry[2] = None
+            job.entry = None
+
+    def _run(self):
+        try:
+            while self._heap:
+                run_time, _, job = self._heap[0]
+                if job is None:
+                    heapq.heappop(self._heap)
+                    continue
+
+                now = timeutils.utcnow()
+                idle_time = 0 if run_time <= now else int(
+                    timeutils.delta_seconds(now, run_time))
+                if idle_time > 0:
+                    self._sleep(idle_time)
+                    continue
+
+                heapq.heappop(self._heap)
+                job.entry = None
+                eventlet.spawn_n(job.fire, run_time)
+        finally:
+            self._thread = None
+
+    def _sleep(self, seconds):
+        """Sleep for seconds or until add() puts an earlier job first"""
+        self._wakeup = event.Event()
+        with eventlet.Timeout(seconds, False):
+            self._wakeup.wait()
+
+
+class TriggerOperationJob(object):
+    """The schedule of one time trigger in a TriggerScheduler"""
+
+    def __init__(self, scheduler, first_run_time, function):
+        super(TriggerOperationJob, self).__init__()
+        self.entry = None
+        self._scheduler = scheduler
+        self._pre_run_time = None
+        self._running = True
+
         self._function = function
 
-        self._start(first_run_time)
+        self._scheduler.add(self, first_run_time)
 
     def kill(self):
         self._running = False
-        if self._is_sleeping:
-            self._thread.kill()
+        self._scheduler.remove(self)
 
     @property
     def running(self):
@@ -53,44 +117,30 @@ class TriggerOperationGreenThread(object):
     def pre_run_time(self):
         return self._pre_run_time
 
-    def _start(self, first_run_time):
-        self._running = True
-
-        now = datetime.utcnow()
-        initial_delay = 0 if first_run_time <= now else (
-            int(timeutils.delta_seconds(now, first_run_time)))
-
-        self._thread = eventlet.spawn_after(
-            initial_delay, self._run, first_run_time)
-        self._thread.link(self._on_done)
-
-    def _on_done(self, gt, *args, **kwargs):
-        self._is_sleeping = True
-        self._pre_run_time = None
-        self._running = False
-        self._thread = None
-
-    def _run(self, expect_run_time):
-        while self._running:
-            self._is_sleeping = False
-            self._pre_run_time = expect_run_time
-
-            expect_run_time = self._function(expect_run_time)
-            if expect_run_time is None or not self._running:
-                break
+    def fire(self, expect_run_time):
+        if not self._running:
+            return
 
-            self._is_sleeping = True
+        self._pre_run_time = expect_run_time
+        try:
+            next_run_time = self._function(expect_run_time)
+        except Exception:
+            LOG.exception("Trigger operations failed")
+            next_run_time = None
 
-            now = datetime.utcnow()
-            idle_time = 0 if expect_run_time <= now else int(
-                timeutils.delta_seconds(now, expect_run_time))
-            eventlet.sleep(idle_time)
+        if next_run_time is None or not self._running:
+            self._pre_run_time = None
+            self._running = False
+            return
+        self._scheduler.add(self, next_run_time)
 
 
 class TimeTrigger(triggers.BaseTrigger):
     TRIGGER_TYPE = "time"
     IS_ENABLED = (CONF.scheduling_strategy == 'default')
 
+    _scheduler = TriggerScheduler()
+
     def __init__(self, trigger_id, trigger_property, executor):
         super(TimeTrigger, self).__init__(
             trigger_id, trigger_property, executor)
@@ -98,22 +148,22 @@ class TimeTrigger(triggers.BaseTrigger):
         self._trigger_property = self.check_trigger_definition(
             trigger_property)
 
-        self._greenthread = None
+        self._job = None
 
     def shutdown(self):
-        self._kill_greenthread()
+        self._kill_job()
 
     def register_operation(self, operation_id, **kwargs):
         if operation_id in self._operation_ids:
             msg = (_("The operation_id(%s) is exist") % operation_id)
             raise exception.ScheduledOperationExist(msg)
 
-        if self._greenthread and not self._greenthread.running:
+        if self._job and not self._job.running:
             raise exception.TriggerIsInvalid(trigger_id=self._id)
 
         self._operation_ids.add(operation_id)
-        if self._greenthread is None:
-            self._start_greenthread()
+        if self._job is None:
+            self._start_job()
 
     def unregister_operation(self, operation_id, **kwargs):
         if operation_id not in self._operation_ids:
@@ -121,7 +171,7 @@ class TimeTrigger(triggers.BaseTrigger):
 
         self._operation_ids.remove(operation_id)
         if 0 == len(self._operation_ids):
-            self._kill_greenthread()
+            self._kill_job()
 
     def update_trigger_property(self, trigger_property):
         valid_trigger_property = self.check_trigger_definition(
@@ -138,8 +188,8 @@ class TimeTrigger(triggers.BaseTrigger):
                      "Can not find the first run time"))
             raise exception.InvalidInput(msg)
 
-        if self._greenthread is not None:
-            pre_run_time = self._greenthread.pre_run_time
+        if self._job is not None:
+            pre_run_time = self._job.pre_run_time
             if pre_run_time:
                 end_time = pre_run_time + timedelta(
                     seconds=self._trigger_property['window'])
@@ -152,17 +202,17 @@ class TimeTrigger(triggers.BaseTrigger):
         self._trigger_property = valid_trigger_property
 
         if len(self._operation_ids) > 0:
-            # Restart greenthread to take the change of trigger property
+            # Reschedule the job to take the change of trigger property
             # effect immediately
-            self._kill_greenthread()
-            self._create_green_thread(first_run_time, timer)
+            self._kill_job()
+            self._create_job(first_run_time, timer)
 
-    def _kill_greenthread(self):
-        if self._greenthread:
-            self._greenthread.kill()
-            self._greenthread = None
+    def _kill_job(self):
+        if self._job:
+            self._job.kill()
+            self._job = None
 
-    def _start_greenthread(self):
+    def _start_job(self):
         # Find the first time.
         # We don't known when using this trigger first time.
         timer = self._get_timer(self._trigger_property)
@@ -171,16 +221,16 @@ class TimeTrigger(triggers.BaseTrigger):
         if not first_run_time:
             raise exception.TriggerIsInvalid(trigger_id=self._id)
 
-        self._create_green_thread(first_run_time, timer)
+        self._create_job(first_run_time, timer)
 
-    def _create_green_thread(self, first_run_time, timer):
+    def _create_job(self, first_run_time, timer):
         func = functools.partial(
             self._trigger_operations,
             trigger_property=self._trigger_property.copy(),
             timer=timer)
 
-        self._greenthread = TriggerOperationGreenThread(
-            first_run_time, func)
+        self._job = TriggerOperationJob(
+            self._scheduler, first_run_time, func)
 
     def _trigger_operations(self, expect_run_time, trigger_property, timer):
         """Trigger operations once
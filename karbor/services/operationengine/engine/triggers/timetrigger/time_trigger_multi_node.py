@@ -12,17 +12,22 @@
 
 from datetime import datetime
 from datetime import timedelta
+import functools
 
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_service import loopingcall
 
+from karbor.common import constants
 from karbor import context as karbor_context
 from karbor import db
 from karbor import exception
 from karbor.i18n import _
 from karbor.services.operationengine.engine import triggers
+from karbor.services.operationengine.engine.triggers.timetrigger import \
+    hash_ring
 from karbor.services.operationengine.engine.triggers.timetrigger import utils
+from karbor import utils as karbor_utils
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -35,20 +40,24 @@ class TimeTrigger(triggers.BaseTrigger):
 
     _loopingcall = None
     _triggers = {}
+    _hash_ring = None
 
-    def __init__(self, trigger_id, trigger_property, executor):
+    def __init__(self, trigger_id, trigger_property, executor,
+                 create_execution=True):
         super(TimeTrigger, self).__init__(
             trigger_id, trigger_property, executor)
 
         self._trigger_property = self.check_trigger_definition(
             trigger_property)
 
-        timer = self._get_timer(self._trigger_property)
-        first_run_time = self._compute_next_run_time(
-            datetime.utcnow(), self._trigger_property['end_time'], timer)
-        LOG.debug("first_run_time: %s", first_run_time)
+        self._timer = self._get_timer(self._trigger_property)
+        if create_execution:
+            first_run_time = self._compute_next_run_time(
+                datetime.utcnow(), self._trigger_property['end_time'],
+                self._timer)
+            LOG.debug("first_run_time: %s", first_run_time)
 
-        self._trigger_execution_new(self._id, first_run_time)
+            self._trigger_execution_new(self._id, first_run_time)
 
         if not self.__class__._loopingcall:
             self.__class__._loopingcall = loopingcall.FixedIntervalLoopingCall(
@@ -60,6 +69,21 @@ class TimeTrigger(triggers.BaseTrigger):
 
         self._register()
 
+    @classmethod
+    def restore_triggers(cls, triggers, executor):
+        """Create existing triggers, keeping their scheduled executions
+
+        The executions survive the engines, so only the triggers which
+        have none get a new one.
+        """
+        ctxt = karbor_context.get_admin_context()
+        executions = db.trigger_execution_get_by_trigger_ids(
+            ctxt, [trigger_id for trigger_id, _ in triggers])
+        scheduled = {execution.trigger_id for execution in executions}
+        return [cls(trigger_id, trigger_property, executor,
+                    create_execution=trigger_id not in scheduled)
+                for trigger_id, trigger_property in triggers]
+
     def _register(self):
         self.__class__._triggers[self._id] = self
 
@@ -70,64 +94,89 @@ class TimeTrigger(triggers.BaseTrigger):
     def _loop(cls):
         while True:
             now = datetime.utcnow()
-            exec_to_handle = cls._trigger_execution_get_next()
-            if not exec_to_handle:
+            try:
+                claimed, selected = cls._trigger_execution_claim_due(now)
+            except Exception:
+                # Logged by the claim, retried on the next interval
+                break
+            if not selected:
                 LOG.debug("No next trigger executions")
                 break
 
-            trigger_id = exec_to_handle.trigger_id
-            execution_time = exec_to_handle.execution_time
-            trigger = cls._triggers.get(trigger_id)
-            if not trigger:
-                LOG.warning("Unable to find trigger %s", trigger_id)
-                res = cls._trigger_execution_delete(
-                    execution_id=exec_to_handle.id)
-                continue
+            for execution, next_exec_time in claimed:
+                trigger_id = execution.trigger_id
+                execution_time = execution.execution_time
+                trigger = cls._triggers.get(trigger_id)
+                if not trigger:
+                    continue
+
+                if next_exec_time:
+                    LOG.debug("Rescheduled (%s) from %s to %s",
+                              trigger_id,
+                              execution_time,
+                              next_exec_time)
+                else:
+                    LOG.debug("No more planned executions for trigger (%s)",
+                              trigger_id)
+
+                window = trigger._trigger_property.get("window")
+                end_time_to_run = execution_time + timedelta(
+                    seconds=window)
+                if now > end_time_to_run:
+                    LOG.debug("Time trigger (%s) out of window", trigger_id)
+                    continue
 
-            if now < execution_time:
-                LOG.debug("Time trigger not yet due")
+                LOG.debug("Time trigger (%s) is due", trigger_id)
+                cls._trigger_operations(trigger_id, execution_time, window)
+
+            # The executions claimed by other engines or failing to be
+            # rescheduled are not returned, more may still be due
+            if selected < CONF.trigger_claim_batch_size:
                 break
 
-            trigger_property = trigger._trigger_property
-            timer = cls._get_timer(trigger_property)
-            window = trigger_property.get("window")
-            end_time_to_run = execution_time + timedelta(
-                seconds=window)
+    @classmethod
+    def _get_owned_shards(cls):
+        """List the shards of trigger executions this engine claims
 
-            if now > end_time_to_run:
-                LOG.debug("Time trigger (%s) out of window",)
-                execute = False
-            else:
-                LOG.debug("Time trigger (%s) is due", trigger_id)
-                execute = True
+        The shards are spread over the live operation engines, so an
+        engine which stops heartbeating has its shards taken over by the
+        others once it is considered down. Returns None, claiming all the
+        shards, when sharding is disabled or the engines can't be listed.
+        """
+        if not CONF.trigger_sharding:
+            return None
 
-            next_exec_time = cls._compute_next_run_time(
-                now,
-                trigger_property['end_time'],
-                timer,
-            )
-            if not next_exec_time:
-                LOG.debug("No more planned executions for trigger (%s)",
-                          trigger_id)
-                res = cls._trigger_execution_delete(
-                    execution_id=exec_to_handle.id)
-            else:
-                LOG.debug("Rescheduling (%s) from %s to %s",
-                          trigger_id,
-                          execution_time,
-                          next_exec_time)
-                res = cls._trigger_execution_update(
-                    exec_to_handle.id,
-                    execution_time,
-                    next_exec_time,
-                )
-
-            if not res:
-                LOG.info("Trigger probably handled by another node")
-                continue
+        ctxt = karbor_context.get_admin_context()
+        try:
+            services = db.service_get_all_by_topic(
+                ctxt, CONF.operationengine_topic, disabled=False)
+        except Exception:
+            LOG.exception("Unable to list the operation engines, claiming "
+                          "all the trigger executions")
+            return None
+
+        hosts = {service['host'] for service in services
+                 if karbor_utils.service_is_up(service)}
+        hosts.add(CONF.host)
+        if cls._hash_ring is None or cls._hash_ring.nodes != hosts:
+            LOG.info("Spreading trigger executions over operation engines: "
+                     "%s", sorted(hosts))
+            cls._hash_ring = hash_ring.HashRing(hosts)
+        return cls._hash_ring.get_shards(CONF.host,
+                                         constants.TRIGGER_EXECUTION_SHARDS)
 
-            if execute:
-                cls._trigger_operations(trigger_id, execution_time, window)
+    @classmethod
+    def _get_next_execution_time(cls, execution, now):
+        trigger = cls._triggers.get(execution.trigger_id)
+        if not trigger:
+            LOG.warning("Unable to find trigger %s", execution.trigger_id)
+            return None
+
+        return cls._compute_next_run_time(
+            now,
+            trigger._trigger_property['end_time'],
+            trigger._timer,
+        )
 
     @classmethod
     def _trigger_execution_new(cls, trigger_id, time):
@@ -141,9 +190,13 @@ class TimeTrigger(triggers.BaseTrigger):
             return False
 
     @classmethod
-    def _trigger_execution_update(cls, id, current_time, next_time):
+    def _trigger_execution_claim_due(cls, now):
         ctxt = karbor_context.get_admin_context()
-        return db.trigger_execution_update(ctxt, id, current_time, next_time)
+        return db.trigger_execution_claim_due(
+            ctxt, now, CONF.trigger_claim_batch_size,
+            functools.partial(cls._get_next_execution_time, now=now),
+            shards=cls._get_owned_shards(),
+            retry_time=now + timedelta(seconds=CONF.trigger_poll_interval))
 
     @classmethod
     def _trigger_execution_delete(cls, execution_id=None, trigger_id=None):
@@ -155,11 +208,6 @@ class TimeTrigger(triggers.BaseTrigger):
                                                   trigger_id)
         return num_deleted > 0
 
-    @classmethod
-    def _trigger_execution_get_next(cls):
-        ctxt = karbor_context.get_admin_context()
-        return db.trigger_execution_get_next(ctxt)
-
     def shutdown(self):
         self._unregister()
 
@@ -190,6 +238,7 @@ class TimeTrigger(triggers.BaseTrigger):
             raise exception.InvalidInput(msg)
 
         self._trigger_property = valid_trigger_property
+        self._timer = timer
         self._trigger_execution_delete(trigger_id=self._id)
         self._trigger_execution_new(self._id, first_run_time)
 
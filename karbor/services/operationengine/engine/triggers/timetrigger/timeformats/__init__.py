@@ -15,6 +15,8 @@ time format base class
 """
 
 import abc
+import bisect
+import collections
 import six
 
 
@@ -53,3 +55,56 @@ class TimeFormat(object):
     def get_min_interval(self):
         """Get minimum interval of two adjacent time points"""
         pass
+
+
+class NextTimes(object):
+    """Caches the upcoming time points of a time format
+
+    :param compute_func: callable receiving a time and a count, returning
+        the count first time points after the time, in ascending order
+    :param size: number of time points computed at once
+
+    The cache holds all the time points between the time of the last
+    computation and the last time point it returned, so the next time of
+    any time within this range is found without computing. Times of another
+    timezone than the cached ones are always computed.
+    """
+
+    def __init__(self, compute_func, size=16):
+        super(NextTimes, self).__init__()
+        self._compute_func = compute_func
+        self._size = size
+        self._start = None
+        self._times = []
+
+    def get_next(self, current_time):
+        start, times = self._start, self._times
+        if (start is not None and start.tzinfo is current_time.tzinfo and
+                start <= current_time < (times[-1] if times else start)):
+            return times[bisect.bisect_right(times, current_time)]
+
+        times = self._compute_func(current_time, self._size)
+        self._start, self._times = current_time, times
+        return times[0] if times else None
+
+
+class PatternCache(object):
+    """Bounded LRU cache of the compiled patterns of a time format
+
+    Triggers with identical patterns share the compiled pattern.
+    """
+
+    def __init__(self, compile_func, size=1024):
+        super(PatternCache, self).__init__()
+        self._compile_func = compile_func
+        self._size = size
+        self._compiled = collections.OrderedDict()
+
+    def get(self, pattern):
+        compiled = self._compiled.pop(pattern, None)
+        if compiled is None:
+            compiled = self._compile_func(pattern)
+        self._compiled[pattern] = compiled
+        if len(self._compiled) > self._size:
+            self._compiled.popitem(last=False)
+        return compiled
@@ -9,6 +9,7 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import itertools
 import os
 
 from datetime import timedelta
@@ -41,16 +42,27 @@ RREQ_MAP = {"YEARLY": 0,
             "SECONDLY": 6}
 
 
+def _compile_pattern(pattern):
+    cal = Calendar.from_ical(ICal._decode_calendar_pattern(pattern))
+    vevent = cal.walk('VEVENT')[0]
+    return ICal._get_rrule_str(vevent), ICal._get_min_freq(vevent)
+
+
+_PATTERNS = timeformats.PatternCache(_compile_pattern)
+
+
 class ICal(timeformats.TimeFormat):
     """icalendar."""
 
     def __init__(self, start_time, pattern):
         super(ICal, self).__init__(start_time, pattern)
-        cal = Calendar.from_ical(self._decode_calendar_pattern(pattern))
-        vevent = cal.walk('VEVENT')[0]
+        rrule_str, self.min_freq = _PATTERNS.get(pattern)
         self.dtstart = start_time
-        self.min_freq = self._get_min_freq(vevent)
-        self.rrule_obj = self._get_rrule_obj(vevent, start_time)
+        self.rrule_obj = rrule.rrulestr(rrule_str, dtstart=start_time,
+                                        cache=False)
+        self._next_times = timeformats.NextTimes(self._compute_next_times)
+        self._min_interval = None
+        self._min_interval_computed = False
 
     @staticmethod
     def _decode_calendar_pattern(pattern):
@@ -62,12 +74,11 @@ class ICal(timeformats.TimeFormat):
             return pattern
 
     @staticmethod
-    def _get_rrule_obj(vevent, dtstart):
+    def _get_rrule_str(vevent):
         rrules = vevent.get('RRULE')
         rrule_list = rrules if isinstance(rrules, list) else [rrules]
-        rrule_str = os.linesep.join(recur.to_ical().decode("utf-8")
-                                    for recur in rrule_list)
-        return rrule.rrulestr(rrule_str, dtstart=dtstart, cache=False)
+        return os.linesep.join(recur.to_ical().decode("utf-8")
+                               for recur in rrule_list)
 
     @staticmethod
     def _get_min_freq(vevent):
@@ -112,8 +123,11 @@ class ICal(timeformats.TimeFormat):
         :return: datetime or None
 
         """
-        next_time = self.rrule_obj.after(current_time)
-        return next_time if next_time else None
+        return self._next_times.get_next(current_time)
+
+    def _compute_next_times(self, current_time, count):
+        return list(itertools.islice(self.rrule_obj.xafter(current_time),
+                                     count))
 
     def get_min_interval(self):
         """Get minimum interval of two adjacent time points
@@ -121,6 +135,12 @@ class ICal(timeformats.TimeFormat):
         :return: int(seconds) or None
 
         """
+        if not self._min_interval_computed:
+            self._min_interval = self._compute_min_interval()
+            self._min_interval_computed = True
+        return self._min_interval
+
+    def _compute_min_interval(self):
         gen = self.rrule_obj
         kwargs = FREQ_TO_KWARGS[self.min_freq]
         endtime = self.dtstart + timedelta(**kwargs)
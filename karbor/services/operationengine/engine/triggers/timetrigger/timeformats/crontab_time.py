@@ -20,11 +20,23 @@ from karbor.services.operationengine.engine.triggers.timetrigger import \
     timeformats
 
 
+def _compile_pattern(pattern):
+    def _compute_next_times(current_time, count):
+        cron = croniter(pattern, current_time)
+        return [cron.get_next(datetime) for _ in range(count)]
+
+    return timeformats.NextTimes(_compute_next_times)
+
+
+_PATTERNS = timeformats.PatternCache(_compile_pattern)
+
+
 class Crontab(timeformats.TimeFormat):
 
     def __init__(self, start_time, pattern):
         self._start_time = start_time
         self._pattern = pattern
+        self._next_times = _PATTERNS.get(pattern)
         super(Crontab, self).__init__(start_time, pattern)
 
     @classmethod
@@ -42,7 +54,7 @@ class Crontab(timeformats.TimeFormat):
     def compute_next_time(self, current_time):
         time = current_time if current_time >= self._start_time else (
             self._start_time)
-        return croniter(self._pattern, time).get_next(datetime)
+        return self._next_times.get_next(time)
 
     def get_min_interval(self):
         try:
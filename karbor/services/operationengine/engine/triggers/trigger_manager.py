@@ -14,6 +14,8 @@
 Manage all triggers.
 """
 
+import collections
+
 from karbor import exception
 from karbor.i18n import _
 from karbor.services.operationengine.engine import triggers as all_triggers
@@ -70,6 +72,27 @@ class TriggerManager(object):
         trigger = trigger_cls(trigger_id, trigger_property, self._executor)
         self._trigger_obj_map[trigger_id] = trigger
 
+    def restore_triggers(self, triggers):
+        """Add a batch of existing triggers
+
+        :param triggers: list of (trigger_id, trigger_type, trigger_property)
+                         tuples
+        """
+        triggers_by_cls = collections.OrderedDict()
+        for trigger_id, trigger_type, trigger_property in triggers:
+            if trigger_id in self._trigger_obj_map:
+                msg = (_("Trigger id(%s) is exist") % trigger_id)
+                raise exception.InvalidInput(msg)
+
+            trigger_cls = self._get_trigger_class(trigger_type)
+            triggers_by_cls.setdefault(trigger_cls, []).append(
+                (trigger_id, trigger_property))
+
+        for trigger_cls, cls_triggers in triggers_by_cls.items():
+            for trigger in trigger_cls.restore_triggers(cls_triggers,
+                                                        self._executor):
+                self._trigger_obj_map[trigger._id] = trigger
+
     def remove_trigger(self, trigger_id):
         trigger = self._trigger_obj_map.get(trigger_id, None)
         if not trigger:
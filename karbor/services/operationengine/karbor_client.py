@@ -25,7 +25,15 @@ CONF.register_opts(config.service_client_opts,
                    group=CONFIG_GROUP)
 
 
+_karbor_endpoint = None
+
+
 def get_karbor_endpoint():
+    """Get the karbor endpoint template, looked up in Keystone once"""
+    global _karbor_endpoint
+    if _karbor_endpoint:
+        return _karbor_endpoint
+
     try:
         sc_cfg = CONF[CONFIG_GROUP]
         kc_plugin = karbor_keystone_plugin.KarborKeystonePlugin()
@@ -33,7 +41,8 @@ def get_karbor_endpoint():
             sc_cfg.service_name, sc_cfg.service_type,
             sc_cfg.region_id, sc_cfg.interface)
 
-        return url.replace("$(", "%(")
+        _karbor_endpoint = url.replace("$(", "%(")
+        return _karbor_endpoint
     except Exception:
         raise
 
@@ -14,9 +14,12 @@
 OperationEngine Service
 """
 
+import time
+
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging as messaging
+from oslo_service import periodic_task
 from stevedore import driver as import_driver
 
 from karbor.common import constants
@@ -27,6 +30,7 @@ from karbor import objects
 from karbor.services.operationengine.engine.triggers import trigger_manager
 from karbor.services.operationengine import operation_manager
 from karbor.services.operationengine import user_trust_manager
+from karbor import utils
 
 
 LOG = logging.getLogger(__name__)
@@ -36,10 +40,17 @@ trigger_manager_opts = [
     cfg.StrOpt('executor',
                default='green_thread',
                choices=['thread_pool', 'green_thread'],
-               help='The name of executor which is used to run operations')
+               help='The name of executor which is used to run operations'),
+    cfg.IntOpt('restore_batch_size',
+               default=1000,
+               min=1,
+               help='The number of triggers and scheduled operations loaded '
+                    'at once when the operation engine starts')
 ]
 
 cfg.CONF.register_opts(trigger_manager_opts, 'operationengine')
+cfg.CONF.import_opt('operation_log_retention_interval',
+                    'karbor.services.operationengine.operations.base')
 
 
 class OperationEngineManager(manager.Manager):
@@ -57,6 +68,7 @@ class OperationEngineManager(manager.Manager):
         self._user_trust_manager = None
         self._operation_manager = None
         self._executor = None
+        self._last_log_retention = None
 
     @property
     def operation_manager(self):
@@ -98,12 +110,52 @@ class OperationEngineManager(manager.Manager):
             self._trigger_manager.shutdown()
             self._trigger_manager = None
 
+    @periodic_task.periodic_task
+    def _delete_oldest_operation_logs(self, context):
+        """Trim the logs of all the scheduled operations in batches"""
+        interval = cfg.CONF.operation_log_retention_interval
+        if interval <= 0:
+            return
+        now = time.time()
+        if (self._last_log_retention is not None and
+                now - self._last_log_retention < interval):
+            return
+        self._last_log_retention = now
+        if not self._is_log_retention_node(context):
+            return
+        # The operations trim their logs after each run instead
+        if not objects.ScheduledOperationLog.destroy_all_oldest_supported(
+                context):
+            return
+
+        deleted = objects.ScheduledOperationLog.destroy_all_oldest(
+            context, cfg.CONF.retained_operation_log_number,
+            batch_size=cfg.CONF.operation_log_retention_batch_size)
+        if deleted:
+            LOG.info("Deleted %d oldest scheduled operation logs", deleted)
+
+    def _is_log_retention_node(self, context):
+        """Elect the operation engine trimming the scheduled operation logs
+
+        The trim covers the logs of all the operations, so only the live
+        operation engine with the lowest host name runs it.
+        """
+        try:
+            services = objects.ServiceList.get_all_by_topic(
+                context, cfg.CONF.operationengine_topic, disabled=False)
+        except Exception:
+            LOG.exception("Unable to list the operation engines, skipping "
+                          "the scheduled operation log retention")
+            return False
+
+        return utils.is_elected_host(services, cfg.CONF.host)
+
     def _restore(self):
         self._restore_triggers()
         self._restore_operations()
 
     def _restore_triggers(self):
-        limit = 100
+        limit = cfg.CONF.operationengine.restore_batch_size
         marker = None
         filters = {}
         ctxt = karbor_context.get_admin_context()
@@ -113,15 +165,15 @@ class OperationEngineManager(manager.Manager):
             if not triggers:
                 break
 
-            for trigger in triggers:
-                self.trigger_manager.add_trigger(trigger.id, trigger.type,
-                                                 trigger.properties)
+            self.trigger_manager.restore_triggers(
+                [(trigger.id, trigger.type, trigger.properties)
+                 for trigger in triggers])
             if len(triggers) < limit:
                 break
             marker = triggers[-1].id
 
     def _restore_operations(self):
-        limit = 100
+        limit = cfg.CONF.operationengine.restore_batch_size
         marker = None
         filters = {"service_id": self._service_id,
                    "state": [constants.OPERATION_STATE_REGISTERED,
@@ -150,7 +202,7 @@ class OperationEngineManager(manager.Manager):
                     operation.project_id, state.trust_id)
             if len(states) < limit:
                 break
-            marker = states[-1].id
+            marker = states[-1].operation_id
 
     @messaging.expected_exceptions(exception.TriggerNotFound,
                                    exception.InvalidInput,
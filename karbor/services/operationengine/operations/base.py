@@ -24,19 +24,48 @@ from oslo_log import log as logging
 
 from karbor.common import constants
 from karbor import context
+from karbor import exception
+from karbor.i18n import _
 from karbor import objects
+from karbor.policies import providers as provider_policy
 from karbor.services.operationengine import karbor_client
+from karbor.services.protection import api as protection_api
 
 
 record_operation_log_executor_opts = [
     cfg.IntOpt(
         'retained_operation_log_number',
         default=5,
-        help='The number of retained operation log')
+        help='The number of retained operation log'),
+    cfg.IntOpt(
+        'operation_log_retention_interval',
+        default=300,
+        min=0,
+        help='Seconds between two periodic deletions of the oldest '
+             'operation logs of all the scheduled operations. When 0, or '
+             'when the database does not support window functions (MySQL '
+             'before 8.0, MariaDB before 10.2), the oldest logs of an '
+             'operation are deleted after each of its runs instead'),
+    cfg.IntOpt(
+        'operation_log_retention_batch_size',
+        default=1000,
+        min=1,
+        help='The maximum number of operation logs deleted in each '
+             'transaction of the periodic retention')
+]
+
+protect_dispatch_opts = [
+    cfg.BoolOpt(
+        'direct_protect_dispatch',
+        default=False,
+        help='Whether the scheduled protect operations create their '
+             'checkpoints by calling the protection service directly, '
+             'instead of going through the karbor API')
 ]
 
 CONF = cfg.CONF
 CONF.register_opts(record_operation_log_executor_opts)
+CONF.register_opts(protect_dispatch_opts, 'operationengine')
 
 LOG = logging.getLogger(__name__)
 
@@ -49,6 +78,7 @@ class Operation(object):
         super(Operation, self).__init__()
         self._user_trust_manager = user_trust_manager
         self._karbor_endpoint = None
+        self._protection_api = None
 
     @abc.abstractmethod
     def check_operation_definition(self, operation_definition):
@@ -64,6 +94,12 @@ class Operation(object):
             self._karbor_endpoint = karbor_client.get_karbor_endpoint()
         return self._karbor_endpoint
 
+    @property
+    def protection_api(self):
+        if not self._protection_api:
+            self._protection_api = protection_api.API()
+        return self._protection_api
+
     def run(self, operation_definition, **kwargs):
         param = kwargs.get('param')
         operation_id = param.get('operation_id')
@@ -143,11 +179,15 @@ class Operation(object):
 
     def _delete_oldest_operation_log(self, operation_id):
         # delete the oldest logs to keep the number of logs
-        # in a reasonable range
+        # in a reasonable range, unless the periodic retention does it
         try:
+            ctxt = context.get_admin_context()
+            if (CONF.operation_log_retention_interval > 0 and
+                    objects.ScheduledOperationLog.
+                    destroy_all_oldest_supported(ctxt)):
+                return
             objects.ScheduledOperationLog.destroy_oldest(
-                context.get_admin_context(), operation_id,
-                CONF.retained_operation_log_number)
+                ctxt, operation_id, CONF.retained_operation_log_number)
         except Exception:
             pass
 
@@ -198,3 +238,35 @@ class Operation(object):
 
         karbor_url = self.karbor_endpoint % {"project_id": project_id}
         return karbor_client.create(ctx, endpoint=karbor_url)
+
+    def _create_checkpoint(self, param, provider_id, plan_id, extra_info,
+                           client=None):
+        """Create a checkpoint of the plan on behalf of the user
+
+        With direct_protect_dispatch, the protection service is called
+        directly with the context of the user trust, applying the same
+        checks as the karbor API.
+        """
+        user_id = param.get("user_id")
+        project_id = param.get("project_id")
+        if not CONF.operationengine.direct_protect_dispatch:
+            client = client or self._create_karbor_client(user_id,
+                                                          project_id)
+            return client.checkpoints.create(provider_id, plan_id,
+                                             extra_info)
+
+        ctxt = self._user_trust_manager.get_context(user_id, project_id)
+        if not ctxt:
+            msg = "user=%s, project=%s" % (user_id, project_id)
+            raise exception.AuthorizationFailure(obj=msg)
+
+        ctxt.can(provider_policy.CHECKPOINT_CREATE_POLICY)
+        plan = objects.Plan.get_by_id(ctxt, plan_id)
+        if provider_id != plan.provider_id:
+            msg = _("The parameter provider_id is not the same as "
+                    "the value in the plan.")
+            raise exception.InvalidPlan(reason=msg)
+
+        checkpoint_properties = protection_api.get_checkpoint_properties(
+            ctxt, plan, extra_info)
+        return self.protection_api.protect(ctxt, plan, checkpoint_properties)
@@ -49,8 +49,6 @@ class ProtectOperation(base.Operation):
         self._run(operation_definition, param, log_ref)
 
     def _run(self, operation_definition, param, log_ref):
-        client = self._create_karbor_client(
-            param.get("user_id"), param.get("project_id"))
         provider_id = operation_definition.get("provider_id")
         plan_id = operation_definition.get("plan_id")
         trigger_id = param.get("trigger_id", None)
@@ -61,7 +59,8 @@ class ProtectOperation(base.Operation):
             'scheduled_operation_id': scheduled_operation_id
         }
         try:
-            client.checkpoints.create(provider_id, plan_id, extra_info)
+            self._create_checkpoint(param, provider_id, plan_id,
+                                    extra_info)
         except Exception:
             state = constants.OPERATION_EXE_STATE_FAILED
         else:
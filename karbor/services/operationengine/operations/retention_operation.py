@@ -11,6 +11,11 @@
 #    under the License.
 
 from datetime import datetime
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import uuidutils
 
 from karbor.common import constants
@@ -20,6 +25,22 @@ from karbor.i18n import _
 from karbor import objects
 from karbor.services.operationengine.operations import base
 
+retention_opts = [
+    cfg.IntOpt('retention_delete_concurrency',
+               default=4,
+               min=1,
+               help='The maximum number of checkpoints deleted at the same '
+                    'time when applying a retention policy')
+]
+
+CONF = cfg.CONF
+CONF.register_opts(retention_opts, 'operationengine')
+
+LOG = logging.getLogger(__name__)
+
+MAX_BACKUPS = 'max_backups'
+RETENTION_DURATION = 'retention_duration'
+
 
 class RetentionProtectOperation(base.Operation):
     """Protect operation."""
@@ -63,7 +84,8 @@ class RetentionProtectOperation(base.Operation):
             'scheduled_operation_id': scheduled_operation_id
         }
         try:
-            client.checkpoints.create(provider_id, plan_id, extra_info)
+            self._create_checkpoint(param, provider_id, plan_id,
+                                    extra_info, client=client)
         except Exception:
             state = constants.OPERATION_EXE_STATE_FAILED
         else:
@@ -92,35 +114,53 @@ class RetentionProtectOperation(base.Operation):
             reason = _("Failed to get retention_duration")
             raise exception.InvalidOperationDefinition(reason=reason)
 
+        retention_plan = {}
+        failed_ids = set()
         try:
-            self._delete_old_backup_by_max_backups(
-                client, max_backups, project_id, provider_id, plan_id)
-            state = constants.OPERATION_EXE_MAX_BACKUP_STATE_SUCCESS
+            checkpoints = []
+            if max_backups != -1 or retention_duration != -1:
+                checkpoints = self._list_available_checkpoint(
+                    client, project_id, provider_id, plan_id)
+            retention_plan = self._plan_retention(
+                checkpoints, max_backups, retention_duration,
+                datetime.utcnow())
+            failed_ids = self._delete_checkpoints(
+                client, provider_id, set().union(*retention_plan.values()))
         except Exception:
+            LOG.exception("Failed to apply the retention policies of plan "
+                          "%s", plan_id)
+            failed_ids = None
+
+        self._update_operation_log(log_ref, {
+            'extend_info': jsonutils.dumps({
+                'retention_plan': retention_plan,
+                'retention_failed': sorted(failed_ids or [])})})
+
+        if failed_ids is None or failed_ids.intersection(
+                retention_plan.get(MAX_BACKUPS, [])):
             state = constants.OPERATION_EXE_MAX_BACKUP_STATE_FAILED
+            self._update_log_when_operation_finished(log_ref, state)
             reason = (_("Can't execute retention policy provider_id: "
                         "%(provider_id)s plan_id:%(plan_id)s"
                         " max_backups:%(max_backups)s") %
                       {"provider_id": provider_id, "plan_id": plan_id,
                        "max_backups": max_backups})
             raise exception.InvalidOperationDefinition(reason=reason)
-        finally:
-            self._update_log_when_operation_finished(log_ref, state)
+        self._update_log_when_operation_finished(
+            log_ref, constants.OPERATION_EXE_MAX_BACKUP_STATE_SUCCESS)
 
-        try:
-            self._delete_old_backup_by_duration(
-                client, retention_duration, project_id, provider_id, plan_id)
-            state = constants.OPERATION_EXE_DURATION_STATE_SUCCESS
-        except Exception:
+        if failed_ids.intersection(
+                retention_plan.get(RETENTION_DURATION, [])):
             state = constants.OPERATION_EXE_DURATION_STATE_FAILED
+            self._update_log_when_operation_finished(log_ref, state)
             reason = (_("Can't execute retention policy provider_id: "
                         "%(provider_id)s plan_id:%(plan_id)s"
                         " retention_duration:%(retention_duration)s") %
                       {"provider_id": provider_id, "plan_id": plan_id,
                        "retention_duration": retention_duration})
             raise exception.InvalidOperationDefinition(reason=reason)
-        finally:
-            self._update_log_when_operation_finished(log_ref, state)
+        self._update_log_when_operation_finished(
+            log_ref, constants.OPERATION_EXE_DURATION_STATE_SUCCESS)
 
     @staticmethod
     def _list_available_checkpoint(client, project_id,
@@ -147,46 +187,47 @@ class RetentionProtectOperation(base.Operation):
 
         return avi_check
 
-    def _delete_old_backup_by_max_backups(
-            self, client, max_backups, project_id, provider_id, plan_id):
-
-        if max_backups == -1:
-            return
-
-        backup_items = self._list_available_checkpoint(
-            client, project_id, provider_id, plan_id)
-
-        count = len(backup_items)
-        if count > max_backups:
-            for item in backup_items[max_backups:]:
-                try:
-                    client.checkpoints.delete(provider_id, item.id)
-                except Exception as e:
-                    reason = (_("Failed to delete checkpoint: %(cp_id)s by "
-                                "max_backups with the reason: %(reason)s") %
-                              {"cp_id": item.id, "reason": e})
-                    raise exception.InvalidOperationDefinition(reason=reason)
-
-    def _delete_old_backup_by_duration(
-            self, client, retention_duration,
-            project_id, provider_id, plan_id):
-
-        if retention_duration == -1:
-            return
-
-        backup_items = self._list_available_checkpoint(
-            client, project_id, provider_id, plan_id)
-
-        now = datetime.utcnow()
-        for item in backup_items:
-            created_at = datetime.strptime(item.created_at, "%Y-%m-%d")
-            interval = (now - created_at).days
-            if interval > retention_duration:
-                try:
-                    client.checkpoints.delete(provider_id, item.id)
-                except Exception as e:
-                    reason = (_("Failed to delete checkpoint: %(cp_id)s "
-                                "by retention_duration with the reasion: "
-                                "%(reason)s") %
-                              {"cp_id": item.id, "reason": e})
-                    raise exception.InvalidOperationDefinition(reason=reason)
+    @staticmethod
+    def _plan_retention(checkpoints, max_backups, retention_duration, now):
+        """Select the checkpoints to delete according to each policy
+
+        :param checkpoints: available checkpoints, the newest first
+        :returns: dict of the ids of the checkpoints selected by each
+                  policy, keyed by the name of the policy
+        """
+        retention_plan = {}
+        if max_backups != -1:
+            retention_plan[MAX_BACKUPS] = [
+                item.id for item in checkpoints[max_backups:]]
+
+        if retention_duration != -1:
+            retention_plan[RETENTION_DURATION] = [
+                item.id for item in checkpoints
+                if (now - datetime.strptime(
+                    item.created_at, "%Y-%m-%d")).days > retention_duration]
+        return retention_plan
+
+    @staticmethod
+    def _delete_checkpoints(client, provider_id, checkpoint_ids):
+        """Delete checkpoints concurrently
+
+        :returns: set of the ids of the checkpoints which failed to be
+                  deleted
+        """
+        failed_ids = set()
+
+        def _delete(checkpoint_id):
+            try:
+                client.checkpoints.delete(provider_id, checkpoint_id)
+            except Exception as e:
+                LOG.warning("Failed to delete checkpoint: %(cp_id)s with "
+                            "the reason: %(reason)s",
+                            {"cp_id": checkpoint_id, "reason": e})
+                failed_ids.add(checkpoint_id)
+
+        pool = eventlet.GreenPool(
+            CONF.operationengine.retention_delete_concurrency)
+        for checkpoint_id in sorted(checkpoint_ids):
+            pool.spawn_n(_delete, checkpoint_id)
+        pool.waitall()
+        return failed_ids
@@ -10,13 +10,30 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from datetime import timedelta
+
+import eventlet
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 
 from karbor.common import karbor_keystone_plugin
+from karbor import context
 
 
 LOG = logging.getLogger(__name__)
 
+user_trust_opts = [
+    cfg.IntOpt('token_refresh_margin',
+               default=300,
+               min=0,
+               help='Seconds before the expiration of a cached trust token '
+                    'when it starts being refreshed in the background'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(user_trust_opts, 'operationengine')
+
 
 class UserTrustManager(object):
     def __init__(self):
@@ -45,17 +62,75 @@ class UserTrustManager(object):
         del self._user_trust_map[key]
 
     def get_token(self, user_id, project_id):
+        """Get a trust token of the user, served from a cache
+
+        A cached token about to expire is still returned while a new one
+        is fetched in the background. Concurrent callers share the same
+        token request.
+        """
         auth_info = self._get_user_trust_info(user_id, project_id)
         if not auth_info:
             return None
 
+        token = auth_info.get('token')
+        if token:
+            expires_in = auth_info['expires_at'] - timeutils.utcnow()
+            if expires_in > timedelta(
+                    seconds=CONF.operationengine.token_refresh_margin):
+                return token
+            if expires_in > timedelta(0):
+                self._refresh_token(auth_info, user_id, project_id)
+                return token
+
+        return self._refresh_token(auth_info, user_id, project_id).wait()
+
+    def get_context(self, user_id, project_id):
+        """Get a request context of the user, scoped by its trust"""
+        auth_info = self._get_user_trust_info(user_id, project_id)
+        token = self.get_token(user_id, project_id)
+        if not token:
+            return None
+
+        access = auth_info['access']
+        return context.RequestContext(
+            user_id=access.user_id,
+            project_id=access.project_id,
+            project_name=access.project_name,
+            roles=access.role_names,
+            auth_token=token,
+            service_catalog=access.service_catalog.catalog,
+            auth_token_info=karbor_keystone_plugin.get_token_info(access))
+
+    def _refresh_token(self, auth_info, user_id, project_id):
+        refresh = auth_info.get('refresh')
+        if refresh is None:
+            refresh = eventlet.spawn(self._fetch_token, auth_info,
+                                     user_id, project_id)
+            auth_info['refresh'] = refresh
+        return refresh
+
+    def _fetch_token(self, auth_info, user_id, project_id):
         try:
-            return auth_info['session'].get_token()
+            session = auth_info['session']
+            if session is None:
+                session = self._skp.create_trust_session(
+                    auth_info['trust_id'])
+                auth_info['session'] = session
+            elif auth_info.get('token'):
+                session.invalidate()
+            access = session.auth.get_access(session)
+            auth_info['access'] = access
+            auth_info['token'] = access.auth_token
+            auth_info['expires_at'] = timeutils.normalize_time(
+                access.expires)
+            return access.auth_token
         except Exception:
             LOG.exception("Get token failed, user_id=%(user_id)s, "
                           "project_id=%(proj_id)s",
                           {'user_id': user_id, 'proj_id': project_id})
-        return None
+            return None
+        finally:
+            auth_info['refresh'] = None
 
     def add_operation(self, context, operation_id):
         auth_info = self._get_user_trust_info(
@@ -89,15 +164,15 @@ class UserTrustManager(object):
             self._del_user_trust_info(context.user_id, context.project_id)
 
     def resume_operation(self, operation_id, user_id, project_id, trust_id):
+        """Register an existing operation and its trust
+
+        The trust session is only created when a token is first needed,
+        so resuming the operations doesn't wait for Keystone.
+        """
         auth_info = self._get_user_trust_info(user_id, project_id)
         if auth_info:
             auth_info['operation_ids'].add(operation_id)
             return
 
-        try:
-            lsession = self._skp.create_trust_session(trust_id)
-        except Exception:
-            raise
-
         self._add_user_trust_info(user_id, project_id,
-                                  operation_id, trust_id, lsession)
+                                  operation_id, trust_id, None)
@@ -13,10 +13,28 @@
 """Handles all requests relating to protection service."""
 
 
+from oslo_serialization import jsonutils
+
+from karbor.common import constants
 from karbor.db import base
 from karbor.services.protection import rpcapi as protection_rpcapi
 
 
+def get_checkpoint_properties(context, plan, extra_info):
+    """Build the properties of a new checkpoint of plan"""
+    return {
+        'project_id': context.project_id,
+        'status': constants.CHECKPOINT_STATUS_PROTECTING,
+        'provider_id': plan.get("provider_id"),
+        "protection_plan": {
+            "id": plan.get("id"),
+            "name": plan.get("name"),
+            "resources": plan.get("resources"),
+        },
+        "extra_info": jsonutils.dumps(extra_info)
+    }
+
+
 class API(base.Base):
     """API for interacting with the protection manager."""
 
@@ -12,11 +12,14 @@
 
 from datetime import datetime
 from karbor.common import constants
+from karbor import context as karbor_context
 from karbor import exception
 from karbor.i18n import _
+from karbor import objects
 from karbor.services.protection import graph
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
@@ -52,6 +55,41 @@ class Checkpoint(object):
             "created_at": self._md_cache.get("created_at", None)
         }
 
+    def to_record(self):
+        """Return the values of the checkpoint_records row mirroring it"""
+        return {
+            "id": self.id,
+            "checkpoint_id": self.id,
+            "project_id": self.project_id,
+            "provider_id": self.provider_id,
+            "plan_id": self.protection_plan["id"],
+            "checkpoint_status": self.status,
+            "extend_info": jsonutils.dumps(self.to_dict()),
+            "created_at": datetime.utcfromtimestamp(
+                self._md_cache["timestamp"])
+        }
+
+    def _update_record(self):
+        # The bank stays the reference, a record missed here is fixed by
+        # the next reconciliation of the protection service.
+        try:
+            objects.CheckpointRecord.create_or_update(
+                karbor_context.get_admin_context(), self.to_record())
+        except Exception:
+            LOG.exception("Failed to update the record of checkpoint %s",
+                          self.id)
+
+    def _delete_record(self):
+        try:
+            objects.CheckpointRecord(
+                context=karbor_context.get_admin_context(),
+                id=self.id).destroy()
+        except exception.CheckpointRecordNotFound:
+            pass
+        except Exception:
+            LOG.exception("Failed to delete the record of checkpoint %s",
+                          self.id)
+
     @property
     def checkpoint_section(self):
         return self._checkpoint_section
@@ -228,10 +266,12 @@ class Checkpoint(object):
             value=checkpoint_id,
             context=context)
 
-        return Checkpoint(checkpoint_section,
-                          indices_section,
-                          bank_lease,
-                          checkpoint_id)
+        checkpoint = Checkpoint(checkpoint_section,
+                                indices_section,
+                                bank_lease,
+                                checkpoint_id)
+        checkpoint._update_record()
+        return checkpoint
 
     def commit(self, context=None):
         self._checkpoint_section.update_object(
@@ -239,6 +279,7 @@ class Checkpoint(object):
             value=self._md_cache,
             context=context
         )
+        self._update_record()
 
     def purge(self, context=None):
         """Purge the index file of the checkpoint.
@@ -264,6 +305,7 @@ class Checkpoint(object):
                     plan_id, project_id, created_at, timestamp, self.id))
 
             self._checkpoint_section.delete_object(_INDEX_FILE_NAME)
+            self._delete_record()
         else:
             raise RuntimeError(_("Could not delete: Checkpoint is not empty"))
 
@@ -288,6 +330,7 @@ class Checkpoint(object):
             self._get_checkpoint_path_by_plan(
                 plan_id, project_id, created_at, timestamp, self.id),
             context=context)
+        self._delete_record()
 
     def get_resource_bank_section(self, resource_id):
         prefix = "/resource-data/%s/" % resource_id
@@ -403,6 +446,19 @@ class CheckpointCollection(object):
                     return ids
             return ids
 
+    def list_records(self, provider_id, context=None):
+        """Return the checkpoint_records values of a provider's checkpoints"""
+        records = []
+        for checkpoint_id in self.list_ids(None, provider_id, context=context,
+                                           all_tenants=True):
+            try:
+                checkpoint = self.get(checkpoint_id, context=context)
+            except exception.CheckpointNotFound:
+                # Deleted since it was listed
+                continue
+            records.append(checkpoint.to_record())
+        return records
+
     def get(self, checkpoint_id, context=None):
         # TODO(saggi): handle multiple instances of the same checkpoint
         return Checkpoint.get_by_section(self._checkpoints_section,
@@ -61,6 +61,27 @@ def get_flow(context, protectable_registry, workflow_engine, plan, provider,
     checkpoint.resource_graph = resource_graph
     checkpoint.commit()
     operation_log = utils.create_operation_log(context, checkpoint)
+    resume_info = utils.get_resume_info(
+        context, workflow_engine,
+        operation_type=constants.OPERATION_PROTECT,
+        plan={'id': plan.get('id'),
+              'parameters': plan.get('parameters')},
+        provider_id=provider.id,
+        checkpoint_id=checkpoint.id,
+        operation_log_id=operation_log.id)
+    return _get_engine(context, workflow_engine, plan, provider, checkpoint,
+                       resource_graph, operation_log, resume_info=resume_info)
+
+
+def resume_flow(context, workflow_engine, plan, provider, checkpoint,
+                operation_log, book):
+    """Rebuild the engine of a persisted protect flow to resume it"""
+    return _get_engine(context, workflow_engine, plan, provider, checkpoint,
+                       checkpoint.resource_graph, operation_log, book=book)
+
+
+def _get_engine(context, workflow_engine, plan, provider, checkpoint,
+                resource_graph, operation_log, resume_info=None, book=None):
     flow_name = "Protect_" + plan.get('id')
     protection_flow = workflow_engine.build_flow(flow_name, 'linear')
     plugins = provider.load_plugins()
@@ -83,5 +104,5 @@ def get_flow(context, protectable_registry, workflow_engine, plan, provider,
         'context': context,
         'checkpoint': checkpoint,
         'operation_log': operation_log
-    })
+    }, resume_info=resume_info, book=book)
     return flow_engine
@@ -17,6 +17,7 @@ from taskflow import task
 
 from karbor.common import constants
 from karbor.services.protection.flows import utils
+from karbor.services.protection import record_writer
 from karbor.services.protection import resource_flow
 
 sync_status_opts = [
@@ -35,14 +36,14 @@ class InitiateRestoreTask(task.Task):
     def execute(self, context, restore, operation_log, *args, **kwargs):
         LOG.debug("Initiate restore restore_id: %s", restore.id)
         restore['status'] = constants.RESTORE_STATUS_IN_PROGRESS
-        restore.save()
+        record_writer.save(restore)
         update_fields = {"status": restore.status}
         utils.update_operation_log(context, operation_log, update_fields)
 
     def revert(self, context, restore, operation_log, *args, **kwargs):
         LOG.debug("Failed to restore restore_id: %s", restore.id)
         restore['status'] = constants.RESTORE_STATUS_FAILURE
-        restore.save()
+        record_writer.save(restore, flush=True)
         update_fields = {
             "status": restore.status,
             "ended_at": timeutils.utcnow()
@@ -54,7 +55,7 @@ class CompleteRestoreTask(task.Task):
     def execute(self, context, restore, operation_log, *args, **kwargs):
         LOG.debug("Complete restore restore_id: %s", restore.id)
         restore['status'] = constants.RESTORE_STATUS_SUCCESS
-        restore.save()
+        record_writer.save(restore, flush=True)
         update_fields = {
             "status": restore.status,
             "ended_at": timeutils.utcnow()
@@ -64,8 +65,28 @@ class CompleteRestoreTask(task.Task):
 
 def get_flow(context, workflow_engine, checkpoint, provider, restore,
              restore_auth):
-    resource_graph = checkpoint.resource_graph
     operation_log = utils.create_operation_log_restore(context, restore)
+    resume_info = utils.get_resume_info(
+        context, workflow_engine,
+        operation_type=constants.OPERATION_RESTORE,
+        provider_id=provider.id,
+        checkpoint_id=checkpoint.id,
+        restore_id=restore.id,
+        operation_log_id=operation_log.id)
+    return _get_engine(context, workflow_engine, checkpoint, provider,
+                       restore, operation_log, resume_info=resume_info)
+
+
+def resume_flow(context, workflow_engine, checkpoint, provider, restore,
+                operation_log, book):
+    """Rebuild the engine of a persisted restore flow to resume it"""
+    return _get_engine(context, workflow_engine, checkpoint, provider,
+                       restore, operation_log, book=book)
+
+
+def _get_engine(context, workflow_engine, checkpoint, provider, restore,
+                operation_log, resume_info=None, book=None):
+    resource_graph = checkpoint.resource_graph
     parameters = restore.parameters
     flow_name = "Restore_" + checkpoint.id
     restore_flow = workflow_engine.build_flow(flow_name, 'linear')
@@ -93,6 +114,9 @@ def get_flow(context, workflow_engine, checkpoint, provider, restore,
             'restore': restore,
             'new_resources': {},
             'operation_log': operation_log
-        }
+        },
+        resume_info=resume_info,
+        book=book,
+        persist=['new_resources']
     )
     return flow_engine
@@ -11,10 +11,13 @@
 # under the License.
 
 from karbor.common import constants
+from karbor.common import karbor_keystone_plugin
+from karbor import context as karbor_context
 from karbor import exception
 from karbor.i18n import _
 from karbor import objects
 from karbor.objects import base as objects_base
+from karbor.services.protection import record_writer
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
 from oslo_utils import timeutils
@@ -70,7 +73,8 @@ def update_operation_log(context, operation_log, fields):
 
     try:
         operation_log.update(fields)
-        operation_log.save()
+        # The final update of a log sets its end time
+        record_writer.save(operation_log, flush='ended_at' in fields)
     except Exception:
         LOG.error('Error update operation log. operation_log: %s',
                   operation_log.id)
@@ -118,3 +122,65 @@ def create_operation_log_verify(context, verify):
         LOG.error('Error creating operation log. verify: %s',
                   verify.id)
         raise
+
+
+def get_resume_info(context, workflow_engine, **kwargs):
+    """Return the resume_info of a new flow, None if it is not persisted
+
+    The token of the user is not saved with the flow, only the ids of the
+    user and project and a trust of the user to karbor, from which
+    create_resume_context gets a fresh token. The trust is the one of a
+    trust scoped context, or one created for the flow.
+    """
+    if not workflow_engine.persistent:
+        return None
+    token_info = (context.auth_token_info or {}).get('token', {})
+    trust_id = token_info.get('OS-TRUST:trust', {}).get('id')
+    trust_created = False
+    if not trust_id:
+        try:
+            keystone_plugin = karbor_keystone_plugin.KarborKeystonePlugin()
+            trust_id = keystone_plugin.create_trust_to_karbor(context)
+        except Exception:
+            LOG.warning('Failed to create a trust of user %s, the flow '
+                        'will not be resumed after a restart',
+                        context.user_id, exc_info=True)
+            return None
+        trust_created = True
+
+    kwargs['context'] = {
+        'user_id': context.user_id,
+        'project_id': context.project_id,
+        'trust_id': trust_id,
+        'trust_created': trust_created,
+    }
+    return kwargs
+
+
+def create_resume_context(resume_info):
+    """Get a new context of the user of a persisted flow from its trust"""
+    keystone_plugin = karbor_keystone_plugin.KarborKeystonePlugin()
+    session = keystone_plugin.create_trust_session(
+        resume_info['context']['trust_id'])
+    access_info = session.auth.get_access(session)
+    return karbor_context.RequestContext(
+        user_id=access_info.user_id,
+        project_id=access_info.project_id,
+        project_name=access_info.project_name,
+        roles=access_info.role_names,
+        auth_token=access_info.auth_token,
+        service_catalog=access_info.service_catalog.catalog,
+        auth_token_info=karbor_keystone_plugin.get_token_info(access_info))
+
+
+def delete_resume_context(resume_info):
+    """Delete the trust created for a persisted flow which ended"""
+    resume_context = (resume_info or {}).get('context', {})
+    if not resume_context.get('trust_created'):
+        return
+    try:
+        keystone_plugin = karbor_keystone_plugin.KarborKeystonePlugin()
+        keystone_plugin.delete_trust_to_karbor(resume_context['trust_id'])
+    except Exception:
+        LOG.exception('Failed to delete the trust %s of a finished flow',
+                      resume_context['trust_id'])
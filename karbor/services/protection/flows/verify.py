@@ -17,6 +17,7 @@ from taskflow import task
 
 from karbor.common import constants
 from karbor.services.protection.flows import utils
+from karbor.services.protection import record_writer
 from karbor.services.protection import resource_flow
 
 
@@ -29,14 +30,14 @@ class InitiateVerifyTask(task.Task):
     def execute(self, context, verify, operation_log, *args, **kwargs):
         LOG.debug("Initiate verify verify_id: %s", verify.id)
         verify['status'] = constants.VERIFICATION_STATUS_IN_PROGRESS
-        verify.save()
+        record_writer.save(verify)
         update_fields = {"status": verify.status}
         utils.update_operation_log(context, operation_log, update_fields)
 
     def revert(self, context, verify, operation_log, *args, **kwargs):
         LOG.debug("Failed to verify verify_id: %s", verify.id)
         verify['status'] = constants.VERIFICATION_STATUS_FAILURE
-        verify.save()
+        record_writer.save(verify, flush=True)
         update_fields = {
             "status": verify.status,
             "ended_at": timeutils.utcnow()
@@ -48,7 +49,7 @@ class CompleteVerifyTask(task.Task):
     def execute(self, context, verify, operation_log, *args, **kwargs):
         LOG.debug("Complete verify verify_id: %s", verify.id)
         verify['status'] = constants.VERIFICATION_STATUS_SUCCESS
-        verify.save()
+        record_writer.save(verify, flush=True)
         update_fields = {
             "status": verify.status,
             "ended_at": timeutils.utcnow()
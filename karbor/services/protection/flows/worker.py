@@ -17,11 +17,14 @@ from oslo_utils import importutils
 
 from karbor.common import constants
 from karbor import exception
+from karbor import objects
 from karbor.services.protection.flows import copy as flow_copy
 from karbor.services.protection.flows import delete as flow_delete
 from karbor.services.protection.flows import protect as flow_protect
 from karbor.services.protection.flows import restore as flow_restore
+from karbor.services.protection.flows import utils as flow_utils
 from karbor.services.protection.flows import verify as flow_verify
+from karbor.services.protection.flows import workflow as flow_workflow
 
 workflow_opts = [
     cfg.StrOpt(
@@ -112,8 +115,63 @@ class Worker(object):
 
         return flow
 
+    def list_resumable_flows(self):
+        """List the unfinished flows persisted by this host"""
+        return self.workflow_engine.list_resumable(CONF.host)
+
+    def resume_flow(self, book, resume_info, provider_registry):
+        """Rebuild the engine of a persisted flow
+
+        The live objects of the flow are fetched again from the ids saved
+        when it started, the engine then skips the tasks which already
+        completed.
+        """
+        operation_type = resume_info['operation_type']
+        context = flow_utils.create_resume_context(resume_info)
+        provider = provider_registry.show_provider(resume_info['provider_id'])
+        checkpoint = provider.get_checkpoint(resume_info['checkpoint_id'],
+                                             context=context)
+        operation_log = objects.OperationLog.get_by_id(
+            context, resume_info['operation_log_id'])
+        if operation_type == constants.OPERATION_PROTECT:
+            return flow_protect.resume_flow(
+                context,
+                self.workflow_engine,
+                resume_info['plan'],
+                provider,
+                checkpoint,
+                operation_log,
+                book,
+            )
+        elif operation_type == constants.OPERATION_RESTORE:
+            restore = objects.Restore.get_by_id(context,
+                                                resume_info['restore_id'])
+            return flow_restore.resume_flow(
+                context,
+                self.workflow_engine,
+                checkpoint,
+                provider,
+                restore,
+                operation_log,
+                book,
+            )
+        raise exception.InvalidParameterValue(
+            err='unknown operation type %s' % operation_type
+        )
+
+    def discard_flow(self, book):
+        flow_utils.delete_resume_context(book.meta.get('resume_info'))
+        self.workflow_engine.discard(book)
+
     def run_flow(self, flow_engine):
-        self.workflow_engine.run_engine(flow_engine)
+        try:
+            self.workflow_engine.run_engine(flow_engine)
+        finally:
+            book = getattr(flow_engine, 'book', None)
+            if book is not None and (flow_engine.storage.get_flow_state() in
+                                     flow_workflow.FINISHED_FLOW_STATES):
+                flow_utils.delete_resume_context(
+                    book.meta.get('resume_info'))
 
     def flow_outputs(self, flow_engine, target=None):
         return self.workflow_engine.output(flow_engine, target=target)
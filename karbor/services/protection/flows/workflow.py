@@ -11,21 +11,50 @@
 #    under the License.
 
 import abc
+import contextlib
+import functools
 import futurist
 import six
+from six.moves import urllib
 
 from karbor import exception
 from karbor.i18n import _
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from taskflow import engines
+from taskflow import exceptions as taskflow_exc
 from taskflow.patterns import graph_flow
 from taskflow.patterns import linear_flow
+from taskflow.patterns import unordered_flow
+from taskflow.persistence import backends as persistence_backends
+from taskflow.persistence import models
+from taskflow import states
 from taskflow import task
 
+persistence_opts = [
+    cfg.StrOpt('flow_persistence_connection',
+               help='Connection URI of the taskflow persistence backend '
+                    'where the state of the running protect and restore '
+                    'flows is saved, so that a restarted protection service '
+                    'resumes them from their last completed task. For '
+                    'example the karbor database connection, '
+                    'sqlite:////var/lib/karbor/flows.sqlite or '
+                    'file:///var/lib/karbor/flows. Flows are not persisted '
+                    'when unset.'),
+]
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.register_opts(persistence_opts)
+
+FINISHED_FLOW_STATES = (states.SUCCESS, states.FAILURE, states.REVERTED)
+
+
+def _persisted_name(name):
+    return '%s@persisted' % name
+
 
 @six.add_metaclass(abc.ABCMeta)
 class WorkFlowEngine(object):
@@ -34,13 +63,22 @@ class WorkFlowEngine(object):
         """build flow
 
         :param flow_name: the flow name
-        :param flow_type: 'linear' or 'graph', default:'graph'
-        :return: linear flow or graph flow
+        :param flow_type: 'linear', 'graph' or 'unordered', default:'graph'
+        :return: linear flow, graph flow or unordered flow
         """
         return
 
     @abc.abstractmethod
     def get_engine(self, flow, **kwargs):
+        """Get an engine of flow
+
+        :param store: dict of the values required by the tasks
+        :param resume_info: dict saved with a persisted flow, returned by
+                            list_resumable to rebuild it
+        :param book: the persisted flow to resume, from list_resumable
+        :param persist: names of the store dicts filled in place by the
+                        tasks whose content is restored when resuming
+        """
         return
 
     @abc.abstractmethod
@@ -85,13 +123,50 @@ class WorkFlowEngine(object):
     def search_task(self, flow, task_id):
         return
 
+    @property
+    def persistent(self):
+        """Whether the flows given a resume_info are persisted"""
+        return False
+
+    def list_resumable(self, host):
+        """List the unfinished flows persisted by host
+
+        :return: a list of (book, resume_info) tuples, where book must be
+                 passed to get_engine to resume the flow and resume_info is
+                 the dictionary given to get_engine when the flow started
+        """
+        return []
+
+    def discard(self, book):
+        """Forget a persisted flow which will not be resumed"""
+        return
+
 
 class TaskFlowEngine(WorkFlowEngine):
+    def __init__(self):
+        super(TaskFlowEngine, self).__init__()
+        self._backend = None
+        connection = CONF.flow_persistence_connection
+        if connection:
+            conf = {'connection': connection}
+            url = urllib.parse.urlparse(connection)
+            if url.scheme in ('file', 'dir'):
+                conf['path'] = url.path
+            self._backend = persistence_backends.fetch(conf)
+            with contextlib.closing(self._backend.get_connection()) as conn:
+                conn.upgrade()
+
+    @property
+    def persistent(self):
+        return self._backend is not None
+
     def build_flow(self, flow_name, flow_type='graph'):
         if flow_type == 'linear':
             return linear_flow.Flow(flow_name)
         elif flow_type == 'graph':
             return graph_flow.Flow(flow_name)
+        elif flow_type == 'unordered':
+            return unordered_flow.Flow(flow_name)
         else:
             raise ValueError(_("unsupported flow type: %s") % flow_type)
 
@@ -103,16 +178,88 @@ class TaskFlowEngine(WorkFlowEngine):
         executor = kwargs.get('executor', None)
         engine = kwargs.get('engine', None)
         store = kwargs.get('store', None)
+        resume_info = kwargs.get('resume_info', None)
+        book = kwargs.get('book', None)
+        persist = kwargs.get('persist', ())
         if not executor:
             executor = futurist.GreenThreadPoolExecutor()
         if not engine:
             engine = 'parallel'
+        if self._backend is None or (resume_info is None and book is None):
+            return engines.load(flow,
+                                executor=executor,
+                                engine=engine,
+                                store=store)
+
+        flow_detail = None
+        if book is None:
+            book = models.LogBook(flow.name)
+            book.meta = {'host': CONF.host, 'resume_info': resume_info}
+        else:
+            flow_detail = next(iter(book))
         flow_engine = engines.load(flow,
+                                   flow_detail=flow_detail,
+                                   book=book,
+                                   backend=self._backend,
                                    executor=executor,
-                                   engine=engine,
-                                   store=store)
+                                   engine=engine)
+        # The store holds live objects (context, checkpoint, ...) which are
+        # rebuilt when resuming, only the task states and results are saved.
+        # The persist values are filled in place by the tasks, a copy of
+        # them is saved after each task and reloaded when resuming.
+        store = store or {}
+        if flow_detail is not None:
+            for name in persist:
+                try:
+                    saved = flow_engine.storage.fetch(_persisted_name(name))
+                except taskflow_exc.NotFound:
+                    continue
+                store[name].update(saved)
+        if persist:
+            flow_engine.atom_notifier.register(
+                states.SUCCESS,
+                functools.partial(self._save_persisted, flow_engine,
+                                  {name: store[name] for name in persist}))
+        if store:
+            flow_engine.storage.inject(store, transient=True)
+        flow_engine.book = book
         return flow_engine
 
+    @staticmethod
+    def _save_persisted(flow_engine, values, state, details):
+        flow_engine.storage.inject(
+            {_persisted_name(name): dict(value)
+             for name, value in values.items()})
+
+    def list_resumable(self, host):
+        if self._backend is None:
+            return []
+        resumable = []
+        with contextlib.closing(self._backend.get_connection()) as conn:
+            for book in conn.get_logbooks():
+                if book.meta.get('host') != host:
+                    continue
+                flow_details = list(book)
+                if not flow_details or (
+                        flow_details[0].state in FINISHED_FLOW_STATES):
+                    self._destroy_book(conn, book)
+                    continue
+                resumable.append((book, book.meta.get('resume_info')))
+        return resumable
+
+    def discard(self, book):
+        if self._backend is None:
+            return
+        with contextlib.closing(self._backend.get_connection()) as conn:
+            self._destroy_book(conn, book)
+
+    def _destroy_book(self, conn, book):
+        try:
+            conn.destroy_logbook(book.uuid)
+        except Exception:
+            LOG.exception("Failed to destroy the persisted flow %s",
+                          book.name)
+
     def karbor_flow_watch(self, state, details):
         LOG.trace("The Flow [%s] OldState[%s] changed to State[%s]: ",
                   details.get('task_name'), details.get('old_state'), state)
@@ -129,7 +276,17 @@ class TaskFlowEngine(WorkFlowEngine):
 
         flow_engine.notifier.register('*', self.karbor_flow_watch)
         flow_engine.atom_notifier.register('*', self.karbor_atom_watch)
-        flow_engine.run()
+        book = getattr(flow_engine, 'book', None)
+        if book is None:
+            flow_engine.run()
+            return
+        try:
+            flow_engine.run()
+        finally:
+            # A killed service leaves its flows unfinished, keep them
+            # for the next start.
+            if flow_engine.storage.get_flow_state() in FINISHED_FLOW_STATES:
+                self.discard(book)
 
     def output(self, flow_engine, target=None):
         if flow_engine is None:
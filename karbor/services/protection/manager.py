@@ -15,20 +15,25 @@ Protection Service
 """
 
 from datetime import datetime
+from datetime import timedelta
 from eventlet import greenpool
 from eventlet import greenthread
 import six
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging as messaging
-
+from oslo_serialization import jsonutils
+from oslo_service import periodic_task
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 from karbor.common import constants
 from karbor import exception
 from karbor.i18n import _
 from karbor import manager
+from karbor import objects
 from karbor.resource import Resource
 from karbor.services.protection.flows import worker as flow_manager
 from karbor.services.protection.protectable_registry import ProtectableRegistry
@@ -44,7 +49,22 @@ protection_manager_opts = [
                default=0,
                help='number of maximum concurrent operation (protect, restore,'
                     ' delete) flows. 0 means no hard limit'
-               )
+               ),
+    cfg.StrOpt('checkpoint_list_source',
+               default='bank',
+               choices=['bank', 'db'],
+               help='Where the checkpoints are listed from. "bank" walks the '
+                    'indices of the bank and reads every listed checkpoint. '
+                    '"db" queries the checkpoint_records table, a mirror of '
+                    'the banks kept up to date on every checkpoint change '
+                    'and resynchronized every '
+                    'checkpoint_record_sync_interval seconds.'),
+    cfg.IntOpt('checkpoint_record_sync_interval',
+               default=3600,
+               min=0,
+               help='Seconds between two resynchronizations of the '
+                    'checkpoint_records table from the banks of the '
+                    'providers, 0 disables them.'),
 ]
 
 CONF = cfg.CONF
@@ -73,6 +93,7 @@ class ProtectionManager(manager.Manager):
         self._greenpool_size = CONF.max_concurrent_operations
         if self._greenpool_size != 0:
             self._greenpool = greenpool.GreenPool(self._greenpool_size)
+        self._last_record_sync = None
 
     def _spawn(self, func, *args, **kwargs):
         if self._greenpool is not None:
@@ -82,8 +103,65 @@ class ProtectionManager(manager.Manager):
 
     def init_host(self, **kwargs):
         """Handle initialization if this is a standalone service"""
-        # TODO(wangliuan)
         LOG.info("Starting protection service")
+        self._resume_flows()
+
+    def _resume_flows(self):
+        for book, resume_info in self.worker.list_resumable_flows():
+            LOG.info("Resuming flow %s", book.name)
+            try:
+                flow = self.worker.resume_flow(book, resume_info,
+                                               self.provider_registry)
+            except Exception:
+                LOG.exception("Failed to resume flow %s, discarding it",
+                              book.name)
+                self.worker.discard_flow(book)
+                continue
+            self._spawn(self.worker.run_flow, flow)
+
+    @periodic_task.periodic_task
+    def _sync_checkpoint_records(self, context):
+        """Resynchronize the checkpoint records from the provider banks"""
+        interval = CONF.checkpoint_record_sync_interval
+        if interval <= 0:
+            return
+        now = time.time()
+        if (self._last_record_sync is not None and
+                now - self._last_record_sync < interval):
+            return
+        self._last_record_sync = now
+        if not self._is_record_sync_node(context):
+            return
+
+        for provider in self.provider_registry.providers.values():
+            started_at = timeutils.utcnow()
+            try:
+                records = provider.get_checkpoint_collection().list_records(
+                    provider.id)
+                result = objects.CheckpointRecord.reconcile(
+                    context, provider.id, records, started_at)
+            except Exception:
+                LOG.exception("Failed to synchronize the checkpoint records "
+                              "of provider %s", provider.id)
+                continue
+            LOG.info("Synchronized the checkpoint records of provider "
+                     "%(provider_id)s, %(updated)d updated, %(deleted)d "
+                     "deleted", dict(result, provider_id=provider.id))
+
+    def _is_record_sync_node(self, context):
+        """Elect the protection service synchronizing the checkpoint records
+
+        The banks are shared by the protection services, so only the live
+        one with the lowest host name synchronizes them.
+        """
+        try:
+            services = objects.ServiceList.get_all_by_topic(
+                context, CONF.protection_topic, disabled=False)
+        except Exception:
+            LOG.exception("Unable to list the protection services, skipping "
+                          "the checkpoint records synchronization")
+            return False
+        return utils.is_elected_host(services, CONF.host)
 
     @messaging.expected_exceptions(exception.InvalidPlan,
                                    exception.ProviderNotFound,
@@ -421,6 +499,13 @@ class ProtectionManager(manager.Manager):
         else:
             project_id = context.project_id
 
+        if CONF.checkpoint_list_source == 'db':
+            return self._list_checkpoint_records(
+                context, provider_id, project_id, limit=limit, marker=marker,
+                plan_id=plan_id, start_date=start_date, end_date=end_date,
+                sort_dir=sort_dir, status=filters.get('status'),
+                all_tenants=all_tenants)
+
         checkpoint_ids = provider.list_checkpoints(
             project_id, provider_id, limit=limit, marker=marker,
             plan_id=plan_id, start_date=start_date, end_date=end_date,
@@ -432,6 +517,35 @@ class ProtectionManager(manager.Manager):
             checkpoints.append(checkpoint.to_dict())
         return checkpoints
 
+    def _list_checkpoint_records(self, context, provider_id, project_id,
+                                 limit=None, marker=None, plan_id=None,
+                                 start_date=None, end_date=None,
+                                 sort_dir=None, status=None,
+                                 all_tenants=False):
+        """List the checkpoints from their records instead of the bank"""
+        filters = {'provider_id': provider_id}
+        if not all_tenants:
+            filters['project_id'] = project_id
+        if plan_id:
+            filters['plan_id'] = plan_id
+        if status:
+            filters['checkpoint_status'] = status
+        if start_date:
+            filters['created_at_min'] = start_date
+        if end_date:
+            # The end date is included, as in the bank indices
+            filters['created_at_max'] = end_date + timedelta(days=1)
+        sort_dir = sort_dir or 'asc'
+
+        try:
+            records = objects.CheckpointRecordList.get_by_filters(
+                context, filters, limit=limit, marker=marker,
+                sort_keys=['created_at', 'id'],
+                sort_dirs=[sort_dir, sort_dir])
+        except exception.CheckpointRecordNotFound:
+            raise exception.CheckpointNotFound(checkpoint_id=marker)
+        return [jsonutils.loads(record.extend_info) for record in records]
+
     @messaging.expected_exceptions(exception.ProviderNotFound,
                                    exception.CheckpointNotFound,
                                    exception.AccessCheckpointNotAllowed)
@@ -17,6 +17,7 @@ from karbor.common import constants
 from karbor import exception
 from karbor.services.protection.client_factory import ClientFactory
 from karbor.services.protection import protection_plugin
+from karbor.services.protection import record_writer
 from karbor.services.protection.protection_plugins.database \
     import database_backup_plugin_schemas as database_instance_schemas
 from karbor.services.protection.protection_plugins import utils
@@ -197,7 +198,7 @@ class RestoreOperation(protection_plugin.Operation):
                     constants.DATABASE_RESOURCE_TYPE,
                     instance_info.id, instance_info.status,
                     "Invalid status.")
-                restore.save()
+                record_writer.save(restore)
                 raise exception.RestoreResourceFailed(
                     name="Database instance Backup",
                     reason="Invalid status.",
@@ -206,7 +207,7 @@ class RestoreOperation(protection_plugin.Operation):
             restore.update_resource_status(
                 constants.DATABASE_RESOURCE_TYPE,
                 instance_info.id, instance_info.status)
-            restore.save()
+            record_writer.save(restore)
         except Exception as e:
             LOG.error("Restore Database instance from backup "
                       "failed, instance_id: %s.", original_instance_id)
@@ -314,8 +315,11 @@ class DatabaseBackupProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(DatabaseBackupProtectionPlugin, self).__init__(config)
         self._config.register_opts(trove_backup_opts,
                                    'database_backup_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'database_backup_plugin')
         self._plugin_config = self._config.database_backup_plugin
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
 
     @classmethod
     def get_supported_resources_types(cls):
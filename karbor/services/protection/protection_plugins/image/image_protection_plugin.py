@@ -246,10 +246,13 @@ class GlanceProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(GlanceProtectionPlugin, self).__init__(config)
         self._config.register_opts(image_backup_opts,
                                    'image_backup_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'image_backup_plugin')
         self._plugin_config = self._config.image_backup_plugin
         self._data_block_size_bytes = (
             self._plugin_config.backup_image_object_size)
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
 
         if self._data_block_size_bytes % 65536 != 0 or (
                 self._data_block_size_bytes <= 0):
@@ -709,8 +709,11 @@ class NeutronProtectionPlugin(protection_plugin.ProtectionPlugin):
         self._config.register_opts(
             neutron_backup_opts,
             'neutron_backup_protection_plugin')
+        self._config.register_opts(
+            utils.status_poll_opts,
+            'neutron_backup_protection_plugin')
         plugin_config = self._config.neutron_backup_protection_plugin
-        self._poll_interval = plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(plugin_config)
 
     @classmethod
     def get_supported_resources_types(self):
@@ -326,8 +326,10 @@ class PodProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(PodProtectionPlugin, self).__init__(config)
         self._config.register_opts(pod_backup_opts,
                                    'pod_backup_protection_plugin')
-        self._poll_interval = (
-            self._config.pod_backup_protection_plugin.poll_interval)
+        self._config.register_opts(utils.status_poll_opts,
+                                   'pod_backup_protection_plugin')
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._config.pod_backup_protection_plugin)
 
     @classmethod
     def get_supported_resources_types(cls):
@@ -443,8 +443,10 @@ class NovaProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(NovaProtectionPlugin, self).__init__(config)
         self._config.register_opts(nova_backup_opts,
                                    'nova_backup_protection_plugin')
-        self._poll_interval = (
-            self._config.nova_backup_protection_plugin.poll_interval)
+        self._config.register_opts(utils.status_poll_opts,
+                                   'nova_backup_protection_plugin')
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._config.nova_backup_protection_plugin)
 
     @classmethod
     def get_supported_resources_types(cls):
@@ -17,6 +17,7 @@ from karbor.common import constants
 from karbor import exception
 from karbor.services.protection.client_factory import ClientFactory
 from karbor.services.protection import protection_plugin
+from karbor.services.protection import record_writer
 from karbor.services.protection.protection_plugins.share \
     import share_snapshot_plugin_schemas as share_schemas
 from karbor.services.protection.protection_plugins import utils
@@ -198,7 +199,7 @@ class RestoreOperation(protection_plugin.Operation):
                 restore.update_resource_status(
                     constants.SHARE_RESOURCE_TYPE,
                     share.id, share.status, "Invalid status.")
-                restore.save()
+                record_writer.save(restore)
                 raise exception.RestoreResourceFailed(
                     name="Share Snapshot",
                     reason="Invalid status.",
@@ -206,7 +207,7 @@ class RestoreOperation(protection_plugin.Operation):
                     resource_type=constants.SHARE_RESOURCE_TYPE)
             restore.update_resource_status(constants.SHARE_RESOURCE_TYPE,
                                            share.id, share.status)
-            restore.save()
+            record_writer.save(restore)
         except Exception as e:
             LOG.error("Restore share from snapshot failed, share_id: %s.",
                       original_share_id)
@@ -314,8 +315,11 @@ class ManilaSnapshotProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(ManilaSnapshotProtectionPlugin, self).__init__(config)
         self._config.register_opts(manila_snapshot_opts,
                                    'manila_snapshot_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'manila_snapshot_plugin')
         self._plugin_config = self._config.manila_snapshot_plugin
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
 
     @classmethod
     def get_supported_resources_types(cls):
@@ -0,0 +1,147 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+import eventlet
+from eventlet import event
+from oslo_log import log as logging
+
+from karbor.services.protection.protection_plugins import utils
+
+LOG = logging.getLogger(__name__)
+
+
+class _Waiter(object):
+    def __init__(self, get_status_func, statuses, eta=None):
+        super(_Waiter, self).__init__()
+        self.get_status_func = get_status_func
+        self.statuses = statuses
+        self.not_before = time.time() + (eta or 0)
+        self.event = event.Event()
+
+
+class StatusWatcher(object):
+    """Shares one status poller between all the waiters of a resource type
+
+    Instead of every hook running its own looping call, waiters register
+    with a watcher which, once per interval, fetches the status of all the
+    watched resources with a single list call and wakes up the waiters
+    whose resource reached a final status. The polls follow the
+    PollSchedule of the watcher, which restarts as soon as a wait completes
+    or a new resource is watched.
+    """
+
+    _watchers = {}
+
+    def __init__(self, key, interval):
+        super(StatusWatcher, self).__init__()
+        if not isinstance(interval, utils.PollSchedule):
+            interval = utils.PollSchedule(interval)
+        self._key = key
+        self._schedule = interval
+        self._intervals = self._schedule.intervals()
+        self._list_statuses_func = None
+        self._waiters = {}
+        self._thread = None
+        # Number of resources returned by the last list call, which the
+        # list functions use to tell whether listing is worth it. It goes
+        # away with the watcher once no resource is watched.
+        self.listed_count = None
+
+    @classmethod
+    def get_watcher(cls, key, interval):
+        """Return the watcher of key, creating it if needed
+
+        :param interval: poll interval in seconds, or a PollSchedule
+        """
+        watcher = cls._watchers.get(key)
+        if watcher is None:
+            watcher = cls(key, interval)
+            cls._watchers[key] = watcher
+        return watcher
+
+    def watch(self, resource_id, list_statuses_func, get_status_func,
+              eta=None, **statuses):
+        """Wait for resource_id to reach a success or failure status
+
+        :param list_statuses_func: callable receiving a list of resource ids
+            and returning a dict of their statuses. The most recently
+            registered callable is used for the next batch.
+        :param get_status_func: callable returning the status of this
+            resource alone, used when the batch did not include it
+        :param eta: optional estimation of the seconds left before the
+            resource reaches its final status, it is not polled before
+        :param statuses: success_statuses, failure_statuses, ignore_statuses
+            and ignore_unexpected, as for utils.status_poll
+        :returns: True on success, False on failure
+        """
+        waiter = _Waiter(get_status_func, statuses, eta)
+        self._list_statuses_func = list_statuses_func
+        self._waiters.setdefault(resource_id, []).append(waiter)
+        self._intervals = self._schedule.intervals()
+        if self._thread is None:
+            self._thread = eventlet.spawn(self._run)
+        return waiter.event.wait()
+
+    def _run(self):
+        try:
+            while self._waiters:
+                eventlet.sleep(next(self._intervals))
+                if self._poll():
+                    self._intervals = self._schedule.intervals()
+        finally:
+            self._thread = None
+            if self._watchers.get(self._key) is self:
+                del self._watchers[self._key]
+
+    def _poll(self):
+        now = time.time()
+        resource_ids = [
+            resource_id for resource_id, waiters in self._waiters.items()
+            if any(waiter.not_before <= now for waiter in waiters)]
+        if not resource_ids:
+            return False
+        try:
+            polled = self._list_statuses_func(resource_ids)
+        except Exception as e:
+            LOG.warning('Failed listing statuses of %(key)s, falling back '
+                        'to polling each resource. Reason: %(reason)s',
+                        {'key': self._key, 'reason': e})
+            polled = {}
+
+        completed = False
+        for resource_id in resource_ids:
+            status = polled.get(resource_id)
+            for waiter in list(self._waiters[resource_id]):
+                if waiter.not_before > now:
+                    continue
+                try:
+                    if status is None:
+                        status = waiter.get_status_func()
+                    result = utils.check_status(status, **waiter.statuses)
+                except Exception as e:
+                    self._remove_waiter(resource_id, waiter)
+                    waiter.event.send_exception(e)
+                    completed = True
+                    continue
+                if result is not None:
+                    self._remove_waiter(resource_id, waiter)
+                    waiter.event.send(result)
+                    completed = True
+        return completed
+
+    def _remove_waiter(self, resource_id, waiter):
+        waiters = self._waiters[resource_id]
+        waiters.remove(waiter)
+        if not waiters:
+            del self._waiters[resource_id]
@@ -11,14 +11,44 @@
 #    under the License.
 from io import BytesIO
 import os
+import random
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_service import loopingcall
 
 from karbor.services.protection.bank_plugin import BankIO
+from karbor.services.protection import record_writer
 
 LOG = logging.getLogger(__name__)
 
+status_poll_opts = [
+    cfg.IntOpt(
+        'initial_poll_interval',
+        min=0,
+        help='Interval before the first status poll of a resource. '
+        'Defaults to poll_interval.'
+    ),
+    cfg.IntOpt(
+        'max_poll_interval',
+        min=0,
+        help='Ceiling of the status poll interval when backing off. '
+        'Defaults to poll_interval.'
+    ),
+    cfg.FloatOpt(
+        'poll_backoff_factor', default=1.0, min=1.0,
+        help='Factor applied to the status poll interval after each poll '
+        'which did not complete, starting from initial_poll_interval and '
+        'up to max_poll_interval. 1 polls at a fixed interval.'
+    ),
+    cfg.FloatOpt(
+        'poll_jitter', default=0.0, min=0.0, max=1.0,
+        help='Randomly spread each status poll interval by up to this '
+        'fraction of it, so that resources created together are not '
+        'polled in lockstep.'
+    ),
+]
+
 
 def backup_image_to_bank(glance_client, image_id, bank_section, object_size):
     image_response = glance_client.images.data(image_id, do_checksum=True)
@@ -80,7 +110,7 @@ def update_resource_restore_result(restore_record, resource_type, resource_id,
     try:
         restore_record.update_resource_status(resource_type, resource_id,
                                               status, reason)
-        restore_record.save()
+        record_writer.save(restore_record)
     except Exception:
         LOG.error('Unable to update restoration result. '
                   'resource type: %(resource_type)s, '
@@ -91,22 +121,99 @@ def update_resource_restore_result(restore_record, resource_type, resource_id,
         pass
 
 
+def check_status(status, success_statuses=set(), failure_statuses=set(),
+                 ignore_statuses=set(), ignore_unexpected=False):
+    """Map a polled status to the outcome of the wait
+
+    :returns: True on success, False on failure and None to keep polling
+    """
+    if status in success_statuses:
+        return True
+    if status in failure_statuses:
+        return False
+    if status in ignore_statuses:
+        return None
+    if ignore_unexpected is False:
+        return False
+    return None
+
+
+class PollSchedule(object):
+    """Intervals between the successive status polls of a resource
+
+    Polls start at initial_interval and the interval is multiplied by
+    backoff_factor after every poll, up to max_interval, so that short
+    operations are noticed quickly while long ones are polled rarely.
+    """
+
+    def __init__(self, interval, initial_interval=None, max_interval=None,
+                 backoff_factor=1.0, jitter=0.0):
+        super(PollSchedule, self).__init__()
+        self.interval = interval
+        self.initial_interval = (interval if initial_interval is None
+                                 else initial_interval)
+        self.max_interval = max(
+            self.initial_interval,
+            interval if max_interval is None else max_interval)
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+
+    @classmethod
+    def from_config(cls, plugin_config):
+        """Build the schedule of a plugin config group
+
+        The group must hold poll_interval and the status_poll_opts.
+        """
+        return cls(plugin_config.poll_interval,
+                   initial_interval=plugin_config.initial_poll_interval,
+                   max_interval=plugin_config.max_poll_interval,
+                   backoff_factor=plugin_config.poll_backoff_factor,
+                   jitter=plugin_config.poll_jitter)
+
+    def _spread(self, interval):
+        if not self.jitter:
+            return interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def intervals(self, eta=None):
+        """Yield the intervals to wait before each poll
+
+        :param eta: optional estimation, in seconds, of the time the resource
+            needs to reach its final status. The first poll is delayed
+            until then, and polls restart at initial_interval afterwards.
+        """
+        if eta and eta > self.initial_interval:
+            yield self._spread(eta)
+        interval = self.initial_interval
+        while True:
+            yield self._spread(interval)
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+
 def status_poll(get_status_func, interval, success_statuses=set(),
                 failure_statuses=set(), ignore_statuses=set(),
-                ignore_unexpected=False):
+                ignore_unexpected=False, eta=None):
+    """Poll get_status_func until it returns a final status
+
+    :param interval: poll interval in seconds, or a PollSchedule
+    :param eta: optional estimation of the seconds left before the resource
+        reaches its final status, see PollSchedule.intervals
+    :returns: True on success, False on failure
+    """
+    if not isinstance(interval, PollSchedule):
+        interval = PollSchedule(interval)
+    intervals = interval.intervals(eta)
+
     def _poll():
         status = get_status_func()
-        if status in success_statuses:
-            raise loopingcall.LoopingCallDone(retvalue=True)
-        if status in failure_statuses:
-            raise loopingcall.LoopingCallDone(retvalue=False)
-        if status in ignore_statuses:
-            return
-        if ignore_unexpected is False:
-            raise loopingcall.LoopingCallDone(retvalue=False)
+        result = check_status(status, success_statuses, failure_statuses,
+                              ignore_statuses, ignore_unexpected)
+        if result is not None:
+            raise loopingcall.LoopingCallDone(retvalue=result)
+        return next(intervals)
 
-    loop = loopingcall.FixedIntervalLoopingCall(_poll)
-    return loop.start(interval=interval, initial_delay=interval).wait()
+    loop = loopingcall.DynamicLoopingCall(_poll)
+    return loop.start(initial_delay=next(intervals)).wait()
 
 
 def update_resource_verify_result(verify_record, resource_type, resource_id,
@@ -114,7 +221,7 @@ def update_resource_verify_result(verify_record, resource_type, resource_id,
     try:
         verify_record.update_resource_status(resource_type, resource_id,
                                              status, reason)
-        verify_record.save()
+        record_writer.save(verify_record)
     except Exception:
         LOG.error('Unable to update verify result. '
                   'resource type: %(resource_type)s, '
@@ -21,6 +21,8 @@ from karbor.common import constants
 from karbor import exception
 from karbor.services.protection.client_factory import ClientFactory
 from karbor.services.protection import protection_plugin
+from karbor.services.protection.protection_plugins.status_watcher import \
+    StatusWatcher
 from karbor.services.protection.protection_plugins import utils
 from karbor.services.protection.protection_plugins.volume \
     import volume_plugin_cinder_schemas as cinder_schemas
@@ -33,11 +35,32 @@ cinder_backup_opts = [
         'poll_interval', default=15,
         help='Poll interval for Cinder backup status'
     ),
+    cfg.BoolOpt(
+        'batch_status_poll', default=False,
+        help='Share the status polls of all the volumes, snapshots and '
+        'backups of a project, so that each poll interval issues a single '
+        'list call per resource type instead of one call per resource.'
+    ),
+    cfg.FloatOpt(
+        'batch_status_poll_min_share', default=0.1, min=0, max=1,
+        help='Cinder does not filter its lists by id, so a batch status '
+        'poll lists all the resources of the type in the project. When the '
+        'watched resources are fewer than this share of the resources '
+        'found by the previous list, each of them is polled with its own '
+        'get instead.'
+    ),
     cfg.BoolOpt(
         'backup_from_snapshot', default=True,
         help='First take a snapshot of the volume, and backup from '
         'it. Minimizes the time the volume is unavailable.'
     ),
+    cfg.IntOpt(
+        'backup_throughput', default=0, min=0,
+        help='Expected throughput of Cinder backups, in MB per second. '
+        'When set, the status of a backup is not polled before the time '
+        'its volume size needs at this throughput. 0 disables the '
+        'estimation.'
+    ),
 ]
 
 
@@ -54,6 +77,13 @@ def get_snapshot_status(cinder_client, snapshot_id):
                                'snapshot')
 
 
+RESOURCE_MANAGERS = {
+    'volume': 'volumes',
+    'snapshot': 'volume_snapshots',
+    'backup': 'backups',
+}
+
+
 def get_resource_status(resource_manager, resource_id, resource_type):
     LOG.debug('Polling %(resource_type)s (id: %(resource_id)s)', {
         'resource_type': resource_type,
@@ -75,20 +105,71 @@ def get_resource_status(resource_manager, resource_id, resource_type):
     return status
 
 
-class ProtectOperation(protection_plugin.Operation):
-    def __init__(self, poll_interval, backup_from_snapshot):
-        super(ProtectOperation, self).__init__()
+def list_resource_statuses(resource_manager, resource_type, watcher,
+                           min_share, resource_ids):
+    listed = watcher.listed_count
+    if listed is not None and len(resource_ids) < listed * min_share:
+        # Listing the whole project costs more than a few gets, the
+        # watcher polls the resources missing from the batch one by one
+        return {}
+
+    LOG.debug('Polling %(resource_type)s (ids: %(resource_ids)s)', {
+        'resource_type': resource_type,
+        'resource_ids': resource_ids,
+    })
+    resources = resource_manager.list()
+    watcher.listed_count = len(resources)
+    resource_ids = set(resource_ids)
+    return {resource.id: resource.status
+            for resource in resources
+            if resource.id in resource_ids}
+
+
+class CinderOperation(protection_plugin.Operation):
+    def __init__(self, poll_interval, batch_status_poll=False,
+                 batch_status_poll_min_share=0):
+        super(CinderOperation, self).__init__()
         self._interval = poll_interval
+        self._batch_status_poll = batch_status_poll
+        self._batch_status_poll_min_share = batch_status_poll_min_share
+
+    def _status_poll(self, cinder_client, context, resource_type,
+                     resource_id, eta=None, **statuses):
+        resource_manager = getattr(cinder_client,
+                                   RESOURCE_MANAGERS[resource_type])
+        get_status_func = partial(get_resource_status, resource_manager,
+                                  resource_id, resource_type)
+        if not self._batch_status_poll:
+            return utils.status_poll(get_status_func,
+                                     interval=self._interval, eta=eta,
+                                     **statuses)
+
+        watcher = StatusWatcher.get_watcher(
+            ('cinder', resource_type, context.project_id), self._interval)
+        return watcher.watch(
+            resource_id,
+            partial(list_resource_statuses, resource_manager, resource_type,
+                    watcher, self._batch_status_poll_min_share),
+            get_status_func, eta=eta, **statuses)
+
+
+class ProtectOperation(CinderOperation):
+    def __init__(self, poll_interval, backup_from_snapshot,
+                 batch_status_poll=False, backup_throughput=0,
+                 batch_status_poll_min_share=0):
+        super(ProtectOperation, self).__init__(poll_interval,
+                                               batch_status_poll,
+                                               batch_status_poll_min_share)
         self._backup_from_snapshot = backup_from_snapshot
+        self._backup_throughput = backup_throughput
         self.snapshot_id = None
 
-    def _create_snapshot(self, cinder_client, volume_id):
+    def _create_snapshot(self, cinder_client, context, volume_id):
         snapshot = cinder_client.volume_snapshots.create(volume_id, force=True)
 
         snapshot_id = snapshot.id
-        is_success = utils.status_poll(
-            partial(get_snapshot_status, cinder_client, snapshot_id),
-            interval=self._interval,
+        is_success = self._status_poll(
+            cinder_client, context, 'snapshot', snapshot_id,
             success_statuses={'available', },
             failure_statuses={'error', 'error_deleting', 'deleting',
                               'not-found'},
@@ -99,18 +180,17 @@ class ProtectOperation(protection_plugin.Operation):
 
         return snapshot_id
 
-    def _delete_snapshot(self, cinder_client, snapshot_id):
+    def _delete_snapshot(self, cinder_client, context, snapshot_id):
         LOG.info('Cleaning up snapshot (snapshot_id: %s)', snapshot_id)
         cinder_client.volume_snapshots.delete(snapshot_id)
-        return utils.status_poll(
-            partial(get_snapshot_status, cinder_client, snapshot_id),
-            interval=self._interval,
+        return self._status_poll(
+            cinder_client, context, 'snapshot', snapshot_id,
             success_statuses={'not-found', },
             failure_statuses={'error', 'error_deleting', 'creating'},
             ignore_statuses={'deleting', },
         )
 
-    def _create_backup(self, cinder_client, volume_id, backup_name,
+    def _create_backup(self, cinder_client, context, volume_id, backup_name,
                        description, snapshot_id=None, incremental=False,
                        container=None, force=False):
         backup = cinder_client.backups.create(
@@ -124,9 +204,12 @@ class ProtectOperation(protection_plugin.Operation):
         )
 
         backup_id = backup.id
-        is_success = utils.status_poll(
-            partial(get_backup_status, cinder_client, backup_id),
-            interval=self._interval,
+        eta = None
+        if self._backup_throughput:
+            volume_size = cinder_client.volumes.get(volume_id).size
+            eta = volume_size * 1024 / self._backup_throughput
+        is_success = self._status_poll(
+            cinder_client, context, 'backup', backup_id, eta=eta,
             success_statuses={'available'},
             failure_statuses={'error'},
             ignore_statuses={'creating'},
@@ -157,7 +240,8 @@ class ProtectOperation(protection_plugin.Operation):
                                    constants.RESOURCE_STATUS_PROTECTING)
         cinder_client = ClientFactory.create_client('cinder', context)
         try:
-            self.snapshot_id = self._create_snapshot(cinder_client, volume_id)
+            self.snapshot_id = self._create_snapshot(cinder_client, context,
+                                                     volume_id)
         except Exception:
             bank_section.update_object('status',
                                        constants.RESOURCE_STATUS_ERROR)
@@ -178,9 +262,8 @@ class ProtectOperation(protection_plugin.Operation):
         resource_metadata = {
             'volume_id': volume_id,
         }
-        is_success = utils.status_poll(
-            partial(get_volume_status, cinder_client, volume_id),
-            interval=self._interval,
+        is_success = self._status_poll(
+            cinder_client, context, 'volume', volume_id,
             success_statuses={'available', 'in-use', 'error_extending',
                               'error_restoring'},
             failure_statuses={'error', 'error_deleting', 'deleting',
@@ -210,7 +293,8 @@ class ProtectOperation(protection_plugin.Operation):
             incremental = False
 
         try:
-            backup_id = self._create_backup(cinder_client, volume_id,
+            backup_id = self._create_backup(cinder_client, context,
+                                            volume_id,
                                             backup_name, description,
                                             self.snapshot_id,
                                             incremental, container, force)
@@ -243,18 +327,15 @@ class ProtectOperation(protection_plugin.Operation):
 
         if self.snapshot_id:
             try:
-                self._delete_snapshot(cinder_client, self.snapshot_id)
+                self._delete_snapshot(cinder_client, context,
+                                      self.snapshot_id)
             except Exception as e:
                 LOG.warning('Failed deleting snapshot: %(snapshot_id)s. '
                             'Reason: %(reason)s',
                             {'snapshot_id': self.snapshot_id, 'reason': e})
 
 
-class RestoreOperation(protection_plugin.Operation):
-    def __init__(self, poll_interval):
-        super(RestoreOperation, self).__init__()
-        self._interval = poll_interval
-
+class RestoreOperation(CinderOperation):
     def on_main(self, checkpoint, resource, context, parameters, **kwargs):
         resource_id = resource.id
         bank_section = checkpoint.get_resource_bank_section(resource_id)
@@ -286,7 +367,8 @@ class RestoreOperation(protection_plugin.Operation):
 
         update_method(constants.RESOURCE_STATUS_RESTORING)
 
-        is_success = self._check_create_complete(cinder_client, volume_id)
+        is_success = self._check_create_complete(cinder_client, context,
+                                                 volume_id)
         if is_success:
             update_method(constants.RESOURCE_STATUS_AVAILABLE)
             kwargs.get("new_resources")[resource_id] = volume_id
@@ -301,10 +383,9 @@ class RestoreOperation(protection_plugin.Operation):
                 resource_type=resource.type
             )
 
-    def _check_create_complete(self, cinder_client, volume_id):
-        return utils.status_poll(
-            partial(get_volume_status, cinder_client, volume_id),
-            interval=self._interval,
+    def _check_create_complete(self, cinder_client, context, volume_id):
+        return self._status_poll(
+            cinder_client, context, 'volume', volume_id,
             success_statuses={'available'},
             failure_statuses={'error', 'not-found'},
             ignore_statuses={'creating', 'restoring-backup', 'downloading'},
@@ -351,11 +432,7 @@ class VerifyOperation(protection_plugin.Operation):
             )
 
 
-class DeleteOperation(protection_plugin.Operation):
-    def __init__(self, poll_interval):
-        super(DeleteOperation, self).__init__()
-        self._interval = poll_interval
-
+class DeleteOperation(CinderOperation):
     def on_main(self, checkpoint, resource, context, parameters, **kwargs):
         resource_id = resource.id
         bank_section = checkpoint.get_resource_bank_section(resource_id)
@@ -372,9 +449,8 @@ class DeleteOperation(protection_plugin.Operation):
             except cinder_exc.NotFound:
                 LOG.info('Backup id: %s not found. Assuming deleted',
                          backup_id)
-            is_success = utils.status_poll(
-                partial(get_backup_status, cinder_client, backup_id),
-                interval=self._interval,
+            is_success = self._status_poll(
+                cinder_client, context, 'backup', backup_id,
                 success_statuses={'deleted', 'not-found'},
                 failure_statuses={'error', 'error_deleting'},
                 ignore_statuses={'deleting'},
@@ -403,9 +479,16 @@ class CinderBackupProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(CinderBackupProtectionPlugin, self).__init__(config)
         self._config.register_opts(cinder_backup_opts,
                                    'cinder_backup_protection_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'cinder_backup_protection_plugin')
         self._plugin_config = self._config.cinder_backup_protection_plugin
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
         self._backup_from_snapshot = self._plugin_config.backup_from_snapshot
+        self._batch_status_poll = self._plugin_config.batch_status_poll
+        self._batch_status_poll_min_share = (
+            self._plugin_config.batch_status_poll_min_share)
+        self._backup_throughput = self._plugin_config.backup_throughput
 
     @classmethod
     def get_supported_resources_types(cls):
@@ -434,13 +517,20 @@ class CinderBackupProtectionPlugin(protection_plugin.ProtectionPlugin):
 
     def get_protect_operation(self, resource):
         return ProtectOperation(self._poll_interval,
-                                self._backup_from_snapshot)
+                                self._backup_from_snapshot,
+                                self._batch_status_poll,
+                                self._backup_throughput,
+                                self._batch_status_poll_min_share)
 
     def get_restore_operation(self, resource):
-        return RestoreOperation(self._poll_interval)
+        return RestoreOperation(self._poll_interval,
+                                self._batch_status_poll,
+                                self._batch_status_poll_min_share)
 
     def get_verify_operation(self, resource):
         return VerifyOperation()
 
     def get_delete_operation(self, resource):
-        return DeleteOperation(self._poll_interval)
+        return DeleteOperation(self._poll_interval,
+                               self._batch_status_poll,
+                               self._batch_status_poll_min_share)
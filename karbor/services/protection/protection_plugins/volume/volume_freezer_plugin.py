@@ -423,8 +423,11 @@ class FreezerProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(FreezerProtectionPlugin, self).__init__(config)
         self._config.register_opts(freezer_backup_opts,
                                    'freezer_protection_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'freezer_protection_plugin')
         self._plugin_config = self._config.freezer_protection_plugin
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
         self._scheduler_client_id = self._plugin_config.scheduler_client_id
         self._freezer_storage = FreezerStorage(
             storage_type=self._plugin_config.storage,
@@ -482,8 +482,11 @@ class VolumeGlanceProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(VolumeGlanceProtectionPlugin, self).__init__(config)
         self._config.register_opts(volume_glance_opts,
                                    'volume_glance_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'volume_glance_plugin')
         self._plugin_config = self._config.volume_glance_plugin
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
         self._backup_from_snapshot = self._plugin_config.backup_from_snapshot
         self._image_object_size = self._plugin_config.backup_image_object_size
 
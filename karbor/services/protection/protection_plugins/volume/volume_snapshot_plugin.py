@@ -21,6 +21,7 @@ from karbor.common import constants
 from karbor import exception
 from karbor.services.protection.client_factory import ClientFactory
 from karbor.services.protection import protection_plugin
+from karbor.services.protection import record_writer
 from karbor.services.protection.protection_plugins import utils
 from karbor.services.protection.protection_plugins.volume \
     import volume_snapshot_plugin_schemas as volume_schemas
@@ -201,14 +202,14 @@ class RestoreOperation(protection_plugin.Operation):
                 restore.update_resource_status(
                     constants.VOLUME_RESOURCE_TYPE,
                     volume.id, volume.status, reason)
-                restore.save()
+                record_writer.save(restore)
                 raise exception.RestoreResourceFailed(
                     name="Volume Snapshot",
                     resource_id=original_volume_id,
                     resource_type=constants.VOLUME_RESOURCE_TYPE)
             restore.update_resource_status(constants.VOLUME_RESOURCE_TYPE,
                                            volume.id, volume.status)
-            restore.save()
+            record_writer.save(restore)
         except Exception as e:
             LOG.error("Restore volume from snapshot failed, volume_id: %s",
                       original_volume_id)
@@ -316,8 +317,11 @@ class VolumeSnapshotProtectionPlugin(protection_plugin.ProtectionPlugin):
         super(VolumeSnapshotProtectionPlugin, self).__init__(config)
         self._config.register_opts(volume_snapshot_opts,
                                    'volume_snapshot_plugin')
+        self._config.register_opts(utils.status_poll_opts,
+                                   'volume_snapshot_plugin')
         self._plugin_config = self._config.volume_snapshot_plugin
-        self._poll_interval = self._plugin_config.poll_interval
+        self._poll_interval = utils.PollSchedule.from_config(
+            self._plugin_config)
 
     @classmethod
     def get_supported_resources_types(cls):
@@ -0,0 +1,124 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+
+record_writer_opts = [
+    cfg.FloatOpt('record_flush_interval',
+                 default=2,
+                 min=0,
+                 help='Seconds during which the changes of the operation '
+                      'logs, restores and verifications of the running '
+                      'flows, like the status of each restored resource, '
+                      'are gathered before being written in a single '
+                      'update. The final statuses are written at once. 0 '
+                      'writes every change immediately.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(record_writer_opts)
+
+LOG = logging.getLogger(__name__)
+
+
+class RecordWriter(object):
+    """Coalesces the saves of the records updated by the flows
+
+    Saving a restore or a verification rewrites the status of all its
+    resources, so saving it after each resource makes the writes of a
+    large restore grow with the square of its resources. The writer keeps
+    the records with pending changes and a green thread saves each of
+    them once per interval, with all the fields changed meanwhile.
+    """
+
+    def __init__(self):
+        super(RecordWriter, self).__init__()
+        # (object name, id) -> [record, number of saves requested]
+        self._pending = {}
+        self._thread = None
+
+    @staticmethod
+    def _key(record):
+        return record.obj_name(), record.id
+
+    def save(self, record, flush=False):
+        """Save the changes of record, now or with the next batch
+
+        :param flush: save the record now, along with its buffered changes,
+                      as done for its final status
+        """
+        key = self._key(record)
+        pending = self._pending.get(key)
+        if pending is not None and pending[0] is not record:
+            # Keep the changes of another copy of the row in order
+            self._flush(key)
+            pending = None
+
+        if flush or not CONF.record_flush_interval:
+            self._pending.pop(key, None)
+            record.save()
+            return
+
+        if pending is None:
+            self._pending[key] = [record, 1]
+        else:
+            pending[1] += 1
+        if self._thread is None:
+            self._thread = eventlet.spawn(self._run)
+
+    def flush(self):
+        """Save all the pending records"""
+        for key in list(self._pending):
+            self._flush(key)
+
+    def _flush(self, key):
+        pending = self._pending.get(key)
+        if pending is None:
+            return
+        record, saves = pending
+        # The flows keep changing the record while it is written, the
+        # changes made meanwhile are left to the next save
+        updates = copy.deepcopy(record.karbor_obj_get_changes())
+        try:
+            record.save(updates)
+        except Exception:
+            # The changes stay on the record and go with its next save
+            LOG.exception("Failed to save %(name)s %(id)s",
+                          {'name': key[0], 'id': key[1]})
+            self._pending.pop(key, None)
+            return
+        if self._pending.get(key) is pending and pending[1] == saves:
+            del self._pending[key]
+
+    def _run(self):
+        try:
+            while self._pending:
+                eventlet.sleep(CONF.record_flush_interval)
+                self.flush()
+        finally:
+            self._thread = None
+
+
+_WRITER = RecordWriter()
+
+
+def save(record, flush=False):
+    """Save record through the writer shared by the flows"""
+    _WRITER.save(record, flush=flush)
+
+
+def flush():
+    _WRITER.flush()
@@ -9,11 +9,12 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
-from collections import namedtuple
+import collections
 
 from karbor.common import constants
 from karbor import exception
 from karbor.services.protection import graph
+from karbor.services.protection import protection_plugin
 from oslo_log import log as logging
 
 LOG = logging.getLogger(__name__)
@@ -31,7 +32,7 @@ HOOKS = (
     'on_complete'
 )
 
-ResourceHooks = namedtuple('ResourceHooks', [
+ResourceHooks = collections.namedtuple('ResourceHooks', [
     HOOK_PRE_BEGIN,
     HOOK_PRE_FINISH,
     HOOK_MAIN,
@@ -50,6 +51,30 @@ def noop_handle(*args, **kwargs):
     pass
 
 
+class NoopHook(object):
+    """Placeholder for a hook an operation does not implement
+
+    No-op hooks only carry ordering: once the resource graph is walked they
+    are collapsed into direct links between their neighbours, and a real
+    no-op task is only created when collapsing would add more links than it
+    saves.
+    """
+
+    def __init__(self, resource, hook_type):
+        super(NoopHook, self).__init__()
+        self.resource = resource
+        self.hook_type = hook_type
+
+
+def is_hook_implemented(operation_obj, hook_type):
+    method = getattr(operation_obj, hook_type, None)
+    if method is None:
+        return False
+    # Hooks inherited from the base Operation class do nothing
+    default = getattr(protection_plugin.Operation, hook_type)
+    return getattr(method, '__func__', None) is not default
+
+
 class ResourceFlowGraphWalkerListener(graph.GraphWalkerListener):
     def __init__(self, resource_flow, operation_type, context, parameters,
                  plugins, workflow_engine):
@@ -64,6 +89,8 @@ class ResourceFlowGraphWalkerListener(graph.GraphWalkerListener):
         self.node_tasks = {}
         self.task_stack = []
         self.current_resource = None
+        self.successors = collections.OrderedDict()
+        self.predecessors = {}
 
     def _create_hook_tasks(self, operation_obj, resource):
         pre_begin_task = self._create_hook_task(operation_obj, resource,
@@ -79,11 +106,16 @@ class ResourceFlowGraphWalkerListener(graph.GraphWalkerListener):
                              post_task)
 
     def _create_hook_task(self, operation_obj, resource, hook_type):
-        method = getattr(operation_obj, hook_type, noop_handle)
+        if not is_hook_implemented(operation_obj, hook_type):
+            return NoopHook(resource, hook_type)
+
+        method = getattr(operation_obj, hook_type)
         assert callable(method), (
             'Resource {} method "{}" is not callable'
         ).format(resource.type, hook_type)
+        return self._create_task(method, resource, hook_type)
 
+    def _create_task(self, method, resource, hook_type):
         task_name = "{operation_type}_{hook_type}_{type}_{id}".format(
             type=resource.type,
             id=resource.id,
@@ -108,14 +140,61 @@ class ResourceFlowGraphWalkerListener(graph.GraphWalkerListener):
             injects['operation_log'] = self.parameters.get(
                 'operation_log')
 
-        requires = OPERATION_EXTRA_ARGS.get(self.operation_type, [])
-        requires.append('operation_log')
+        requires = OPERATION_EXTRA_ARGS.get(self.operation_type, []) + [
+            'operation_log']
         task = self.workflow_engine.create_task(method,
                                                 name=task_name,
                                                 inject=injects,
                                                 requires=requires)
         return task
 
+    def _add_node(self, node):
+        self.successors[node] = collections.OrderedDict()
+        self.predecessors[node] = collections.OrderedDict()
+
+    def _link(self, u, v):
+        self.successors[u][v] = None
+        self.predecessors[v][u] = None
+
+    def _collapse_noop_hooks(self):
+        for node in list(self.successors):
+            if not isinstance(node, NoopHook):
+                continue
+            predecessors = self.predecessors[node]
+            successors = self.successors[node]
+            links_added = len(predecessors) * len(successors)
+            if links_added > len(predecessors) + len(successors):
+                continue
+            del self.predecessors[node]
+            del self.successors[node]
+            for predecessor in predecessors:
+                del self.successors[predecessor][node]
+                for successor in successors:
+                    self._link(predecessor, successor)
+            for successor in successors:
+                del self.predecessors[successor][node]
+
+    def build_flow(self):
+        """Add the hook tasks and their links to the flow
+
+        Must be called once the resource graph has been walked.
+        """
+        self._collapse_noop_hooks()
+        tasks = {}
+        for node in self.successors:
+            if isinstance(node, NoopHook):
+                tasks[node] = self._create_task(noop_handle, node.resource,
+                                                node.hook_type)
+            else:
+                tasks[node] = node
+        LOG.debug("Adding %(tasks)d tasks to flow %(flow)s",
+                  {'tasks': len(tasks), 'flow': self.flow.name})
+        if tasks:
+            self.workflow_engine.add_tasks(self.flow, *tasks.values())
+        for u, successors in self.successors.items():
+            for v in successors:
+                self.workflow_engine.link_task(self.flow, tasks[u], tasks[v])
+
     def on_node_enter(self, node, already_visited):
         resource = node.value
         LOG.debug(
@@ -140,15 +219,11 @@ class ResourceFlowGraphWalkerListener(graph.GraphWalkerListener):
         LOG.debug("added operation %s hooks", self.operation_type)
         self.node_tasks[resource.id] = hooks
         self.task_stack.append(hooks)
-        self.workflow_engine.add_tasks(self.flow, hooks.on_prepare_begin,
-                                       hooks.on_prepare_finish, hooks.on_main,
-                                       hooks.on_complete)
-        self.workflow_engine.link_task(self.flow, hooks.on_prepare_begin,
-                                       hooks.on_prepare_finish)
-        self.workflow_engine.link_task(self.flow, hooks.on_prepare_finish,
-                                       hooks.on_main)
-        self.workflow_engine.link_task(self.flow, hooks.on_main,
-                                       hooks.on_complete)
+        for hook in hooks:
+            self._add_node(hook)
+        self._link(hooks.on_prepare_begin, hooks.on_prepare_finish)
+        self._link(hooks.on_prepare_finish, hooks.on_main)
+        self._link(hooks.on_main, hooks.on_complete)
 
     def on_node_exit(self, node):
         resource = node.value
@@ -159,24 +234,52 @@ class ResourceFlowGraphWalkerListener(graph.GraphWalkerListener):
         child_hooks = self.task_stack.pop()
         if len(self.task_stack) > 0:
             parent_hooks = self.task_stack[-1]
-            self.workflow_engine.link_task(self.flow,
-                                           parent_hooks.on_prepare_begin,
-                                           child_hooks.on_prepare_begin)
-            self.workflow_engine.link_task(self.flow,
-                                           child_hooks.on_prepare_finish,
-                                           parent_hooks.on_prepare_finish)
-            self.workflow_engine.link_task(self.flow, child_hooks.on_complete,
-                                           parent_hooks.on_complete)
+            self._link(parent_hooks.on_prepare_begin,
+                       child_hooks.on_prepare_begin)
+            self._link(child_hooks.on_prepare_finish,
+                       parent_hooks.on_prepare_finish)
+            self._link(child_hooks.on_complete, parent_hooks.on_complete)
 
 
-def build_resource_flow(operation_type, context, workflow_engine,
-                        plugins, resource_graph, parameters):
-    LOG.info("Build resource flow for operation %s", operation_type)
+def partition_graph(resource_graph):
+    """Split the source nodes of a resource graph by connected component
 
-    resource_graph_flow = workflow_engine.build_flow(
-        'ResourceGraphFlow_{}'.format(operation_type),
-        'graph',
-    )
+    Source nodes sharing a resource, directly or through other source nodes,
+    end up in the same component.
+
+    :returns: a list of components, each a list of source nodes
+    """
+    sources = list(resource_graph)
+    parents = list(range(len(sources)))
+
+    def _find(index):
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    owners = {}
+    for index, source in enumerate(sources):
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            owner = owners.get(node.value)
+            if owner is not None:
+                # The sub graph of this node was already walked
+                parents[_find(owner)] = _find(index)
+                continue
+            owners[node.value] = index
+            stack.extend(node.child_nodes)
+
+    components = {}
+    for index, source in enumerate(sources):
+        components.setdefault(_find(index), []).append(source)
+    return [components[root] for root in sorted(components)]
+
+
+def _build_graph_flow(flow_name, operation_type, context, workflow_engine,
+                      plugins, resource_graph, parameters):
+    resource_graph_flow = workflow_engine.build_flow(flow_name, 'graph')
     resource_walker = ResourceFlowGraphWalkerListener(resource_graph_flow,
                                                       operation_type,
                                                       context,
@@ -185,7 +288,37 @@ def build_resource_flow(operation_type, context, workflow_engine,
                                                       workflow_engine)
     walker = graph.GraphWalker()
     walker.register_listener(resource_walker)
-    LOG.debug("Starting resource graph walk (operation %s)", operation_type)
     walker.walk_graph(resource_graph)
-    LOG.debug("Finished resource graph walk (operation %s)", operation_type)
+    resource_walker.build_flow()
     return resource_graph_flow
+
+
+def build_resource_flow(operation_type, context, workflow_engine,
+                        plugins, resource_graph, parameters):
+    """Build the flow running the operation hooks of a resource graph
+
+    Every connected component of the graph gets its own graph flow, and the
+    component flows run side by side in an unordered flow. Validating the
+    links of a graph flow costs a copy of the whole graph, so keeping them
+    small makes building flows of plans with many resources affordable.
+    """
+    LOG.info("Build resource flow for operation %s", operation_type)
+
+    flow_name = 'ResourceGraphFlow_{}'.format(operation_type)
+    components = partition_graph(resource_graph)
+    LOG.debug("Starting resource graph walk (operation %(operation)s, "
+              "components: %(components)d)",
+              {'operation': operation_type, 'components': len(components)})
+    if len(components) <= 1:
+        resource_flow = _build_graph_flow(flow_name, operation_type, context,
+                                          workflow_engine, plugins,
+                                          resource_graph, parameters)
+    else:
+        resource_flow = workflow_engine.build_flow(flow_name, 'unordered')
+        for index, component in enumerate(components):
+            component_flow = _build_graph_flow(
+                '{}_{}'.format(flow_name, index), operation_type, context,
+                workflow_engine, plugins, component, parameters)
+            workflow_engine.add_tasks(resource_flow, component_flow)
+    LOG.debug("Finished resource graph walk (operation %s)", operation_type)
+    return resource_flow
@@ -14,7 +14,10 @@
 Test suites for 'common' code used throughout the OpenStack HTTP API.
 """
 
+import datetime
+
 import mock
+from six.moves import urllib
 from testtools import matchers
 import webob
 import webob.exc
@@ -23,6 +26,7 @@ from oslo_config import cfg
 
 from karbor.api import common
 from karbor.tests import base
+from karbor import utils
 
 
 NS = "{http://docs.openstack.org/compute/api/v1.1}"
@@ -400,6 +404,24 @@ class TestCollectionLinks(base.TestCase):
                                  should_link_exist)
 
 
+class CursorLinkTest(base.TestCase):
+    def test_next_link_cursor(self):
+        req = webob.Request.blank('/?limit=1&offset=2&sort=status:asc')
+        req.environ['karbor.context'] = mock.Mock(project_id='fake_project')
+        builder = common.ViewBuilder()
+        builder._cursor_pagination = True
+        item = {'id': 'fake_id', 'status': 'success',
+                'created_at': datetime.datetime(2017, 1, 1)}
+        links = builder._generate_next_link([item], 'id', req, 'restores')
+        query = urllib.parse.parse_qs(
+            urllib.parse.urlsplit(links[0]['href']).query)
+        self.assertNotIn('offset', query)
+        self.assertEqual({'status': 'success',
+                          'created_at': '2017-01-01T00:00:00.000000',
+                          'id': 'fake_id'},
+                         utils.decode_page_cursor(query['marker'][0]))
+
+
 class LinkPrefixTest(base.TestCase):
     def test_update_link_prefix(self):
         vb = common.ViewBuilder()
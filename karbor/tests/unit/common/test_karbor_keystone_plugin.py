@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from keystoneauth1 import access
 import mock
 
 
@@ -46,3 +47,29 @@ class KarborKeystonePluginTest(base.TestCase):
             service_type='data-protect',
             base_url='http://192.168.1.1/identity/v3'
         )
+
+    def test_get_token_info(self):
+        body = {'token': {
+            'expires_at': '2030-01-01T00:00:00.000000Z',
+            'issued_at': '2029-12-31T23:00:00.000000Z',
+            'methods': ['password'],
+            'user': {'id': 'user_id', 'name': 'user',
+                     'domain': {'id': 'default', 'name': 'Default'}},
+            'project': {'id': 'project_id', 'name': 'project',
+                        'domain': {'id': 'default', 'name': 'Default'}},
+            'roles': [{'id': 'role_id', 'name': 'member'}],
+            'catalog': [{'type': 'volumev3', 'name': 'cinder',
+                         'endpoints': []}],
+            'OS-TRUST:trust': {'id': 'trust_id'},
+        }}
+        access_info = access.create(body=body, auth_token='token')
+
+        token_info = karbor_keystone_plugin.get_token_info(access_info)
+        rebuilt = access.create(body=token_info, auth_token='token')
+        self.assertEqual(access_info.expires, rebuilt.expires)
+        self.assertEqual('user_id', rebuilt.user_id)
+        self.assertEqual('project_id', rebuilt.project_id)
+        self.assertEqual(['member'], rebuilt.role_names)
+        self.assertEqual('trust_id', rebuilt.trust_id)
+        self.assertEqual(access_info.service_catalog.catalog,
+                         rebuilt.service_catalog.catalog)
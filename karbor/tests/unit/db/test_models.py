@@ -15,14 +15,19 @@
 from datetime import datetime
 from datetime import timedelta
 from oslo_config import cfg
+from oslo_db import exception as db_exc
 from oslo_utils import uuidutils
+import mock
 import six
 import uuid
 
 from karbor import context
 from karbor import db
+from karbor.db.sqlalchemy import api as sqlalchemy_api
+from karbor.db.sqlalchemy import models
 from karbor import exception
 from karbor.tests import base
+from karbor import utils
 
 from oslo_utils import timeutils
 
@@ -123,6 +128,25 @@ class ServicesDbTestCase(base.TestCase):
         self.assertEqual('hosttest5', service_get_ref['host'])
 
 
+class IndexesDbTestCase(base.TestCase):
+    """Test cases for the indexes of the tables."""
+
+    def test_check_indexes(self):
+        ctxt = context.get_admin_context()
+        report = db.check_indexes(ctxt)
+        self.assertEqual([], report['missing'])
+        self.assertIsNone(report['unused'])
+
+    def test_check_indexes_unused_query_error(self):
+        ctxt = context.get_admin_context()
+        queries = {'sqlite': 'SELECT * FROM schema_unused_indexes'}
+        with mock.patch.dict(sqlalchemy_api._UNUSED_INDEXES_QUERIES,
+                             queries):
+            report = db.check_indexes(ctxt)
+        self.assertEqual([], report['missing'])
+        self.assertIsNone(report['unused'])
+
+
 class TriggerTestCase(base.TestCase):
     """Test cases for triggers table."""
 
@@ -179,6 +203,151 @@ class TriggerTestCase(base.TestCase):
         self.assertEqual('time', trigger_ref['type'])
 
 
+class TriggerExecutionTestCase(base.TestCase):
+    """Test cases for trigger_executions table."""
+
+    def setUp(self):
+        super(TriggerExecutionTestCase, self).setUp()
+        self.ctxt = context.get_admin_context()
+        self.now = datetime(2018, 1, 1, 12, 0, 0)
+
+    def test_trigger_execution_claim_due(self):
+        for i in range(3):
+            db.trigger_execution_create(self.ctxt, 'trigger%d' % i,
+                                        self.now - timedelta(minutes=i))
+        db.trigger_execution_create(self.ctxt, 'trigger_later',
+                                    self.now + timedelta(minutes=1))
+        next_time = self.now + timedelta(hours=1)
+
+        def _get_next_time(execution):
+            if execution.trigger_id == 'trigger0':
+                return None
+            return next_time
+
+        claimed, selected = db.trigger_execution_claim_due(
+            self.ctxt, self.now, 10, _get_next_time)
+        self.assertEqual(3, selected)
+        self.assertEqual(
+            [('trigger2', self.now - timedelta(minutes=2), next_time),
+             ('trigger1', self.now - timedelta(minutes=1), next_time),
+             ('trigger0', self.now, None)],
+            [(execution.trigger_id, execution.execution_time, next_exec)
+             for execution, next_exec in claimed])
+
+        self.assertEqual(([], 0), db.trigger_execution_claim_due(
+            self.ctxt, self.now, 10, _get_next_time))
+        claimed, _ = db.trigger_execution_claim_due(
+            self.ctxt, next_time, 10, lambda execution: None)
+        self.assertEqual({'trigger_later', 'trigger2', 'trigger1'},
+                         {execution.trigger_id for execution, _ in claimed})
+        self.assertIsNone(db.trigger_execution_get_next(self.ctxt))
+
+    def test_trigger_execution_claim_due_limit(self):
+        for i in range(3):
+            db.trigger_execution_create(self.ctxt, 'trigger%d' % i,
+                                        self.now - timedelta(minutes=i))
+        claimed, selected = db.trigger_execution_claim_due(
+            self.ctxt, self.now, 2, lambda execution: None)
+        self.assertEqual(2, selected)
+        self.assertEqual(['trigger2', 'trigger1'],
+                         [execution.trigger_id for execution, _ in claimed])
+        self.assertEqual('trigger0',
+                         db.trigger_execution_get_next(self.ctxt).trigger_id)
+
+    def test_trigger_execution_claim_due_next_time_error(self):
+        for i in range(3):
+            db.trigger_execution_create(self.ctxt, 'trigger%d' % i,
+                                        self.now - timedelta(minutes=i))
+
+        def _get_next_time(execution):
+            if execution.trigger_id == 'trigger1':
+                raise Exception()
+            return None
+
+        retry_time = self.now + timedelta(minutes=1)
+        claimed, selected = db.trigger_execution_claim_due(
+            self.ctxt, self.now, 10, _get_next_time, retry_time=retry_time)
+        self.assertEqual(3, selected)
+        self.assertEqual(['trigger2', 'trigger0'],
+                         [execution.trigger_id for execution, _ in claimed])
+        execution = db.trigger_execution_get_next(self.ctxt)
+        self.assertEqual(('trigger1', retry_time),
+                         (execution.trigger_id, execution.execution_time))
+
+    def test_trigger_execution_claim_due_next_time_error_limit(self):
+        for i in range(2):
+            db.trigger_execution_create(self.ctxt, 'trigger%d' % i,
+                                        self.now - timedelta(minutes=i))
+
+        def _get_next_time(execution):
+            if execution.trigger_id == 'trigger1':
+                raise Exception()
+            return None
+
+        retry_time = self.now + timedelta(minutes=1)
+        for expected in ([], ['trigger0']):
+            claimed, selected = db.trigger_execution_claim_due(
+                self.ctxt, self.now, 1, _get_next_time,
+                retry_time=retry_time)
+            self.assertEqual(1, selected)
+            self.assertEqual(expected, [execution.trigger_id
+                                        for execution, _ in claimed])
+
+    def test_trigger_execution_claim_due_db_error(self):
+        with mock.patch.object(sqlalchemy_api, '_supports_skip_locked',
+                               side_effect=db_exc.DBError()):
+            self.assertRaises(db_exc.DBError,
+                              db.trigger_execution_claim_due,
+                              self.ctxt, self.now, 10, lambda execution: None)
+
+    def test_supports_window_functions(self):
+        for name, version, expected in (
+                ('sqlite', (3, 24, 0), False),
+                ('sqlite', (3, 31, 1), True),
+                ('postgresql', (9, 6), True),
+                ('mysql', (5, 7, 30), False),
+                ('mysql', (8, 0, 21), True),
+                ('mysql', (10, 1, 48, 'MariaDB'), False),
+                ('mysql', (5, 5, 5, 10, 2, 44, 'MariaDB'), True)):
+            dialect = mock.Mock()
+            dialect.name = name
+            dialect.server_version_info = version
+            self.assertEqual(
+                expected, sqlalchemy_api._supports_window_functions(dialect),
+                (name, version))
+
+    def test_supports_skip_locked(self):
+        for name, version, expected in (
+                ('sqlite', (3, 31), False),
+                ('postgresql', (9, 4), False),
+                ('postgresql', (12, 2), True),
+                ('mysql', (5, 7, 30), False),
+                ('mysql', (8, 0, 21), True),
+                ('mysql', (10, 5, 9, 'MariaDB'), False),
+                ('mysql', (10, 6, 4, 'MariaDB'), True),
+                ('mysql', (5, 5, 5, 10, 6, 4, 'MariaDB'), True)):
+            session = mock.Mock()
+            session.bind.dialect.name = name
+            session.bind.dialect.server_version_info = version
+            self.assertEqual(expected,
+                             sqlalchemy_api._supports_skip_locked(session),
+                             (name, version))
+
+    def test_trigger_execution_claim_due_shards(self):
+        shards = {}
+        for i in range(10):
+            execution = db.trigger_execution_create(
+                self.ctxt, 'trigger%d' % i, self.now)
+            shards[execution.trigger_id] = execution.shard
+        owned = list(set(shards.values()))[:1]
+        claimed, _ = db.trigger_execution_claim_due(
+            self.ctxt, self.now, 10, lambda execution: None, shards=owned)
+        self.assertEqual(
+            sorted(trigger_id for trigger_id, shard in shards.items()
+                   if shard in owned),
+            sorted(execution.trigger_id for execution, _ in claimed))
+
+
 class ScheduledOperationTestCase(base.TestCase):
     """Test cases for scheduled_operations table."""
 
@@ -314,6 +483,17 @@ class ScheduledOperationStateTestCase(base.TestCase):
                           db.scheduled_operation_state_update,
                           self.ctxt, '100', {"state": "success"})
 
+    def test_scheduled_operation_state_update_all(self):
+        state_ref = self._create_scheduled_operation_state()
+        operation_id = state_ref['operation_id']
+        self.assertEqual(1, db.scheduled_operation_state_update_all(
+            self.ctxt, [operation_id, '100'], {"state": "registered"}))
+        state_ref = db.scheduled_operation_state_get(self.ctxt, operation_id)
+        self.assertEqual('registered', state_ref['state'])
+
+        self.assertEqual(0, db.scheduled_operation_state_update_all(
+            self.ctxt, ['100'], {"state": "registered"}))
+
     def test_scheduled_operation_state_get(self):
         state_ref = self._create_scheduled_operation_state()
         state_ref = db.scheduled_operation_state_get(self.ctxt,
@@ -402,6 +582,34 @@ class ScheduledOperationLogTestCase(base.TestCase):
                           db.scheduled_operation_log_get,
                           self.ctxt, log_ids[2])
 
+    def test_scheduled_operation_log_delete_all_oldest(self):
+        operation_ids = [self.operation_id,
+                         '21f8d4d5f5a24a1a8b1e4b4b6d2f4c11']
+        log_ids = {}
+        states = ['success', 'in_progress', 'success', 'success']
+        for operation_id in operation_ids:
+            self.operation_id = operation_id
+            log_ids[operation_id] = []
+            for i in range(4):
+                t = datetime.now() + timedelta(hours=i)
+                log = self._create_scheduled_operation_log(states[i], t)
+                log_ids[operation_id].append(log['id'])
+
+        with mock.patch.object(sqlalchemy_api, 'model_query',
+                               wraps=sqlalchemy_api.model_query) as query:
+            self.assertEqual(2, db.scheduled_operation_log_delete_all_oldest(
+                self.ctxt, 2, ['in_progress'], batch_size=1))
+        # One ranking query and one delete per batch
+        self.assertEqual(3, query.call_count)
+        self.assertEqual(0, db.scheduled_operation_log_delete_all_oldest(
+            self.ctxt, 2, ['in_progress']))
+        for operation_id in operation_ids:
+            self.assertRaises(exception.ScheduledOperationLogNotFound,
+                              db.scheduled_operation_log_get,
+                              self.ctxt, log_ids[operation_id][0])
+            for log_id in log_ids[operation_id][1:]:
+                db.scheduled_operation_log_get(self.ctxt, log_id)
+
     def test_scheduled_operation_log_update(self):
         log_ref = self._create_scheduled_operation_log()
         log_id = log_ref['id']
@@ -497,6 +705,181 @@ class PlanDbTestCase(ModelBaseTestCase):
         self.assertEqual("{'availability_zone': 'az1'}",
                          db_meta[0]["resource_extra_info"])
 
+    def _live_resources(self, plan_id):
+        session = sqlalchemy_api.get_session()
+        return session.query(models.Resource).filter_by(
+            plan_id=plan_id, deleted=False).all()
+
+    def test_plan_resources_update_diff(self):
+        resource1 = self.fake_plan_with_resources['resources'][0]
+        resource2 = {"id": "61e51e85-4f31-441f-9a5d-6e93e3194444",
+                     "type": "OS::Cinder::Volume",
+                     "name": "vol1"}
+        plan = db.plan_create(self.ctxt, self.fake_plan_with_resources)
+        kept_id = self._live_resources(plan['id'])[0].id
+
+        db_meta = db.plan_resources_update(self.ctxt, plan['id'],
+                                           [resource1, resource2])
+        self.assertEqual([resource1['id'], resource2['id']],
+                         [r['resource_id'] for r in db_meta])
+        resources = self._live_resources(plan['id'])
+        self.assertEqual(2, len(resources))
+        self.assertIn(kept_id, [r.id for r in resources])
+
+        db.plan_resources_update(self.ctxt, plan['id'], [resource2])
+        resources = self._live_resources(plan['id'])
+        self.assertEqual([resource2['id']],
+                         [r.resource_id for r in resources])
+        self.assertEqual([resource2['id']],
+                         [r.resource_id for r in
+                          db.plan_get(self.ctxt, plan['id']).resources])
+
+
+class NameSearchDbTestCase(ModelBaseTestCase):
+    """Unit tests for the prefix and ngram name filters."""
+
+    def setUp(self):
+        super(NameSearchDbTestCase, self).setUp()
+        self.ctxt = context.get_admin_context()
+
+    def _create_plans(self, *names):
+        return [db.plan_create(self.ctxt,
+                               dict(PlanDbTestCase.fake_plan, name=name))
+                for name in names]
+
+    def _search(self, name):
+        plans = db.plan_get_all(self.ctxt, None, None,
+                                filters={'name': name})
+        return sorted(plan.name for plan in plans)
+
+    def test_name_filter_prefix(self):
+        self.flags(name_filter_mode='prefix')
+        self._create_plans('alpha db', 'beta db', 'alphabet', 'a_c')
+        self.assertEqual(['alpha db', 'alphabet'], self._search('alpha'))
+        self.assertEqual([], self._search('db'))
+        self.assertEqual(['a_c'], self._search('a_'))
+
+    def test_name_filter_ngram(self):
+        self.flags(name_filter_mode='ngram')
+        plans = self._create_plans('alpha db', 'beta db', 'alphabet')
+        self.assertEqual(['alpha db', 'beta db'], self._search(' db'))
+        self.assertEqual(['alpha db', 'alphabet'], self._search('PHA'))
+        self.assertEqual(['alphabet'], self._search('habe'))
+        self.assertEqual([], self._search('a%b'))
+        # Too short for a trigram, matched as a prefix
+        self.assertEqual(['beta db'], self._search('be'))
+
+        db.plan_update(self.ctxt, plans[2]['id'], {'name': 'gamma db'})
+        self.assertEqual(['alpha db'], self._search('pha'))
+        db.plan_destroy(self.ctxt, plans[0]['id'])
+        self.assertEqual(['beta db', 'gamma db'], self._search(' db'))
+        self.assertEqual(
+            0, sqlalchemy_api.get_session().query(models.NameNgram).filter_by(
+                row_id=plans[0]['id']).count())
+
+    def test_name_filter_ngram_trigger(self):
+        self.flags(name_filter_mode='ngram')
+        db.trigger_create(self.ctxt, {'name': 'nightly backup',
+                                      'project_id': 'project_id',
+                                      'type': 'time',
+                                      'properties': '{}'})
+        triggers = db.trigger_get_all_by_filters_sort(
+            self.ctxt, {'name': 'backup'})
+        self.assertEqual(['nightly backup'], [t.name for t in triggers])
+
+    def test_name_ngrams_rebuild(self):
+        self._create_plans('alpha db', 'beta db')
+        self.flags(name_filter_mode='ngram')
+        self.assertEqual([], self._search(' db'))
+        rebuilt = db.name_ngrams_rebuild(self.ctxt)
+        self.assertEqual(2, rebuilt['plans'])
+        self.assertEqual(['alpha db', 'beta db'], self._search(' db'))
+
+
+class ReplicaRoutingTestCase(ModelBaseTestCase):
+    """Unit tests for the routing of the reads to the replica."""
+
+    def setUp(self):
+        super(ReplicaRoutingTestCase, self).setUp()
+        self.ctxt = context.RequestContext('fake_user', 'fake_project',
+                                           read_replica=True)
+        self.override_config('slave_connection', 'sqlite://',
+                             group='database')
+        self.override_config('replica_max_staleness', 10)
+        writes = mock.patch.dict(sqlalchemy_api._LAST_WRITES, clear=True)
+        writes.start()
+        self.addCleanup(writes.stop)
+
+    def test_use_replica(self):
+        self.assertTrue(sqlalchemy_api._use_replica(self.ctxt))
+        with mock.patch('time.time', return_value=100):
+            sqlalchemy_api._LAST_WRITES['fake_project'] = 95
+            self.assertFalse(sqlalchemy_api._use_replica(self.ctxt))
+            self.assertTrue(sqlalchemy_api._use_replica(self.ctxt,
+                                                        'other_project'))
+            sqlalchemy_api._LAST_WRITES['fake_project'] = 90
+            self.assertTrue(sqlalchemy_api._use_replica(self.ctxt))
+
+    def test_expired_writes_pruned(self):
+        pruned = mock.patch.object(sqlalchemy_api, '_LAST_WRITES_PRUNED', 0)
+        pruned.start()
+        self.addCleanup(pruned.stop)
+        with mock.patch('time.time', return_value=100):
+            sqlalchemy_api._record_write('old_project')
+        with mock.patch('time.time', return_value=105):
+            sqlalchemy_api._record_write('fake_project')
+        self.assertIn('old_project', sqlalchemy_api._LAST_WRITES)
+        with mock.patch('time.time', return_value=112):
+            sqlalchemy_api._record_write('new_project')
+        self.assertEqual({None: 112, 'fake_project': 105,
+                          'new_project': 112},
+                         sqlalchemy_api._LAST_WRITES)
+
+    def test_use_replica_without_slave_connection(self):
+        self.override_config('slave_connection', None, group='database')
+        self.assertFalse(sqlalchemy_api._use_replica(self.ctxt))
+
+    def test_use_replica_without_read_replica(self):
+        ctxt = context.RequestContext('fake_user', 'fake_project')
+        self.assertFalse(sqlalchemy_api._use_replica(ctxt))
+
+    def test_writes_recorded(self):
+        db.plan_create(self.ctxt, dict(PlanDbTestCase.fake_plan,
+                                       project_id='fake_project'))
+        self.assertFalse(sqlalchemy_api._use_replica(self.ctxt))
+        admin_ctxt = context.get_admin_context()
+        admin_ctxt.read_replica = True
+        self.assertFalse(sqlalchemy_api._use_replica(admin_ctxt))
+
+    def test_bulk_writes_recorded(self):
+        admin_ctxt = context.get_admin_context()
+        plan = db.plan_create(admin_ctxt, dict(PlanDbTestCase.fake_plan,
+                                               project_id='fake_project'))
+        sqlalchemy_api._LAST_WRITES.clear()
+        db.plan_resources_update(
+            admin_ctxt, plan['id'],
+            PlanDbTestCase.fake_plan_with_resources['resources'])
+        self.assertFalse(sqlalchemy_api._use_replica(self.ctxt))
+        self.assertTrue(sqlalchemy_api._use_replica(self.ctxt,
+                                                    'other_project'))
+
+        sqlalchemy_api._LAST_WRITES.clear()
+        db.plan_destroy(admin_ctxt, plan['id'])
+        self.assertFalse(sqlalchemy_api._use_replica(self.ctxt))
+
+    def test_replica_get_falls_back_to_primary(self):
+        def _get(ctxt, plan_id, session=None):
+            if session is not None:
+                raise exception.PlanNotFound(plan_id=plan_id)
+            return 'plan'
+
+        get_func = mock.Mock(side_effect=_get)
+        with mock.patch.object(sqlalchemy_api, 'get_session') as get_session:
+            self.assertEqual('plan', sqlalchemy_api._replica_get(
+                get_func, self.ctxt, 'fake_id'))
+        get_session.assert_called_once_with(use_slave=True)
+        self.assertEqual(2, get_func.call_count)
+
 
 class RestoreDbTestCase(ModelBaseTestCase):
     """Unit tests for karbor.db.api.restore_*."""
@@ -647,6 +1030,55 @@ class OperationLogTestCase(ModelBaseTestCase):
                           db.operation_log_update,
                           self.ctxt, 42, {})
 
+    def _create_operation_logs(self, count):
+        created_at = datetime(2017, 1, 1)
+        operation_logs = []
+        for i in range(count):
+            values = dict(self.fake_operation_log,
+                          id=uuidutils.generate_uuid(),
+                          created_at=created_at + timedelta(minutes=i % 2))
+            operation_logs.append(db.operation_log_create(self.ctxt, values))
+        return operation_logs
+
+    def _get_pages(self, marker_func, sort_keys=None, sort_dirs=None):
+        pages = []
+        marker = None
+        while True:
+            page = db.operation_log_get_all(self.ctxt, marker, 2,
+                                            sort_keys=sort_keys,
+                                            sort_dirs=sort_dirs)
+            if not page:
+                return pages
+            pages.append([operation_log.id for operation_log in page])
+            marker = marker_func(page[-1])
+
+    def test_operation_log_get_all_cursor(self):
+        self._create_operation_logs(5)
+
+        def _cursor(operation_log):
+            return utils.encode_page_cursor(
+                {key: operation_log[key]
+                 for key in ('status', 'created_at', 'id')})
+
+        by_id = self._get_pages(lambda operation_log: operation_log.id,
+                                sort_keys=['status'], sort_dirs=['asc'])
+        self.assertEqual(3, len(by_id))
+        helpers = sqlalchemy_api.PAGINATION_HELPERS
+        get_query, process_filters, __ = helpers[models.OperationLog]
+        get = mock.Mock()
+        with mock.patch.dict(helpers, {models.OperationLog: (
+                get_query, process_filters, get)}):
+            by_cursor = self._get_pages(_cursor, sort_keys=['status'],
+                                        sort_dirs=['asc'])
+        self.assertFalse(get.called)
+        self.assertEqual(by_id, by_cursor)
+
+    def test_operation_log_get_all_cursor_missing_key(self):
+        self._create_operation_logs(1)
+        cursor = utils.encode_page_cursor({'id': 'fake_id'})
+        self.assertRaises(exception.InvalidInput,
+                          db.operation_log_get_all, self.ctxt, cursor, 2)
+
 
 class CheckpointRecordTestCase(ModelBaseTestCase):
     """Unit tests for karbor.db.api.checkpoint_record_*."""
@@ -711,6 +1143,99 @@ class CheckpointRecordTestCase(ModelBaseTestCase):
                           db.checkpoint_record_update,
                           self.ctxt, 42, {})
 
+    def _record_values(self, checkpoint_id, created_at):
+        return {
+            'id': checkpoint_id,
+            'checkpoint_id': checkpoint_id,
+            'project_id': '586cc6ce-e286-40bd-b2b5-dd32694d9944',
+            'provider_id': 'fake_provider_id',
+            'plan_id': 'fake_plan_id',
+            'checkpoint_status': 'available',
+            'created_at': created_at,
+        }
+
+    def test_checkpoint_record_create_or_update(self):
+        values = self._record_values('fake_checkpoint', datetime(2026, 10, 1))
+        db.checkpoint_record_create_or_update(self.ctxt, values)
+        db.checkpoint_record_destroy(self.ctxt, 'fake_checkpoint')
+        values['checkpoint_status'] = 'error'
+        db.checkpoint_record_create_or_update(self.ctxt, values)
+        record = db.checkpoint_record_get(self.ctxt, 'fake_checkpoint')
+        self.assertEqual('error', record['checkpoint_status'])
+
+    def test_checkpoint_records_reconcile(self):
+        before = datetime(2026, 10, 10)
+        for checkpoint_id, day in (('kept', 1), ('stale', 2), ('new', 11)):
+            db.checkpoint_record_create_or_update(
+                self.ctxt, self._record_values(checkpoint_id,
+                                               datetime(2026, 10, day)))
+        result = db.checkpoint_records_reconcile(
+            self.ctxt, 'fake_provider_id',
+            [self._record_values('kept', datetime(2026, 10, 1)),
+             self._record_values('missing', datetime(2026, 10, 3))],
+            before)
+        # The unchanged 'kept' record is not written
+        self.assertEqual({'updated': 1, 'deleted': 1}, result)
+        self.assertIsNone(db.checkpoint_record_get(self.ctxt,
+                                                   'kept')['updated_at'])
+        records = db.checkpoint_record_get_all_by_filters_sort(
+            self.ctxt, {'provider_id': 'fake_provider_id',
+                        'created_at_max': before},
+            sort_keys=['created_at'], sort_dirs=['asc'])
+        self.assertEqual(['kept', 'missing'],
+                         [record['id'] for record in records])
+        self.assertEqual('new', db.checkpoint_record_get(self.ctxt,
+                                                         'new')['id'])
+
+    def test_checkpoint_records_reconcile_chunks(self):
+        before = datetime(2026, 10, 10)
+        records = []
+        for i in range(3):
+            values = self._record_values('record%d' % i,
+                                         datetime(2026, 10, 1))
+            db.checkpoint_record_create_or_update(self.ctxt, values)
+            records.append(dict(values, checkpoint_status='error'))
+        db.checkpoint_record_create_or_update(
+            self.ctxt, self._record_values('stale', datetime(2026, 10, 1)))
+
+        with mock.patch.object(sqlalchemy_api,
+                               '_CHECKPOINT_RECORD_SYNC_CHUNK', 2):
+            result = db.checkpoint_records_reconcile(
+                self.ctxt, 'fake_provider_id', records, before)
+        self.assertEqual({'updated': 3, 'deleted': 1}, result)
+        for i in range(3):
+            self.assertEqual('error', db.checkpoint_record_get(
+                self.ctxt, 'record%d' % i)['checkpoint_status'])
+
+    def test_checkpoint_records_reconcile_keeps_later_writes(self):
+        before = datetime(2026, 10, 10)
+        for checkpoint_id in ('updated', 'destroyed', 'unlisted'):
+            db.checkpoint_record_create_or_update(
+                self.ctxt, self._record_values(checkpoint_id,
+                                               datetime(2026, 10, 1)))
+        # The write-through of the checkpoints runs between the listing of
+        # the bank and the reconciliation
+        timeutils.set_time_override(datetime(2026, 10, 11))
+        self.addCleanup(timeutils.clear_time_override)
+        for checkpoint_id in ('updated', 'unlisted'):
+            values = self._record_values(checkpoint_id,
+                                         datetime(2026, 10, 1))
+            values['checkpoint_status'] = 'error'
+            db.checkpoint_record_create_or_update(self.ctxt, values)
+        db.checkpoint_record_destroy(self.ctxt, 'destroyed')
+
+        result = db.checkpoint_records_reconcile(
+            self.ctxt, 'fake_provider_id',
+            [self._record_values('updated', datetime(2026, 10, 1)),
+             self._record_values('destroyed', datetime(2026, 10, 1))],
+            before)
+        self.assertEqual({'updated': 0, 'deleted': 0}, result)
+        for checkpoint_id in ('updated', 'unlisted'):
+            record = db.checkpoint_record_get(self.ctxt, checkpoint_id)
+            self.assertEqual('error', record['checkpoint_status'])
+        self.assertRaises(exception.CheckpointRecordNotFound,
+                          db.checkpoint_record_get, self.ctxt, 'destroyed')
+
 
 class QuotaDbTestCase(ModelBaseTestCase):
     """Unit tests for karbor.db.api.quota_*."""
@@ -750,6 +1275,41 @@ class QuotaDbTestCase(ModelBaseTestCase):
         quota = db.quota_get(self.ctxt, self.project_id, self.resource)
         self.assertEqual(20, quota.hard_limit)
 
+    def _get_usages(self):
+        usages = db.quota_usage_get_all_by_project(self.ctxt,
+                                                   self.project_id)
+        usages.pop('project_id')
+        return usages
+
+    def test_quota_allocate(self):
+        quotas = {'plans': 2, 'volume_backups': -1}
+        db.quota_allocate(self.ctxt, quotas, {'plans': 2,
+                                              'volume_backups': 5},
+                          project_id=self.project_id)
+        self.assertEqual(
+            {'plans': {'in_use': 2, 'reserved': 0},
+             'volume_backups': {'in_use': 5, 'reserved': 0}},
+            self._get_usages())
+
+    def test_quota_allocate_over_quota(self):
+        quotas = {'plans': 1, 'volume_backups': 10}
+        db.quota_allocate(self.ctxt, quotas, {'plans': 1},
+                          project_id=self.project_id)
+        exc = self.assertRaises(
+            exception.OverQuota, db.quota_allocate, self.ctxt, quotas,
+            {'plans': 1, 'volume_backups': 1}, project_id=self.project_id)
+        self.assertEqual(['plans'], exc.kwargs['overs'])
+        self.assertEqual({'in_use': 1, 'reserved': 0},
+                         exc.kwargs['usages']['plans'])
+        self.assertNotIn('volume_backups', self._get_usages())
+
+    def test_quota_allocate_release(self):
+        quotas = {'plans': 0}
+        db.quota_allocate(self.ctxt, quotas, {'plans': -1},
+                          project_id=self.project_id)
+        self.assertEqual({'in_use': 0, 'reserved': 0},
+                         self._get_usages()['plans'])
+
 
 class QuotaClassDbTestCase(ModelBaseTestCase):
     """Unit tests for karbor.db.api.quota_class_*."""
@@ -16,8 +16,13 @@
 """Tests for db purge."""
 
 import datetime
+import gzip
+import os
 
+import fixtures
+import mock
 from oslo_db import exception as db_exc
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from sqlalchemy.dialects import sqlite
@@ -115,6 +120,43 @@ class PurgeDeletedTest(base.TestCase):
         self.assertEqual(2, plans_rows)
         self.assertEqual(2, resources_rows)
 
+    def test_purge_deleted_rows_batches(self):
+        self.flags(purge_batch_interval=0.25)
+        for uuidstr in self.uuidstrs[4:6]:
+            self.conn.execute(self.resources.insert().values(
+                plan_id=uuidstr,
+                deleted_at=timeutils.utcnow() - datetime.timedelta(days=60)))
+        with mock.patch.object(db_api.time, 'sleep') as sleep:
+            purged = db.purge_deleted_rows(self.context, age_in_days=30,
+                                           batch_size=1)
+        self.assertEqual(4, purged['resources'])
+        self.assertEqual(2, purged['plans'])
+        self.assertEqual(4, self.session.query(self.resources).count())
+        # One pause after each full batch
+        self.assertEqual(6, sleep.call_args_list.count(mock.call(0.25)))
+
+    def test_purge_deleted_rows_dry_run(self):
+        purged = db.purge_deleted_rows(self.context, age_in_days=10,
+                                       dry_run=True)
+        self.assertEqual(4, purged['plans'])
+        self.assertEqual(4, purged['resources'])
+        self.assertEqual(6, self.session.query(self.plans).count())
+        self.assertEqual(6, self.session.query(self.resources).count())
+
+    def test_purge_deleted_rows_archive(self):
+        archive_path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'purged.json.gz')
+        db.purge_deleted_rows(self.context, age_in_days=30,
+                              archive_path=archive_path)
+        with gzip.open(archive_path, 'rb') as archive:
+            archived = [jsonutils.loads(line) for line in archive]
+        self.assertEqual(
+            sorted([('resources', uuidstr) for uuidstr in self.uuidstrs[4:6]] +
+                   [('plans', uuidstr) for uuidstr in self.uuidstrs[4:6]]),
+            sorted((item['table'], item['row'].get('plan_id') or
+                    item['row']['id']) for item in archived))
+        self.assertEqual(4, self.session.query(self.plans).count())
+
     def test_purge_deleted_rows_bad_args(self):
         # Test with no age argument
         self.assertRaises(TypeError, db.purge_deleted_rows, self.context)
@@ -122,6 +164,10 @@ class PurgeDeletedTest(base.TestCase):
         self.assertRaises(exception.InvalidParameterValue,
                           db.purge_deleted_rows, self.context,
                           age_in_days='ten')
+        # Test purge with a zero batch size
+        self.assertRaises(exception.InvalidParameterValue,
+                          db.purge_deleted_rows, self.context,
+                          age_in_days=30, batch_size=0)
 
     def test_purge_deleted_rows_integrity_failure(self):
         dialect = self.engine.url.get_dialect()
@@ -153,5 +199,18 @@ class PurgeDeletedTest(base.TestCase):
         self.conn.execute(make_old)
 
         # Verify that purge_deleted_rows fails due to Foreign Key constraint
+        archive_path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'purged.json.gz')
         self.assertRaises(db_exc.DBReferenceError, db.purge_deleted_rows,
-                          self.context, age_in_days=10)
+                          self.context, age_in_days=10,
+                          archive_path=archive_path)
+        # The rows of the failed batch are archived before the delete and
+        # kept in the table, the next purge archives them again
+        with gzip.open(archive_path, 'rb') as archive:
+            archived = [jsonutils.loads(line) for line in archive]
+        self.assertIn(('plans', uuid_str),
+                      [(item['table'], item['row']['id'])
+                       for item in archived])
+        self.assertIn('resources', [item['table'] for item in archived])
+        self.assertEqual(1, self.session.query(self.plans).filter(
+            self.plans.c.id == uuid_str).count())
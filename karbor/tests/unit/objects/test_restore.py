@@ -51,6 +51,19 @@ class TestRestore(test_objects.BaseObjectsTestCase):
         restore_update.assert_called_once_with(self.context, restore.id,
                                                {'status': 'FAILED'})
 
+    @mock.patch('karbor.db.sqlalchemy.api.restore_update')
+    def test_save_updates(self, restore_update):
+        db_restore = fake_restore.fake_db_restore()
+        restore = objects.Restore._from_db_object(
+            self.context, objects.Restore(), db_restore)
+        restore.status = 'RUNNING'
+        updates = restore.karbor_obj_get_changes()
+        restore.status = 'SUCCESS'
+        restore.save(updates)
+        restore_update.assert_called_once_with(self.context, restore.id,
+                                               {'status': 'RUNNING'})
+        self.assertEqual({'status'}, restore.obj_what_changed())
+
     @mock.patch('karbor.db.sqlalchemy.api.restore_destroy')
     def test_destroy(self, restore_destroy):
         db_restore = fake_restore.fake_db_restore()
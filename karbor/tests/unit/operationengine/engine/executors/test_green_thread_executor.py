@@ -11,6 +11,7 @@
 #    under the License.
 
 import eventlet
+import mock
 
 from datetime import datetime
 from datetime import timedelta
@@ -18,6 +19,8 @@ from datetime import timedelta
 from karbor.common import constants
 from karbor import context
 from karbor import objects
+from karbor.services.operationengine.engine.executors import base as \
+    base_executor
 from karbor.services.operationengine.engine.executors import \
     green_thread_executor
 from karbor.tests import base
@@ -70,6 +73,65 @@ class GreenThreadExecutorTestCase(base.TestCase):
         self.assertIsNotNone(state.end_time_for_run)
         self.assertEqual(constants.OPERATION_STATE_REGISTERED, state.state)
 
+    @mock.patch.object(base_executor.utils, 'get_shard', return_value=500)
+    def test_get_dispatch_delay(self, get_shard):
+        now = datetime.utcnow()
+        self.assertEqual(0, self._executor._get_dispatch_delay(
+            self._op_id, now, 30))
+
+        self.override_config('dispatch_spread', 0.5, group='operationengine')
+        delay = self._executor._get_dispatch_delay(self._op_id, now, 30)
+        self.assertTrue(7 < delay <= 7.5)
+        self.assertEqual(0, self._executor._get_dispatch_delay(
+            self._op_id, now - timedelta(seconds=10), 30))
+
+    @mock.patch.object(green_thread_executor.GreenThreadExecutor,
+                       '_get_dispatch_delay', return_value=0.5)
+    def test_execute_operation_delayed(self, get_delay):
+        now = datetime.utcnow()
+        self._executor.execute_operation(self._op_id, now, now, 30)
+        get_delay.assert_called_once_with(self._op_id, now, 30)
+
+        eventlet.sleep(0.2)
+        self.assertIn(self._op_id, self._executor._operation_thread_map)
+        self.assertFalse(self._operation_manager._op_id)
+
+        eventlet.sleep(1)
+        self.assertEqual(self._op_id, self._operation_manager._op_id)
+        self.assertFalse(self._executor._operation_thread_map)
+
+    def test_delayed_operation_does_not_hold_slot(self):
+        self.override_config('max_concurrent_operations', 1,
+                             group='operationengine')
+        operation = self._create_operation()
+        self._create_operation_state(operation.id, 0)
+
+        now = datetime.utcnow()
+        with mock.patch.object(self._executor, '_get_dispatch_delay',
+                               side_effect=[0.5, 0]):
+            self._executor.execute_operation(self._op_id, now, now, 30)
+            self._executor.execute_operation(operation.id, now, now, 30)
+        self.assertFalse(self._executor._pending)
+        self.assertEqual(1, self._executor._num_running)
+        self.assertEqual([self._op_id], list(self._executor._delayed))
+
+        eventlet.sleep(1)
+        self.assertEqual(self._op_id, self._operation_manager._op_id)
+        self.assertFalse(self._executor._delayed)
+        self.assertFalse(self._executor._operation_thread_map)
+
+    @mock.patch.object(green_thread_executor.GreenThreadExecutor,
+                       '_get_dispatch_delay', return_value=0.5)
+    def test_cancel_delayed_operation(self, get_delay):
+        now = datetime.utcnow()
+        self._executor.execute_operation(self._op_id, now, now, 30)
+        self._executor.cancel_operation(self._op_id)
+        self.assertFalse(self._executor._delayed)
+        self.assertFalse(self._executor._operation_thread_map)
+
+        eventlet.sleep(1)
+        self.assertFalse(self._operation_manager._op_id)
+
     def test_resume_operation(self):
         now = datetime.utcnow()
         window_time = 30
@@ -104,6 +166,50 @@ class GreenThreadExecutorTestCase(base.TestCase):
 
         self.assertTrue(not self._operation_manager._op_id)
 
+    def test_execute_operation_deferred(self):
+        self.override_config('max_concurrent_operations', 1,
+                             group='operationengine')
+        operation = self._create_operation()
+        self._create_operation_state(operation.id, 0)
+        expired = self._create_operation()
+        self._create_operation_state(expired.id, 0)
+
+        now = datetime.utcnow()
+        with mock.patch.object(self._operation_manager, 'run_operation',
+                               side_effect=lambda *args, **kwargs:
+                               eventlet.sleep(0.2)) as run_operation:
+            self._executor.execute_operation(self._op_id, now, now, 30)
+            self._executor.execute_operation(operation.id, now, now, 30)
+            self._executor.execute_operation(
+                expired.id, now - timedelta(seconds=30), now, 0)
+            self.assertEqual(
+                [operation.id, expired.id],
+                [op_id for op_id, _, _ in self._executor._pending])
+            eventlet.sleep(1)
+        self.assertEqual(2, run_operation.call_count)
+        self.assertFalse(self._executor._pending)
+        self.assertFalse(self._executor._operation_thread_map)
+
+        state = objects.ScheduledOperationState.get_by_operation_id(
+            self.context, expired.id)
+        self.assertEqual(constants.OPERATION_STATE_REGISTERED, state.state)
+
+    def test_registered_states_updated_in_batch(self):
+        operation = self._create_operation()
+        self._create_operation_state(operation.id, 0)
+        now = datetime.utcnow()
+        with mock.patch.object(
+                green_thread_executor.db,
+                'scheduled_operation_state_update_all',
+                wraps=green_thread_executor.db.
+                scheduled_operation_state_update_all) as update_all:
+            self._executor.execute_operation(self._op_id, now, now, 30)
+            self._executor.execute_operation(operation.id, now, now, 30)
+            eventlet.sleep(1)
+        self.assertEqual(3, update_all.call_count)
+        self.assertEqual({self._op_id, operation.id},
+                         set(update_all.call_args[0][1]))
+
     def _create_operation(self, trigger_id='123'):
         operation_info = {
             'name': 'protect vm',
@@ -12,6 +12,7 @@
 
 from datetime import datetime
 from datetime import timedelta
+import mock
 import time
 
 from karbor.common import constants
@@ -59,6 +60,24 @@ class ThreadPoolExecutorTestCase(base.TestCase):
         self.assertIsNotNone(state.end_time_for_run)
         self.assertEqual(constants.OPERATION_STATE_REGISTERED, state.state)
 
+    @mock.patch.object(thread_pool_executor.ThreadPoolExecutor,
+                       '_get_dispatch_delay', return_value=0.5)
+    def test_execute_operation_delayed(self, get_delay):
+        operation = self._create_operation()
+        self._create_operation_state(operation.id, 0)
+
+        now = datetime.utcnow()
+        self._executor.execute_operation(operation.id, now, now, 30)
+        get_delay.assert_called_once_with(operation.id, now, 30)
+        self.assertEqual(1, self._executor._operation_to_run[operation.id])
+
+        time.sleep(1.5)
+
+        self.assertEqual(0, len(self._executor._operation_to_run))
+        state = objects.ScheduledOperationState.get_by_operation_id(
+            self.context, operation.id)
+        self.assertEqual(constants.OPERATION_STATE_REGISTERED, state.state)
+
     def test_resume_operation(self):
         operation = self._create_operation()
         self._create_operation_state(operation.id, 0)
@@ -128,6 +128,22 @@ class TriggerManagerTestCase(base.TestCase):
                           self._manager.remove_trigger,
                           trigger_id)
 
+    def test_restore_triggers(self):
+        with mock.patch.object(FakeTrigger, 'restore_triggers',
+                               wraps=FakeTrigger.restore_triggers) as r:
+            self._manager.restore_triggers(
+                [('restore1', self._trigger_type, {}),
+                 ('restore2', self._trigger_type, {})])
+        r.assert_called_once_with([('restore1', {}), ('restore2', {})],
+                                  self._executor)
+        self.assertEqual({'restore1', 'restore2'},
+                         set(self._manager._trigger_obj_map))
+
+        self.assertRaisesRegex(exception.InvalidInput,
+                               'Trigger id.* is exist',
+                               self._manager.restore_triggers,
+                               [('restore1', self._trigger_type, {})])
+
     @mock.patch.object(FakeTrigger, 'update_trigger_property')
     def test_update_trigger(self, func):
         self.assertRaises(exception.TriggerNotFound,
@@ -0,0 +1,44 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from karbor.services.operationengine.engine.triggers.timetrigger import \
+    hash_ring
+from karbor.tests import base
+
+
+class HashRingTestCase(base.TestCase):
+
+    def _get_owners(self, ring, shards=64):
+        return {shard: ring.get_node(str(shard)) for shard in range(shards)}
+
+    def test_empty_ring(self):
+        ring = hash_ring.HashRing([])
+        self.assertIsNone(ring.get_node('1'))
+        self.assertEqual([], ring.get_shards('host1', 64))
+
+    def test_shards_are_split_between_nodes(self):
+        ring = hash_ring.HashRing(['host1', 'host2', 'host3'])
+        shards = [ring.get_shards(host, 64)
+                  for host in ('host1', 'host2', 'host3')]
+        self.assertEqual(list(range(64)), sorted(sum(shards, [])))
+        for node_shards in shards:
+            self.assertGreater(len(node_shards), 0)
+
+    def test_node_leaving_only_moves_its_shards(self):
+        owners = self._get_owners(
+            hash_ring.HashRing(['host1', 'host2', 'host3']))
+        new_owners = self._get_owners(hash_ring.HashRing(['host1', 'host2']))
+        for shard, owner in owners.items():
+            if owner != 'host3':
+                self.assertEqual(owner, new_owners[shard])
+            else:
+                self.assertIn(new_owners[shard], ('host1', 'host2'))
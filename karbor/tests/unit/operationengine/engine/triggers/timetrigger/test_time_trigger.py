@@ -14,8 +14,11 @@ from datetime import timedelta
 import eventlet
 import mock
 from oslo_config import cfg
+from oslo_utils import timeutils
 
 from karbor import exception
+from karbor.services.operationengine.engine.triggers.timetrigger import \
+    time_trigger
 from karbor.services.operationengine.engine.triggers.timetrigger.time_trigger \
     import TimeTrigger
 from karbor.services.operationengine.engine.triggers.timetrigger import utils
@@ -221,11 +224,11 @@ class TimeTriggerTestCase(base.TestCase):
         }
         with mock.patch.object(FakeTimeFormat, 'compute_next_time') as c:
             c.return_value = datetime.utcnow() + timedelta(seconds=20)
-            old_id = id(trigger._greenthread)
+            old_id = id(trigger._job)
 
             trigger.update_trigger_property(trigger_property)
 
-            self.assertNotEqual(old_id, id(trigger._greenthread))
+            self.assertNotEqual(old_id, id(trigger._job))
 
     def _generate_trigger(self, end_time=None):
         if not end_time:
@@ -246,3 +249,82 @@ class TimeTriggerTestCase(base.TestCase):
         self.override_config('min_interval', min_interval)
         self.override_config('min_window_time', min_window)
         self.override_config('max_window_time', max_window)
+
+
+class TriggerSchedulerTestCase(base.TestCase):
+
+    def setUp(self):
+        super(TriggerSchedulerTestCase, self).setUp()
+        timeutils.set_time_override(datetime(2018, 1, 1, 12))
+        self.addCleanup(timeutils.clear_time_override)
+        self._scheduler = time_trigger.TriggerScheduler()
+        self._fired = []
+        self._sleeps = []
+        patcher = mock.patch.object(self._scheduler, '_sleep',
+                                    side_effect=self._sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _sleep(self, seconds):
+        # Let the fired jobs run before the time goes by
+        eventlet.sleep(0)
+        self._sleeps.append(seconds)
+        timeutils.advance_time_seconds(seconds)
+
+    def _run_scheduler(self):
+        # The sleeps of the scheduler return at once, yield until it is
+        # done and no fired job added itself back
+        for _ in range(100):
+            eventlet.sleep(0)
+            if self._scheduler._thread is None:
+                eventlet.sleep(0)
+                if self._scheduler._thread is None:
+                    return
+        self.fail('The scheduler did not run out of jobs')
+
+    def _add_job(self, name, delay):
+        def _function(expect_run_time):
+            self._fired.append((name, timeutils.utcnow()))
+
+        return time_trigger.TriggerOperationJob(
+            self._scheduler, timeutils.utcnow() + timedelta(seconds=delay),
+            _function)
+
+    def test_jobs_fire_in_time_order(self):
+        start = timeutils.utcnow()
+        self._add_job('late', 3)
+        self._add_job('early', 1)
+        self._add_job('now', 0)
+        self._run_scheduler()
+        self.assertEqual(
+            [('now', start),
+             ('early', start + timedelta(seconds=1)),
+             ('late', start + timedelta(seconds=3))],
+            self._fired)
+        self.assertEqual([1, 2], self._sleeps)
+        self.assertEqual([], self._scheduler._heap)
+
+    def test_killed_job_does_not_fire(self):
+        job = self._add_job('killed', 0)
+        self._add_job('kept', 0)
+        job.kill()
+        self._run_scheduler()
+        self.assertEqual(['kept'], [name for name, _ in self._fired])
+        self.assertFalse(job.running)
+
+    def test_job_reschedules_itself(self):
+        start = timeutils.utcnow()
+        run_times = []
+
+        def _function(expect_run_time):
+            run_times.append((expect_run_time, timeutils.utcnow()))
+            if len(run_times) < 3:
+                return expect_run_time + timedelta(seconds=1)
+
+        job = time_trigger.TriggerOperationJob(
+            self._scheduler, start, _function)
+        self._run_scheduler()
+        expected = [start + timedelta(seconds=i) for i in range(3)]
+        self.assertEqual(list(zip(expected, expected)), run_times)
+        self.assertEqual([1, 1], self._sleeps)
+        self.assertFalse(job.running)
@@ -20,6 +20,7 @@ import mock
 from oslo_config import cfg
 from oslo_utils import uuidutils
 
+from karbor.common import constants
 from karbor import context as karbor_context
 from karbor import exception
 from karbor.services.operationengine.engine.triggers.timetrigger import \
@@ -79,6 +80,10 @@ class FakeDb(object):
         element = TriggerExecution(time, uuidutils.generate_uuid(), trigger_id)
         heapq.heappush(self._db, element)
 
+    def trigger_execution_get_by_trigger_ids(self, context, trigger_ids):
+        return [element for element in self._db
+                if element.trigger_id in trigger_ids]
+
     def trigger_execution_update(self, context, id, current_time, new_time):
         for idx, element in enumerate(self._db):
             if element.id == id:
@@ -90,6 +95,23 @@ class FakeDb(object):
         heapq.heapify(self._db)
         return True
 
+    def service_get_all_by_topic(self, context, topic, disabled=None):
+        return []
+
+    def trigger_execution_claim_due(self, context, time, limit,
+                                    get_next_time, shards=None,
+                                    retry_time=None):
+        claimed = []
+        while self._db and len(claimed) < limit and (
+                self._db[0].execution_time <= time):
+            element = heapq.heappop(self._db)
+            next_time = get_next_time(element)
+            if next_time:
+                heapq.heappush(self._db, TriggerExecution(
+                    next_time, element.id, element.trigger_id))
+            claimed.append((element, next_time))
+        return claimed, len(claimed)
+
     def trigger_execution_delete(self, context, id, trigger_id):
         removed_ids = []
         for idx, element in enumerate(self._db):
@@ -256,6 +278,50 @@ class TimeTriggerTestCase(base.TestCase):
             c.return_value = datetime.utcnow() + timedelta(seconds=20)
             trigger.update_trigger_property(trigger_property)
 
+    @time_trigger_test
+    def test_get_owned_shards(self):
+        self.override_config('host', 'host1')
+        now = datetime.utcnow()
+        live = {'host': 'host2', 'updated_at': now, 'created_at': now}
+        dead = {'host': 'host3', 'updated_at': now - timedelta(hours=1),
+                'created_at': now - timedelta(hours=1)}
+        with mock.patch.object(tt.db, 'service_get_all_by_topic',
+                               return_value=[live, dead]):
+            shards = tt.TimeTrigger._get_owned_shards()
+        self.assertEqual({'host1', 'host2'}, tt.TimeTrigger._hash_ring.nodes)
+        self.assertEqual(
+            tt.TimeTrigger._hash_ring.get_shards(
+                'host1', constants.TRIGGER_EXECUTION_SHARDS),
+            shards)
+
+        self.override_config('trigger_sharding', False)
+        self.assertIsNone(tt.TimeTrigger._get_owned_shards())
+
+    def test_loop_drains_full_batches(self):
+        self.override_config('trigger_claim_batch_size', 2)
+        with mock.patch.object(tt.TimeTrigger, '_trigger_execution_claim_due',
+                               side_effect=[([], 2), ([], 1)]) as claim_due:
+            tt.TimeTrigger._loop()
+        self.assertEqual(2, claim_due.call_count)
+
+    @time_trigger_test
+    def test_restore_triggers(self):
+        trigger = self._generate_trigger()
+        trigger.shutdown()
+        trigger_property = trigger._trigger_property.copy()
+        new_trigger_id = uuidutils.generate_uuid()
+
+        with mock.patch.object(tt.db, 'trigger_execution_create') as create:
+            triggers = tt.TimeTrigger.restore_triggers(
+                [(trigger._id, trigger_property),
+                 (new_trigger_id, trigger_property)],
+                self._default_executor)
+        create.assert_called_once_with(None, new_trigger_id, mock.ANY)
+        self.assertEqual([trigger._id, new_trigger_id],
+                         [t._id for t in triggers])
+        for t in triggers:
+            t.shutdown()
+
     def _generate_trigger(self, end_time=None):
         if not end_time:
             end_time = datetime.utcnow() + timedelta(seconds=1)
@@ -10,12 +10,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
 import re
 
 from datetime import datetime
+from datetime import timedelta
 from oslo_serialization import jsonutils
 
 from karbor import exception
+from karbor.services.operationengine.engine.triggers.timetrigger import \
+    timeformats
 from karbor.services.operationengine.engine.triggers.timetrigger.timeformats \
     import calendar_time
 from karbor.tests import base
@@ -173,3 +177,32 @@ class CalendarTimeTestCase(base.TestCase):
         dtstart = datetime(2016, 2, 20, 17, 0, 0)
         time_obj = calendar_time.ICal(dtstart, pattern)
         self.assertIsNone(time_obj.get_min_interval())
+
+    def test_compute_next_time_sequence(self):
+        pattern = (
+            "BEGIN:VEVENT\n"
+            "RRULE:FREQ=HOURLY;INTERVAL=5\n"
+            "END:VEVENT"
+        )
+        dtstart = datetime(2016, 2, 20, 17, 0, 0)
+        time_obj = calendar_time.ICal(dtstart, pattern)
+        current_time = dtstart
+        for _ in range(50):
+            expected = time_obj.rrule_obj.after(current_time)
+            self.assertEqual(expected,
+                             time_obj.compute_next_time(current_time))
+            current_time = expected - timedelta(minutes=1)
+            self.assertEqual(expected,
+                             time_obj.compute_next_time(current_time))
+            current_time = expected
+
+    def test_compiled_pattern_is_shared(self):
+        pattern = "BEGIN:VEVENT\nRRULE:FREQ=DAILY\nEND:VEVENT"
+        compile_pattern = mock.Mock(wraps=calendar_time._compile_pattern)
+        patterns = timeformats.PatternCache(compile_pattern)
+        with mock.patch.object(calendar_time, '_PATTERNS', patterns):
+            calendar_time.ICal(datetime(2016, 2, 20), pattern)
+            compiled = patterns.get(pattern)
+            calendar_time.ICal(datetime(2016, 3, 20), pattern)
+            self.assertIs(compiled, patterns.get(pattern))
+        compile_pattern.assert_called_once_with(pattern)
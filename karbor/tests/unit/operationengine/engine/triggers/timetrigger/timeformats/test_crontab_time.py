@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from croniter import croniter
 from datetime import datetime
 from datetime import timedelta
 
@@ -48,3 +49,20 @@ class CrontabTimeTestCase(base.TestCase):
     def test_get_interval(self):
         obj = self._time_format(datetime.now(), "* * * * *")
         self.assertEqual(60, obj.get_min_interval())
+
+    def test_compute_next_time_sequence(self):
+        start_time = datetime(2016, 1, 20, 15, 11, 0, 0)
+        obj = self._time_format(start_time, "0 */3 * * *")
+        current_time = start_time
+        for _ in range(50):
+            expected = croniter("0 */3 * * *", current_time).get_next(
+                datetime)
+            self.assertEqual(expected, obj.compute_next_time(current_time))
+            current_time = expected
+
+    def test_compiled_pattern_is_shared(self):
+        obj1 = self._time_format(datetime.now(), "5 * * * *")
+        obj2 = self._time_format(datetime.now(), "5 * * * *")
+        obj3 = self._time_format(datetime.now(), "6 * * * *")
+        self.assertIs(obj1._next_times, obj2._next_times)
+        self.assertIsNot(obj1._next_times, obj3._next_times)
@@ -91,6 +91,25 @@ class ProtectOperationTestCase(base.TestCase):
         log = logs.objects[0]
         self.assertTrue(now, log.triggered_time)
 
+    @mock.patch.object(objects.ScheduledOperationLog, 'destroy_oldest')
+    def test_delete_oldest_operation_log(self, destroy_oldest):
+        self._operation._delete_oldest_operation_log(self._operation_db.id)
+        self.assertFalse(destroy_oldest.called)
+
+        self.override_config('operation_log_retention_interval', 0)
+        self._operation._delete_oldest_operation_log(self._operation_db.id)
+        destroy_oldest.assert_called_once_with(
+            mock.ANY, self._operation_db.id, 5)
+
+    @mock.patch.object(objects.ScheduledOperationLog, 'destroy_oldest')
+    @mock.patch.object(objects.ScheduledOperationLog,
+                       'destroy_all_oldest_supported', return_value=False)
+    def test_delete_oldest_operation_log_unsupported(self, supported,
+                                                     destroy_oldest):
+        self._operation._delete_oldest_operation_log(self._operation_db.id)
+        destroy_oldest.assert_called_once_with(
+            mock.ANY, self._operation_db.id, 5)
+
     @mock.patch.object(base_operation.Operation, '_create_karbor_client')
     def test_resume(self, client):
         log = self._create_operation_log(self._operation_db.id)
@@ -118,6 +137,42 @@ class ProtectOperationTestCase(base.TestCase):
         log1 = logs.objects[0]
         self.assertTrue(log.id, log1.id)
 
+    @mock.patch('karbor.services.protection.api.API.protect')
+    @mock.patch.object(objects.Plan, 'get_by_id')
+    def test_execute_direct_dispatch(self, get_plan, protect):
+        self.override_config('direct_protect_dispatch', True,
+                             group='operationengine')
+        ctxt = context.RequestContext(user_id='123', project_id='123',
+                                      is_admin=True)
+        self._user_trust_manager.get_context = mock.Mock(return_value=ctxt)
+        plan = {'id': '123', 'name': 'plan', 'provider_id': '123',
+                'resources': []}
+        get_plan.return_value = mock.Mock(provider_id='123', get=plan.get)
+        now = datetime.utcnow()
+        param = {
+            'operation_id': self._operation_db.id,
+            'triggered_time': now,
+            'expect_start_time': now,
+            'window_time': 30,
+            'run_type': constants.OPERATION_RUN_TYPE_EXECUTE,
+            'user_id': self._operation_db.user_id,
+            'project_id': self._operation_db.project_id
+        }
+        self._operation.run(self._operation_db.operation_definition,
+                            param=param)
+
+        protect.assert_called_once_with(ctxt, get_plan.return_value,
+                                        mock.ANY)
+        checkpoint_properties = protect.call_args[0][2]
+        self.assertEqual('123', checkpoint_properties['provider_id'])
+        self.assertEqual(constants.CHECKPOINT_STATUS_PROTECTING,
+                         checkpoint_properties['status'])
+        logs = objects.ScheduledOperationLogList.get_by_filters(
+            context.get_admin_context(),
+            {'state': constants.OPERATION_EXE_STATE_SUCCESS,
+             'operation_id': self._operation_db.id}, 1)
+        self.assertEqual(1, len(logs))
+
     def _create_operation(self):
         operation_info = {
             'name': 'protect vm',
@@ -166,6 +166,31 @@ class ProtectOperationTestCase(base.TestCase):
         log1 = logs.objects[0]
         self.assertTrue(log.id, log1.id)
 
+    def test_plan_retention(self):
+        now = datetime(2018, 1, 20)
+        checkpoints = [FakeCheckPointInstance(str(i), "2018-01-%02d" % day)
+                       for i, day in enumerate([19, 10, 5, 1])]
+        plan = self._operation._plan_retention(checkpoints, 3, 10, now)
+        self.assertEqual({retention_operation.MAX_BACKUPS: ['3'],
+                          retention_operation.RETENTION_DURATION: ['2', '3']},
+                         plan)
+        self.assertEqual({}, self._operation._plan_retention(
+            checkpoints, -1, -1, now))
+
+    def test_delete_checkpoints_isolates_failures(self):
+        client = mock.Mock()
+
+        def _delete(provider_id, checkpoint_id):
+            if checkpoint_id == '2':
+                raise exception.CheckpointNotFound(
+                    checkpoint_id=checkpoint_id)
+
+        client.checkpoints.delete.side_effect = _delete
+        failed = self._operation._delete_checkpoints(
+            client, '123', {'1', '2', '3'})
+        self.assertEqual({'2'}, failed)
+        self.assertEqual(3, client.checkpoints.delete.call_count)
+
     def _create_operation(self):
         operation_info = {
             'name': 'protect vm',
@@ -22,6 +22,7 @@ from karbor.tests import base
 
 class KarborClientTest(base.TestCase):
 
+    @mock.patch.object(karbor_client, '_karbor_endpoint', None)
     @mock.patch.object(karbor_keystone_plugin.KarborKeystonePlugin,
                        'get_service_endpoint')
     def test_create_client(self, get_service_endpoint):
@@ -39,3 +40,8 @@ class KarborClientTest(base.TestCase):
         endpoint = karbor_url.replace("$(project_id)s", ctx.project_id)
         sc = karbor_client.create(ctx)
         self.assertEqual(endpoint, sc.http_client.endpoint)
+
+        sc = karbor_client.create(ctx)
+        self.assertEqual(endpoint, sc.http_client.endpoint)
+        get_service_endpoint.assert_called_once_with(
+            mock.ANY, mock.ANY, mock.ANY, mock.ANY)
@@ -10,11 +10,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 import mock
+from oslo_config import cfg
 from oslo_messaging.rpc import dispatcher as rpc_dispatcher
+from oslo_utils import timeutils
 
 from karbor.common import constants
 from karbor import context
+from karbor import db
 from karbor import exception
 from karbor import objects
 from karbor.services.operationengine import manager as service_manager
@@ -45,6 +50,10 @@ class FakeTriggerManager(object):
     def add_trigger(self, trigger_id, trigger_type, trigger_property):
         self._trigger[trigger_id] = []
 
+    def restore_triggers(self, triggers):
+        for trigger_id, trigger_type, trigger_property in triggers:
+            self.add_trigger(trigger_id, trigger_type, trigger_property)
+
 
 class FakeUserTrustManager(object):
     def add_operation(self, context, operation_id):
@@ -88,6 +97,67 @@ class OperationEngineManagerTestCase(base.TestCase):
         self.assertIn(operation_id, trigger_manager._trigger[trigger_id])
         self.assertNotIn(op.id, trigger_manager._trigger[trigger_id])
 
+    def test_restore_in_batches(self):
+        self.override_config('restore_batch_size', 1,
+                             group='operationengine')
+        trigger = self._create_one_trigger()
+        self._create_operation_state(self._operation.id)
+        operation = self._create_scheduled_operation(trigger.id)
+        self._create_operation_state(operation.id)
+
+        self.manager._restore()
+
+        trigger_manager = self.manager._trigger_manager
+        self.assertEqual([self._operation.id],
+                         trigger_manager._trigger[self._trigger.id])
+        self.assertEqual([operation.id], trigger_manager._trigger[trigger.id])
+
+    @mock.patch.object(objects.ScheduledOperationLog, 'destroy_all_oldest')
+    def test_delete_oldest_operation_logs(self, destroy_all_oldest):
+        self.override_config('retained_operation_log_number', 3)
+        self.override_config('operation_log_retention_batch_size', 2)
+        destroy_all_oldest.return_value = 5
+
+        self.manager._delete_oldest_operation_logs(self.ctxt)
+        destroy_all_oldest.assert_called_once_with(self.ctxt, 3, batch_size=2)
+
+        # Waits for the retention interval before the next run
+        self.manager._delete_oldest_operation_logs(self.ctxt)
+        self.assertEqual(1, destroy_all_oldest.call_count)
+
+    @mock.patch.object(objects.ScheduledOperationLog, 'destroy_all_oldest')
+    @mock.patch.object(objects.ScheduledOperationLog,
+                       'destroy_all_oldest_supported', return_value=False)
+    def test_delete_oldest_operation_logs_unsupported(self, supported,
+                                                      destroy_all_oldest):
+        self.manager._delete_oldest_operation_logs(self.ctxt)
+        self.assertFalse(destroy_all_oldest.called)
+
+    @mock.patch.object(objects.ScheduledOperationLog, 'destroy_all_oldest')
+    def test_delete_oldest_operation_logs_other_node(self,
+                                                     destroy_all_oldest):
+        self.override_config('host', 'host2')
+        destroy_all_oldest.return_value = 0
+        service = db.service_create(self.ctxt, {
+            'host': 'host1', 'binary': 'karbor-operationengine',
+            'topic': cfg.CONF.operationengine_topic})
+
+        self.manager._delete_oldest_operation_logs(self.ctxt)
+        self.assertFalse(destroy_all_oldest.called)
+
+        # Taken over once the other engine is down
+        db.service_update(self.ctxt, service.id, {
+            'updated_at': timeutils.utcnow() - datetime.timedelta(days=1)})
+        self.manager._last_log_retention = None
+        self.manager._delete_oldest_operation_logs(self.ctxt)
+        self.assertTrue(destroy_all_oldest.called)
+
+    @mock.patch.object(objects.ScheduledOperationLog, 'destroy_all_oldest')
+    def test_delete_oldest_operation_logs_disabled(self, destroy_all_oldest):
+        self.override_config('operation_log_retention_interval', 0)
+        self.manager._delete_oldest_operation_logs(self.ctxt)
+        self.assertFalse(destroy_all_oldest.called)
+
     def test_create_operation(self):
         op = self._create_scheduled_operation(self._trigger.id, False)
         with mock.patch(
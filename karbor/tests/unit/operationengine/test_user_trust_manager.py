@@ -10,7 +10,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from datetime import timedelta
+
+import eventlet
 import mock
+from oslo_utils import timeutils
 
 from karbor import context
 from karbor.services.operationengine import user_trust_manager
@@ -21,9 +25,27 @@ G_TOKEN_ID = 'abcdefg'
 G_TRUST_ID = '1234556'
 
 
+class FakeAccess(object):
+    def __init__(self, auth_token, expires):
+        self.auth_token = auth_token
+        self.expires = expires
+
+
+class FakeAuth(object):
+    def __init__(self):
+        self.expires_in = 3600
+
+    def get_access(self, session):
+        return FakeAccess(G_TOKEN_ID, timeutils.utcnow(with_timezone=True) +
+                          timedelta(seconds=self.expires_in))
+
+
 class FakeSession(object):
-    def get_token(self):
-        return G_TOKEN_ID
+    def __init__(self):
+        self.auth = FakeAuth()
+
+    def invalidate(self):
+        pass
 
 
 class FakeSKP(object):
@@ -92,9 +114,91 @@ class UserTrustManagerTestCase(base.TestCase):
                                  self._project_id, G_TRUST_ID)
         self.assertEqual(1, len(info['operation_ids']))
 
+    @mock.patch.object(FakeSKP, 'create_trust_session')
+    def test_resume_operation_creates_session_on_get_token(self, create):
+        create.return_value = FakeSession()
+        manager = self._manager
+        manager.resume_operation('abc', self._user_id,
+                                 self._project_id, G_TRUST_ID)
+        create.assert_not_called()
+
+        for _ in range(2):
+            self.assertEqual(G_TOKEN_ID, manager.get_token(
+                self._user_id, self._project_id))
+        create.assert_called_once_with(G_TRUST_ID)
+
     def test_get_token(self):
         manager = self._manager
         manager.add_operation(self._ctx, 'abc')
 
         self.assertEqual(G_TOKEN_ID, manager.get_token(
             self._user_id, self._project_id))
+
+    def test_get_token_cached(self):
+        manager = self._manager
+        manager.add_operation(self._ctx, 'abc')
+        info = manager._get_user_trust_info(self._user_id, self._project_id)
+
+        with mock.patch.object(info['session'].auth, 'get_access',
+                               wraps=info['session'].auth.get_access) as get:
+            threads = [eventlet.spawn(manager.get_token, self._user_id,
+                                      self._project_id) for _ in range(10)]
+            self.assertEqual([G_TOKEN_ID] * 10,
+                             [thread.wait() for thread in threads])
+            self.assertEqual(G_TOKEN_ID, manager.get_token(
+                self._user_id, self._project_id))
+        self.assertEqual(1, get.call_count)
+
+    def test_get_token_refreshes_before_expiration(self):
+        self.override_config('token_refresh_margin', 300,
+                             group='operationengine')
+        manager = self._manager
+        manager.add_operation(self._ctx, 'abc')
+        info = manager._get_user_trust_info(self._user_id, self._project_id)
+        info['session'].auth.expires_in = 60
+        manager.get_token(self._user_id, self._project_id)
+
+        with mock.patch.object(info['session'], 'invalidate') as invalidate:
+            self.assertEqual(G_TOKEN_ID, manager.get_token(
+                self._user_id, self._project_id))
+            self.assertIsNotNone(info['refresh'])
+            info['refresh'].wait()
+        invalidate.assert_called_once_with()
+        self.assertIsNone(info['refresh'])
+
+    def test_get_token_failed(self):
+        manager = self._manager
+        manager.add_operation(self._ctx, 'abc')
+        info = manager._get_user_trust_info(self._user_id, self._project_id)
+
+        with mock.patch.object(info['session'].auth, 'get_access',
+                               side_effect=Exception()):
+            self.assertIsNone(manager.get_token(self._user_id,
+                                                self._project_id))
+        self.assertEqual(G_TOKEN_ID, manager.get_token(
+            self._user_id, self._project_id))
+
+    def test_get_context(self):
+        manager = self._manager
+        self.assertIsNone(manager.get_context(self._user_id,
+                                              self._project_id))
+        manager.add_operation(self._ctx, 'abc')
+        access = mock.Mock(auth_token=G_TOKEN_ID, user_id=self._user_id,
+                           project_id=self._project_id, project_name='demo',
+                           role_ids=['role_id'], role_names=['member'],
+                           issued=None, trust_id='trust_id',
+                           expires=timeutils.utcnow(with_timezone=True) +
+                           timedelta(hours=1))
+        access.service_catalog.catalog = []
+        info = manager._get_user_trust_info(self._user_id, self._project_id)
+        with mock.patch.object(info['session'].auth, 'get_access',
+                               return_value=access):
+            ctxt = manager.get_context(self._user_id, self._project_id)
+        self.assertEqual(self._user_id, ctxt.user_id)
+        self.assertEqual(self._project_id, ctxt.project_id)
+        self.assertEqual(G_TOKEN_ID, ctxt.auth_token)
+        self.assertEqual(['member'], ctxt.roles)
+        token_info = ctxt.auth_token_info['token']
+        self.assertEqual([{'id': 'role_id', 'name': 'member'}],
+                         token_info['roles'])
+        self.assertEqual({'id': 'trust_id'}, token_info['OS-TRUST:trust'])
@@ -31,6 +31,7 @@ from karbor.services.protection import resource_flow
 from taskflow import engines
 from taskflow.patterns import graph_flow
 from taskflow.patterns import linear_flow
+from taskflow.patterns import unordered_flow
 from taskflow import task
 
 LOG = logging.getLogger(__name__)
@@ -333,6 +334,8 @@ class FakeFlowEngine(object):
             return linear_flow.Flow(flow_name)
         elif flow_type == 'graph':
             return graph_flow.Flow(flow_name)
+        elif flow_type == 'unordered':
+            return unordered_flow.Flow(flow_name)
         else:
             LOG.error("unsupported flow type:%s", flow_type)
             return
@@ -360,6 +363,14 @@ class FakeFlowEngine(object):
             return
         flow_engine.run()
 
+    persistent = False
+
+    def list_resumable(self, host):
+        return []
+
+    def discard(self, book):
+        return
+
     def output(self, flow_engine, target=None):
         if flow_engine is None:
             LOG.error("Flow engine is None,return nothing")
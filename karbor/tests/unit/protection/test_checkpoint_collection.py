@@ -13,8 +13,12 @@
 from datetime import datetime
 import mock
 
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 
+from karbor import context
+from karbor import exception
+from karbor import objects
 from karbor.services.protection.bank_plugin import Bank
 from karbor.services.protection.checkpoint import CheckpointCollection
 from karbor.tests import base
@@ -229,3 +233,29 @@ class CheckpointCollectionTest(base.TestCase):
             checkpoint.status,
             collection.get(checkpoint_id=checkpoint.id).status,
         )
+
+    def test_checkpoint_record_mirror(self):
+        ctxt = context.get_admin_context()
+        collection = self._create_test_collection()
+        checkpoint = collection.create(fake_protection_plan())
+        record = objects.CheckpointRecord.get_by_id(ctxt, checkpoint.id)
+        self.assertEqual(checkpoint.status, record.checkpoint_status)
+        self.assertEqual(checkpoint.to_dict(),
+                         jsonutils.loads(record.extend_info))
+
+        checkpoint.status = "available"
+        checkpoint.commit()
+        record = objects.CheckpointRecord.get_by_id(ctxt, checkpoint.id)
+        self.assertEqual("available", record.checkpoint_status)
+
+        checkpoint.delete()
+        self.assertRaises(exception.CheckpointRecordNotFound,
+                          objects.CheckpointRecord.get_by_id,
+                          ctxt, checkpoint.id)
+
+    def test_list_records(self):
+        collection = self._create_test_collection()
+        plan = fake_protection_plan()
+        result = {collection.create(plan).id for i in range(3)}
+        records = collection.list_records(plan['provider_id'])
+        self.assertEqual(result, {record['id'] for record in records})
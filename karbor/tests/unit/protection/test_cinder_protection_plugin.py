@@ -18,6 +18,10 @@ from karbor import exception
 from karbor.resource import Resource
 from karbor.services.protection import bank_plugin
 from karbor.services.protection import client_factory
+from karbor.services.protection.protection_plugins.status_watcher import \
+    StatusWatcher
+from karbor.services.protection.protection_plugins.volume \
+    import cinder_protection_plugin
 from karbor.services.protection.protection_plugins.volume. \
     cinder_protection_plugin import CinderBackupProtectionPlugin
 from karbor.services.protection.protection_plugins.volume \
@@ -177,6 +181,76 @@ class CinderProtectionPluginTest(base.TestCase):
                 '789', 'available', 'creating', 2)
             call_hooks(operation, checkpoint, resource, self.cntxt, {})
 
+    @mock.patch('karbor.services.protection.clients.cinder.create')
+    def test_protect_succeed_batch_status_poll(self, mock_cinder_create):
+        plugin_config = cfg.ConfigOpts()
+        plugin_config_fixture = self.useFixture(fixture.Config(plugin_config))
+        plugin_config_fixture.load_raw_values(
+            group='cinder_backup_protection_plugin',
+            poll_interval=0,
+            batch_status_poll=True,
+        )
+        plugin = CinderBackupProtectionPlugin(plugin_config)
+        resource = Resource(
+            id="123",
+            type=constants.VOLUME_RESOURCE_TYPE,
+            name="test",
+        )
+        checkpoint = self._get_checkpoint()
+        section = checkpoint.get_resource_bank_section()
+        operation = plugin.get_protect_operation(resource)
+        section.update_object = mock.MagicMock()
+        mock_cinder_create.return_value = self.cinder_client
+        with mock.patch.multiple(
+            self.cinder_client,
+            volumes=mock.DEFAULT,
+            backups=mock.DEFAULT,
+            volume_snapshots=mock.DEFAULT,
+        ) as mocks:
+            volume = mock.Mock(id='123', status='available')
+            mocks['volumes'].list.return_value = [volume]
+            mocks['backups'].create = BackupResponse(
+                '456', 'creating', '---', 0)
+            mocks['backups'].list.side_effect = [
+                [mock.Mock(id='456', status='creating')],
+                [mock.Mock(id='456', status='available')],
+            ]
+            mocks['volume_snapshots'].create = BackupResponse(
+                '789', 'creating', '---', 0)
+            mocks['volume_snapshots'].list.side_effect = [
+                [mock.Mock(id='789', status='available')],
+                [],
+            ]
+            mocks['volume_snapshots'].get = BackupResponse(
+                '789', 'not-found', '---', 0)
+            call_hooks(operation, checkpoint, resource, self.cntxt, {})
+            mocks['volumes'].get.assert_not_called()
+            mocks['backups'].get.assert_not_called()
+            self.assertEqual(2, mocks['backups'].list.call_count)
+
+    def test_list_resource_statuses_small_batch(self):
+        watcher = StatusWatcher(('cinder', 'volume', 'project'), 1)
+        resource_manager = mock.Mock()
+        resource_manager.list.return_value = [
+            mock.Mock(id=str(i), status='available') for i in range(20)]
+        list_statuses = cinder_protection_plugin.list_resource_statuses
+
+        self.assertEqual(
+            {'1': 'available', '2': 'available'},
+            list_statuses(resource_manager, 'volume', watcher, 0.1,
+                          ['1', '2']))
+        self.assertEqual(20, watcher.listed_count)
+        self.assertEqual(
+            {}, list_statuses(resource_manager, 'volume', watcher, 0.1,
+                              ['1']))
+        self.assertEqual(1, resource_manager.list.call_count)
+        list_statuses(resource_manager, 'volume', watcher, 0.1, ['1', '2'])
+        self.assertEqual(2, resource_manager.list.call_count)
+
+        other_watcher = StatusWatcher(('cinder', 'volume', 'project'), 1)
+        list_statuses(resource_manager, 'volume', other_watcher, 0.1, ['1'])
+        self.assertEqual(3, resource_manager.list.call_count)
+
     @mock.patch('karbor.services.protection.clients.cinder.create')
     def test_protect_fail_backup(self, mock_cinder_create):
         resource = Resource(
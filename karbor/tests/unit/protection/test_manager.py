@@ -10,11 +10,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from datetime import datetime
 import mock
 
 from oslo_config import cfg
 import oslo_messaging
+from oslo_utils import timeutils
 
+from karbor import context as karbor_context
 from karbor import exception
 from karbor.resource import Resource
 from karbor.services.protection.flows import utils
@@ -136,7 +139,25 @@ class ProtectionServiceTest(base.TestCase):
     def test_protect(self, mock_provider, mock_operation_log_create,
                      mock_operation_log_update):
         mock_provider.return_value = fakes.FakeProvider()
-        self.pro_manager.protect(None, fakes.fake_protection_plan())
+        self.pro_manager.protect(karbor_context.get_admin_context(),
+                                 fakes.fake_protection_plan())
+
+    @mock.patch.object(flow_manager.Worker, 'discard_flow')
+    @mock.patch.object(manager.ProtectionManager, '_spawn')
+    @mock.patch.object(flow_manager.Worker, 'resume_flow')
+    @mock.patch.object(flow_manager.Worker, 'list_resumable_flows')
+    def test_init_host_resumes_flows(self, mock_list, mock_resume, mock_spawn,
+                                     mock_discard):
+        book1 = mock.Mock()
+        book2 = mock.Mock()
+        mock_list.return_value = [(book1, {'id': 'flow1'}),
+                                  (book2, {'id': 'flow2'})]
+        flow = mock.Mock()
+        mock_resume.side_effect = [flow, Exception()]
+        self.pro_manager.init_host()
+        mock_spawn.assert_called_once_with(self.pro_manager.worker.run_flow,
+                                           flow)
+        mock_discard.assert_called_once_with(book2)
 
     @mock.patch.object(flow_manager.Worker, 'get_flow')
     def test_protect_in_error(self, mock_flow):
@@ -200,6 +221,61 @@ class ProtectionServiceTest(base.TestCase):
             plan_id=None, start_date=None, end_date=None,
             sort_dir=None, context=context, all_tenants=False)
 
+    @mock.patch('karbor.objects.CheckpointRecordList.get_by_filters')
+    @mock.patch.object(provider.ProviderRegistry, 'show_provider')
+    def test_list_checkpoints_from_records(self, mock_provider,
+                                           mock_get_by_filters):
+        self.override_config('checkpoint_list_source', 'db')
+        fake_provider = fakes.FakeProvider()
+        fake_provider.list_checkpoints = mock.MagicMock()
+        mock_provider.return_value = fake_provider
+        mock_get_by_filters.return_value = [
+            mock.Mock(extend_info='{"id": "fake_checkpoint"}')]
+        context = mock.MagicMock(project_id='fake_project_id')
+        checkpoints = self.pro_manager.list_checkpoints(
+            context, 'provider1', limit=2, sort_dirs=['desc'], filters={
+                'plan_id': 'fake_plan_id', 'start_date': '2026-10-01',
+                'end_date': '2026-10-18', 'status': 'available'})
+        self.assertEqual([{'id': 'fake_checkpoint'}], checkpoints)
+        fake_provider.list_checkpoints.assert_not_called()
+        mock_get_by_filters.assert_called_once_with(
+            context, {'provider_id': 'provider1',
+                      'project_id': 'fake_project_id',
+                      'plan_id': 'fake_plan_id',
+                      'checkpoint_status': 'available',
+                      'created_at_min': datetime(2026, 10, 1),
+                      'created_at_max': datetime(2026, 10, 19)},
+            limit=2, marker=None, sort_keys=['created_at', 'id'],
+            sort_dirs=['desc', 'desc'])
+
+    @mock.patch('karbor.objects.ServiceList.get_all_by_topic',
+                return_value=[])
+    @mock.patch('karbor.objects.CheckpointRecord.reconcile')
+    def test_sync_checkpoint_records(self, mock_reconcile, mock_services):
+        fake_provider = mock.Mock(id='provider1')
+        fake_provider.get_checkpoint_collection.return_value.\
+            list_records.return_value = [{'id': 'fake_checkpoint'}]
+        mock_reconcile.return_value = {'updated': 1, 'deleted': 0}
+        self.pro_manager.provider_registry = mock.Mock(
+            providers={'provider1': fake_provider})
+        context = mock.MagicMock()
+        self.pro_manager._sync_checkpoint_records(context)
+        self.pro_manager._sync_checkpoint_records(context)
+        mock_reconcile.assert_called_once_with(
+            context, 'provider1', [{'id': 'fake_checkpoint'}], mock.ANY)
+
+    @mock.patch('karbor.objects.ServiceList.get_all_by_topic')
+    @mock.patch('karbor.objects.CheckpointRecord.reconcile')
+    def test_sync_checkpoint_records_other_node(self, mock_reconcile,
+                                                mock_services):
+        self.override_config('host', 'host2')
+        mock_services.return_value = [
+            {'host': 'host1', 'updated_at': timeutils.utcnow()}]
+        self.pro_manager.provider_registry = mock.Mock(
+            providers={'provider1': mock.Mock(id='provider1')})
+        self.pro_manager._sync_checkpoint_records(mock.MagicMock())
+        mock_reconcile.assert_not_called()
+
     @mock.patch.object(provider.ProviderRegistry, 'show_provider')
     def test_show_checkpoint(self, mock_provider):
         mock_provider.return_value = fakes.FakeProvider()
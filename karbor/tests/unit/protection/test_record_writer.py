@@ -0,0 +1,129 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from karbor.services.protection import record_writer
+from karbor.tests import base
+
+
+class FakeRecord(object):
+    def __init__(self, record_id='fake_id'):
+        super(FakeRecord, self).__init__()
+        self.id = record_id
+        self.changes = {}
+        self.saves = []
+
+    @staticmethod
+    def obj_name():
+        return 'Restore'
+
+    def update(self, field, value=None):
+        self.changes[field] = value
+
+    def karbor_obj_get_changes(self):
+        return dict(self.changes)
+
+    def save(self, updates=None):
+        if updates is None:
+            updates = self.karbor_obj_get_changes()
+        self.saves.append(set(updates))
+        for field, value in updates.items():
+            if self.changes.get(field) == value:
+                del self.changes[field]
+
+
+class RecordWriterTest(base.TestCase):
+    def setUp(self):
+        super(RecordWriterTest, self).setUp()
+        self.flags(record_flush_interval=2)
+        spawn = mock.patch('eventlet.spawn')
+        self.spawn = spawn.start()
+        self.addCleanup(spawn.stop)
+        self.writer = record_writer.RecordWriter()
+
+    def test_save_coalesces_changes(self):
+        record = FakeRecord()
+        record.update('status')
+        self.writer.save(record)
+        record.update('resources_status')
+        self.writer.save(record)
+        self.assertEqual([], record.saves)
+        self.spawn.assert_called_once_with(self.writer._run)
+
+        self.writer.flush()
+        self.assertEqual([{'status', 'resources_status'}], record.saves)
+        self.writer.flush()
+        self.assertEqual(1, len(record.saves))
+
+    def test_save_flush(self):
+        record = FakeRecord()
+        record.update('resources_status')
+        self.writer.save(record)
+        record.update('status')
+        self.writer.save(record, flush=True)
+        self.assertEqual([{'status', 'resources_status'}], record.saves)
+        self.writer.flush()
+        self.assertEqual(1, len(record.saves))
+
+    def test_save_without_interval(self):
+        self.flags(record_flush_interval=0)
+        record = FakeRecord()
+        record.update('status')
+        self.writer.save(record)
+        self.assertEqual([{'status'}], record.saves)
+        self.spawn.assert_not_called()
+
+    def test_save_other_copy_flushes_pending(self):
+        record = FakeRecord()
+        record.update('status')
+        self.writer.save(record)
+        copy = FakeRecord()
+        copy.update('resources_status')
+        self.writer.save(copy)
+        self.assertEqual([{'status'}], record.saves)
+        self.assertEqual([], copy.saves)
+
+        self.writer.flush()
+        self.assertEqual([{'resources_status'}], copy.saves)
+
+    def test_flush_failure_keeps_changes(self):
+        record = FakeRecord()
+        record.update('status')
+        self.writer.save(record)
+        with mock.patch.object(record, 'save', side_effect=Exception()):
+            self.writer.flush()
+        self.assertEqual({'status'}, set(record.changes))
+
+        record.update('resources_status')
+        self.writer.save(record, flush=True)
+        self.assertEqual([{'status', 'resources_status'}], record.saves)
+
+    def test_flush_keeps_changes_made_while_saving(self):
+        record = FakeRecord()
+        record.update('resources_status', {'volume': 'restoring'})
+        self.writer.save(record)
+        save = record.save
+
+        def _save(updates):
+            record.changes['resources_status']['volume'] = 'available'
+            self.writer.save(record)
+            save(updates)
+
+        with mock.patch.object(record, 'save', side_effect=_save):
+            self.writer.flush()
+        self.assertEqual({'resources_status': {'volume': 'available'}},
+                         record.changes)
+        self.writer.flush()
+        self.assertEqual([{'resources_status'}, {'resources_status'}],
+                         record.saves)
+        self.assertEqual({}, record.changes)
@@ -17,6 +17,7 @@ from karbor.common import constants
 from karbor.resource import Resource
 from karbor.services.protection.flows.workflow import TaskFlowEngine
 from karbor.services.protection import graph
+from karbor.services.protection import protection_plugin
 from karbor.services.protection import resource_flow
 from karbor.tests import base
 from karbor.tests.unit.protection import fakes
@@ -33,6 +34,8 @@ CONF = cfg.CONF
 parent = Resource(id='A1', name='parent', type=parent_type)
 child = Resource(id='B1', name='child', type=child_type)
 grandchild = Resource(id='C1', name='grandchild', type=grandchild_type)
+other_parent = Resource(id='A2', name='other_parent', type=parent_type)
+other_child = Resource(id='B2', name='other_child', type=child_type)
 
 
 class ResourceFlowTest(base.TestCase):
@@ -50,6 +53,17 @@ class ResourceFlowTest(base.TestCase):
                                             self.resource_graph.__getitem__)
         self.taskflow_engine = TaskFlowEngine()
 
+    def _build_other_graph(self):
+        resource_graph = {
+            parent: [child],
+            child: [grandchild],
+            grandchild: [],
+            other_parent: [other_child],
+            other_child: [],
+        }
+        return graph.build_graph([parent, other_parent],
+                                 resource_graph.__getitem__)
+
     def _walk_operation(self, protection, operation_type,
                         checkpoint='checkpoint', parameters={}, context=None,
                         **kwargs):
@@ -222,3 +236,83 @@ class ResourceFlowTest(base.TestCase):
                             order_list.index(('main', resource_id)))
             self.assertLess(order_list.index(('main', resource_id)),
                             order_list.index(('complete', resource_id)))
+
+    def test_partition_graph(self):
+        resource_graph = {
+            parent: [child],
+            child: [grandchild],
+            grandchild: [],
+            other_parent: [other_child],
+            other_child: [grandchild],
+        }
+        test_graph = graph.build_graph([parent, other_parent],
+                                       resource_graph.__getitem__)
+        components = resource_flow.partition_graph(test_graph)
+        self.assertEqual(1, len(components))
+        self.assertEqual([parent, other_parent],
+                         [node.value for node in components[0]])
+
+        components = resource_flow.partition_graph(self._build_other_graph())
+        self.assertEqual([[parent], [other_parent]],
+                         [[node.value for node in component]
+                          for component in components])
+
+    @mock.patch('karbor.tests.unit.protection.fakes.FakeProtectionPlugin')
+    def test_resource_flow_components(self, mock_protection):
+        operation = constants.OPERATION_PROTECT
+        mock_operation = fakes.MockOperation()
+        mock_protection.get_protect_operation.return_value = mock_operation
+        self.test_graph = self._build_other_graph()
+
+        self._walk_operation(mock_protection, operation)
+
+        for hook_name in resource_flow.HOOKS:
+            self.assertEqual(5, getattr(mock_operation, hook_name).call_count)
+
+    def test_resource_flow_skips_noop_hooks(self):
+        order_list = []
+
+        class MainOnlyOperation(protection_plugin.Operation):
+            def on_main(self, checkpoint, resource, context, parameters,
+                        **kwargs):
+                order_list.append(('main', resource.id))
+
+        class EdgeHooksOperation(protection_plugin.Operation):
+            def on_prepare_begin(self, checkpoint, resource, context,
+                                 parameters, **kwargs):
+                order_list.append(('pre_begin', resource.id))
+
+            def on_complete(self, checkpoint, resource, context, parameters,
+                            **kwargs):
+                order_list.append(('complete', resource.id))
+
+        for operation_cls, tasks_count in ((MainOnlyOperation, 3),
+                                           (EdgeHooksOperation, 6)):
+            protection = mock.Mock()
+            protection.get_protect_operation.return_value = operation_cls()
+            plugin_map = {
+                parent_type: protection,
+                child_type: protection,
+                grandchild_type: protection,
+            }
+            flow = resource_flow.build_resource_flow(
+                constants.OPERATION_PROTECT, None, self.taskflow_engine,
+                plugin_map, self.test_graph, {})
+            self.assertEqual(tasks_count, len(flow))
+
+            engine = self.taskflow_engine.get_engine(
+                flow, engine='parallel', store={'checkpoint': 'checkpoint',
+                                                'operation_log': None})
+            self.taskflow_engine.run_engine(engine)
+
+        self.assertLess(order_list.index(('pre_begin', parent.id)),
+                        order_list.index(('pre_begin', child.id)))
+        self.assertLess(order_list.index(('pre_begin', child.id)),
+                        order_list.index(('pre_begin', grandchild.id)))
+        self.assertGreater(order_list.index(('complete', parent.id)),
+                           order_list.index(('complete', child.id)))
+        self.assertGreater(order_list.index(('complete', child.id)),
+                           order_list.index(('complete', grandchild.id)))
+        for resource_id in (parent.id, child.id, grandchild.id):
+            self.assertLess(order_list.index(('pre_begin', resource_id)),
+                            order_list.index(('complete', resource_id)))
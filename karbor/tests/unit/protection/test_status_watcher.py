@@ -0,0 +1,146 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+import mock
+
+from karbor.services.protection.protection_plugins.status_watcher import \
+    StatusWatcher
+from karbor.services.protection.protection_plugins import utils
+from karbor.tests import base
+
+
+class FakeStatuses(object):
+    def __init__(self, statuses):
+        super(FakeStatuses, self).__init__()
+        self.statuses = statuses
+        self.calls = []
+
+    def __call__(self, resource_ids):
+        self.calls.append(sorted(resource_ids))
+        result = {}
+        for resource_id in resource_ids:
+            if self.statuses[resource_id]:
+                result[resource_id] = self.statuses[resource_id].pop(0)
+        return result
+
+
+class StatusWatcherTest(base.TestCase):
+    def setUp(self):
+        super(StatusWatcherTest, self).setUp()
+        self.watcher = StatusWatcher.get_watcher('fake_key', 0)
+
+    def _watch(self, resource_id, list_func, get_status_func=None):
+        return eventlet.spawn(
+            self.watcher.watch, resource_id, list_func,
+            get_status_func or mock.Mock(return_value='not-found'),
+            success_statuses={'available'},
+            failure_statuses={'error', 'not-found'},
+            ignore_statuses={'creating'})
+
+    def test_get_watcher_shares_watchers(self):
+        self.assertIs(self.watcher, StatusWatcher.get_watcher('fake_key', 0))
+        self.assertIsNot(self.watcher,
+                         StatusWatcher.get_watcher('other_key', 0))
+
+    def test_watch_batches_resources(self):
+        list_func = FakeStatuses({
+            'vol1': ['creating', 'available'],
+            'vol2': ['creating', 'creating', 'error'],
+        })
+        thread1 = self._watch('vol1', list_func)
+        thread2 = self._watch('vol2', list_func)
+        self.assertTrue(thread1.wait())
+        self.assertFalse(thread2.wait())
+        self.assertEqual([['vol1', 'vol2'], ['vol1', 'vol2'], ['vol2']],
+                         list_func.calls)
+        self.assertNotIn('fake_key', StatusWatcher._watchers)
+
+    def test_watch_falls_back_to_get_status(self):
+        list_func = FakeStatuses({'vol1': []})
+        get_status_func = mock.Mock(return_value='available')
+        thread = self._watch('vol1', list_func, get_status_func)
+        self.assertTrue(thread.wait())
+        get_status_func.assert_called_once_with()
+
+    def test_watch_raises_get_status_error(self):
+        list_func = mock.Mock(side_effect=Exception('list failed'))
+        get_status_func = mock.Mock(side_effect=ValueError())
+        thread = self._watch('vol1', list_func, get_status_func)
+        self.assertRaises(ValueError, thread.wait)
+
+    def test_watch_skips_resources_before_eta(self):
+        list_func = FakeStatuses({'vol1': ['available'],
+                                  'vol2': ['available']})
+        thread1 = self._watch('vol1', list_func)
+        thread2 = eventlet.spawn(
+            self.watcher.watch, 'vol2', list_func, mock.Mock(), eta=0.05,
+            success_statuses={'available'})
+        self.assertTrue(thread1.wait())
+        self.assertTrue(thread2.wait())
+        self.assertEqual(['vol1'], list_func.calls[0])
+        self.assertEqual(['vol2'], list_func.calls[-1])
+
+    def test_backoff_interval(self):
+        watcher = StatusWatcher('backoff_key', utils.PollSchedule(
+            1, max_interval=3, backoff_factor=2))
+        with mock.patch.object(watcher, '_poll', return_value=False):
+            watcher._waiters = {'vol1': [mock.Mock()]}
+            intervals = []
+
+            def _sleep(interval):
+                intervals.append(interval)
+                if len(intervals) == 4:
+                    watcher._waiters = {}
+
+            with mock.patch('eventlet.sleep', side_effect=_sleep):
+                watcher._run()
+        self.assertEqual([1, 2, 3, 3], intervals)
+
+
+class PollScheduleTest(base.TestCase):
+    def _intervals(self, schedule, count, eta=None):
+        intervals = schedule.intervals(eta)
+        return [next(intervals) for _ in range(count)]
+
+    def test_fixed_interval(self):
+        self.assertEqual([15, 15, 15],
+                         self._intervals(utils.PollSchedule(15), 3))
+
+    def test_backoff(self):
+        schedule = utils.PollSchedule(15, initial_interval=2,
+                                      max_interval=20, backoff_factor=3)
+        self.assertEqual([2, 6, 18, 20, 20], self._intervals(schedule, 5))
+
+    def test_eta(self):
+        schedule = utils.PollSchedule(15, initial_interval=2,
+                                      max_interval=20, backoff_factor=2)
+        self.assertEqual([600, 2, 4], self._intervals(schedule, 3, eta=600))
+        self.assertEqual([2, 4], self._intervals(schedule, 2, eta=1))
+
+    def test_jitter(self):
+        schedule = utils.PollSchedule(10, jitter=0.5)
+        for interval in self._intervals(schedule, 20):
+            self.assertTrue(5 <= interval <= 15)
+
+    def test_status_poll_follows_schedule(self):
+        get_status_func = mock.Mock(side_effect=['creating', 'creating',
+                                                 'available'])
+        schedule = utils.PollSchedule(0)
+        with mock.patch.object(schedule, 'intervals',
+                               return_value=iter([0, 0, 0])) as intervals:
+            self.assertTrue(utils.status_poll(
+                get_status_func, schedule, eta=5,
+                success_statuses={'available'},
+                ignore_statuses={'creating'}))
+        intervals.assert_called_once_with(5)
+        self.assertEqual(3, get_status_func.call_count)
@@ -10,9 +10,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+from oslo_config import cfg
+from taskflow import task
+
+from karbor import context
+from karbor.services.protection.flows import utils
 from karbor.services.protection.flows import workflow
 from karbor.tests import base
 
+CONF = cfg.CONF
+
 
 def fake_func():
     return True
@@ -33,6 +41,13 @@ class WorkFlowTest(base.TestCase):
         self.workflow_engine.add_tasks(test_flow, test_task)
         self.assertEqual(1, len(test_flow))
 
+    def test_build_flow_types(self):
+        for flow_type in ('linear', 'graph', 'unordered'):
+            flow = self.workflow_engine.build_flow('test', flow_type)
+            self.assertEqual('test', flow.name)
+        self.assertRaises(ValueError, self.workflow_engine.build_flow,
+                          'test', 'unknown')
+
     def test_search_task(self):
         flow = self.workflow_engine.build_flow('test')
         task1 = self.workflow_engine.create_task(fake_func, name='fake_func')
@@ -40,3 +55,147 @@ class WorkFlowTest(base.TestCase):
         self.workflow_engine.add_tasks(flow, task1, task2)
         result = self.workflow_engine.search_task(flow, 'fake_func2')
         self.assertEqual('fake_func2', getattr(result, 'name'))
+
+
+class RecordTask(task.Task):
+    def execute(self, calls):
+        calls.append(self.name)
+
+
+class NewResourceTask(task.Task):
+    def execute(self, calls, new_resources):
+        calls.append(dict(new_resources))
+        new_resources[self.name] = 'new_' + self.name
+
+
+class PersistentWorkFlowTest(base.TestCase):
+    def setUp(self):
+        super(PersistentWorkFlowTest, self).setUp()
+        self.override_config('flow_persistence_connection', 'memory://')
+        self.workflow_engine = workflow.TaskFlowEngine()
+
+    def _build_flow(self):
+        flow = self.workflow_engine.build_flow('test', 'linear')
+        self.workflow_engine.add_tasks(flow, RecordTask('task1'),
+                                       RecordTask('task2'))
+        return flow
+
+    def test_finished_flow_is_discarded(self):
+        calls = []
+        engine = self.workflow_engine.get_engine(
+            self._build_flow(), store={'calls': calls},
+            resume_info={'id': 'fake'})
+        self.workflow_engine.run_engine(engine)
+        self.assertEqual(['task1', 'task2'], calls)
+        self.assertEqual([], self.workflow_engine.list_resumable(CONF.host))
+
+    def test_resume_flow(self):
+        calls = []
+        engine = self.workflow_engine.get_engine(
+            self._build_flow(), store={'calls': calls},
+            resume_info={'id': 'fake'})
+
+        def _suspend(state, details):
+            if details['task_name'] == 'task1' and state == 'SUCCESS':
+                engine.suspend()
+
+        engine.atom_notifier.register('*', _suspend)
+        self.workflow_engine.run_engine(engine)
+        self.assertEqual(['task1'], calls)
+
+        self.assertEqual([], self.workflow_engine.list_resumable('other'))
+        resumable = self.workflow_engine.list_resumable(CONF.host)
+        self.assertEqual(1, len(resumable))
+        book, resume_info = resumable[0]
+        self.assertEqual({'id': 'fake'}, resume_info)
+
+        calls = []
+        engine = self.workflow_engine.get_engine(
+            self._build_flow(), store={'calls': calls}, book=book)
+        self.workflow_engine.run_engine(engine)
+        self.assertEqual(['task2'], calls)
+        self.assertEqual([], self.workflow_engine.list_resumable(CONF.host))
+
+    def test_flow_without_resume_info_is_not_persisted(self):
+        calls = []
+        engine = self.workflow_engine.get_engine(
+            self._build_flow(), store={'calls': calls})
+        self.assertIsNone(getattr(engine, 'book', None))
+        self.workflow_engine.run_engine(engine)
+        self.assertEqual(['task1', 'task2'], calls)
+
+    def test_resume_flow_restores_persisted_values(self):
+        def _build_flow():
+            flow = self.workflow_engine.build_flow('test', 'linear')
+            self.workflow_engine.add_tasks(flow, NewResourceTask('task1'),
+                                           NewResourceTask('task2'))
+            return flow
+
+        engine = self.workflow_engine.get_engine(
+            _build_flow(), store={'calls': [], 'new_resources': {}},
+            resume_info={'id': 'fake'}, persist=['new_resources'])
+
+        def _suspend(state, details):
+            if details['task_name'] == 'task1' and state == 'SUCCESS':
+                engine.suspend()
+
+        engine.atom_notifier.register('*', _suspend)
+        self.workflow_engine.run_engine(engine)
+
+        book, resume_info = self.workflow_engine.list_resumable(CONF.host)[0]
+        calls = []
+        new_resources = {}
+        engine = self.workflow_engine.get_engine(
+            _build_flow(),
+            store={'calls': calls, 'new_resources': new_resources},
+            book=book, persist=['new_resources'])
+        self.workflow_engine.run_engine(engine)
+        self.assertEqual([{'task1': 'new_task1'}], calls)
+        self.assertEqual({'task1': 'new_task1', 'task2': 'new_task2'},
+                         new_resources)
+
+
+class ResumeContextTest(base.TestCase):
+    def setUp(self):
+        super(ResumeContextTest, self).setUp()
+        self.workflow_engine = mock.Mock(persistent=True)
+
+    @mock.patch('karbor.common.karbor_keystone_plugin.KarborKeystonePlugin')
+    def test_get_resume_info_creates_trust(self, mock_plugin):
+        mock_plugin.return_value.create_trust_to_karbor.return_value = 'trust'
+        ctxt = context.RequestContext(user_id='user', project_id='project',
+                                      auth_token='secret')
+        resume_info = utils.get_resume_info(ctxt, self.workflow_engine,
+                                            restore_id='restore')
+        self.assertEqual({
+            'restore_id': 'restore',
+            'context': {'user_id': 'user', 'project_id': 'project',
+                        'trust_id': 'trust', 'trust_created': True},
+        }, resume_info)
+
+        utils.delete_resume_context(resume_info)
+        delete_trust = mock_plugin.return_value.delete_trust_to_karbor
+        delete_trust.assert_called_once_with('trust')
+
+    @mock.patch('karbor.common.karbor_keystone_plugin.KarborKeystonePlugin')
+    def test_get_resume_info_reuses_context_trust(self, mock_plugin):
+        ctxt = context.RequestContext(
+            user_id='user', project_id='project', auth_token='secret',
+            auth_token_info={'token': {'OS-TRUST:trust': {'id': 'trust'}}})
+        resume_info = utils.get_resume_info(ctxt, self.workflow_engine)
+        self.assertEqual({'user_id': 'user', 'project_id': 'project',
+                          'trust_id': 'trust', 'trust_created': False},
+                         resume_info['context'])
+        mock_plugin.return_value.create_trust_to_karbor.assert_not_called()
+
+        utils.delete_resume_context(resume_info)
+        mock_plugin.return_value.delete_trust_to_karbor.assert_not_called()
+
+    @mock.patch('karbor.common.karbor_keystone_plugin.KarborKeystonePlugin')
+    def test_get_resume_info_without_trust(self, mock_plugin):
+        mock_plugin.return_value.create_trust_to_karbor.side_effect = (
+            Exception())
+        ctxt = context.RequestContext(user_id='user', project_id='project')
+        self.assertIsNone(utils.get_resume_info(ctxt, self.workflow_engine))
+        self.workflow_engine.persistent = False
+        self.assertIsNone(utils.get_resume_info(ctxt, self.workflow_engine))
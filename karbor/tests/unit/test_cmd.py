@@ -18,6 +18,7 @@ except ImportError:
     import mock
 from oslo_config import cfg
 from oslo_db import exception as db_exc
+import six
 
 from karbor.cmd import api as karbor_api
 from karbor.cmd import manage as karbor_manage
@@ -84,3 +85,33 @@ class TestKarborManageCmd(base.TestCase):
         db_cmds = karbor_manage.DbCommands()
         exit = self.assertRaises(SystemExit, db_cmds.sync, 101)
         self.assertEqual(1, exit.code)
+
+    @mock.patch('karbor.db.purge_deleted_rows')
+    def test_db_commands_purge(self, purge_deleted_rows):
+        purge_deleted_rows.return_value = {'plans': 2, 'resources': 3}
+        db_cmds = karbor_manage.DbCommands()
+        with mock.patch('sys.stdout', new=six.StringIO()) as fake_out:
+            db_cmds.purge(30, batch_size=10, dry_run=True)
+        purge_deleted_rows.assert_called_once_with(
+            mock.ANY, 30, batch_size=10, dry_run=True, archive_path=None)
+        self.assertEqual('plans: 2 rows would be purged\n'
+                         'resources: 3 rows would be purged\n',
+                         fake_out.getvalue())
+
+    def test_db_commands_purge_bad_batch_size(self):
+        db_cmds = karbor_manage.DbCommands()
+        exit = self.assertRaises(SystemExit, db_cmds.purge, 30, batch_size=0)
+        self.assertEqual(1, exit.code)
+
+    @mock.patch('karbor.db.check_indexes')
+    def test_db_commands_check_indexes(self, check_indexes):
+        check_indexes.return_value = {'missing': [], 'unused': None}
+        db_cmds = karbor_manage.DbCommands()
+        db_cmds.check_indexes()
+
+        check_indexes.return_value = {
+            'missing': [('restores', 'ix_restores_project_id_created_at',
+                         ('project_id', 'created_at'))],
+            'unused': []}
+        exit = self.assertRaises(SystemExit, db_cmds.check_indexes)
+        self.assertEqual(1, exit.code)
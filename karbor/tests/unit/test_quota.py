@@ -0,0 +1,67 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from karbor import context
+from karbor import db
+from karbor import exception
+from karbor import quota
+from karbor.tests import base
+
+
+class QuotaEngineTestCase(base.TestCase):
+
+    def setUp(self):
+        super(QuotaEngineTestCase, self).setUp()
+        self.ctxt = context.get_admin_context()
+        self.project_id = "586cc6ce-e286-40bd-b2b5-dd32694d9944"
+        self.quotas = quota.QuotaEngine(quota.DbQuotaDriver())
+        self.quotas.register_resources(quota.resources)
+
+    def _in_use(self):
+        usages = db.quota_usage_get_all_by_project(self.ctxt,
+                                                   self.project_id)
+        return usages['plans']['in_use']
+
+    def test_allocate_and_release(self):
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=2)
+        self.assertEqual(2, self._in_use())
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=-1)
+        self.assertEqual(1, self._in_use())
+
+    def test_allocate_over_quota(self):
+        db.quota_create(self.ctxt, self.project_id, 'plans', 1)
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=1)
+        self.assertRaises(exception.OverQuota, self.quotas.allocate,
+                          self.ctxt, project_id=self.project_id, plans=1)
+        self.assertEqual(1, self._in_use())
+
+    def test_limits_cached_until_invalidated(self):
+        self.flags(quota_limit_cache_ttl=60)
+        db.quota_create(self.ctxt, self.project_id, 'plans', 1)
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=1)
+
+        db.quota_update(self.ctxt, self.project_id, 'plans', 2)
+        self.assertRaises(exception.OverQuota, self.quotas.allocate,
+                          self.ctxt, project_id=self.project_id, plans=1)
+
+        self.quotas.invalidate_limits(self.project_id)
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=1)
+        self.assertEqual(2, self._in_use())
+
+    def test_limits_not_cached(self):
+        self.flags(quota_limit_cache_ttl=0)
+        db.quota_create(self.ctxt, self.project_id, 'plans', 1)
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=1)
+
+        db.quota_update(self.ctxt, self.project_id, 'plans', 2)
+        self.quotas.allocate(self.ctxt, project_id=self.project_id, plans=1)
+        self.assertEqual(2, self._in_use())
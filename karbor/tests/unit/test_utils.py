@@ -10,6 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
+from oslo_utils import uuidutils
+
 from karbor.tests import base
 
 from karbor import utils
@@ -40,3 +44,22 @@ class WalkClassHierarchyTestCase(base.TestCase):
         class_pairs = zip((D, B, C, E), utils.walk_class_hierarchy(A))
         for actual, expected in class_pairs:
             self.assertEqual(expected, actual)
+
+
+class PageCursorTestCase(base.TestCase):
+    def test_encode_decode(self):
+        created_at = datetime.datetime(2017, 5, 4, 3, 2, 1, 123)
+        cursor = utils.encode_page_cursor({'created_at': created_at,
+                                           'id': 'fake_id',
+                                           'status': None})
+        self.assertNotIn('=', cursor)
+        self.assertEqual({'created_at': '2017-05-04T03:02:01.000123',
+                          'id': 'fake_id',
+                          'status': None},
+                         utils.decode_page_cursor(cursor))
+
+    def test_decode_item_id(self):
+        self.assertIsNone(
+            utils.decode_page_cursor(uuidutils.generate_uuid()))
+        self.assertIsNone(utils.decode_page_cursor('not a cursor'))
+        self.assertIsNone(utils.decode_page_cursor(None))
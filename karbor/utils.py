@@ -12,7 +12,10 @@
 
 """Utilities and helper functions."""
 import ast
+import base64
 import contextlib
+import datetime
+import hashlib
 import os
 import shutil
 import six
@@ -22,9 +25,11 @@ import webob.exc
 from keystoneclient import discover as ks_discover
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 from oslo_utils import importutils
 from oslo_utils import strutils
 from oslo_utils import timeutils
+from oslo_utils import uuidutils
 
 from karbor import exception
 from karbor.i18n import _
@@ -33,6 +38,8 @@ from stevedore import driver
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+PAGE_CURSOR_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
 
 def find_config(config_path):
     """Find a configuration file using the given hint.
@@ -65,6 +72,58 @@ def service_is_up(service):
     return abs(elapsed) <= CONF.service_down_time
 
 
+def is_elected_host(services, host):
+    """Elect a single service of a topic to run a cluster-wide task
+
+    The live service with the lowest host name among services is elected,
+    host, the one of the calling service, is always a candidate.
+    """
+    hosts = {service['host'] for service in services
+             if service_is_up(service)}
+    hosts.add(host)
+    return min(hosts) == host
+
+
+def get_shard(key, shards):
+    """Map key to one of shards buckets, the same in every process."""
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+    return int(digest, 16) % shards
+
+
+def encode_page_cursor(values):
+    """Encode the sort key values of the last item of a page.
+
+    The returned token is accepted as the marker of the next page, which
+    then starts right after these values without loading the marker row.
+
+    :param values: dict of the sort keys and their values
+    """
+    primitive = {}
+    for key, value in values.items():
+        if isinstance(value, datetime.datetime):
+            value = timeutils.normalize_time(value).strftime(
+                PAGE_CURSOR_TIME_FORMAT)
+        primitive[key] = value
+    cursor = base64.urlsafe_b64encode(jsonutils.dump_as_bytes(primitive))
+    return cursor.decode('ascii').rstrip('=')
+
+
+def decode_page_cursor(marker):
+    """Return the values encoded in marker, or None if it is an item id.
+
+    Datetime values are returned as strings in PAGE_CURSOR_TIME_FORMAT.
+    """
+    if not marker or uuidutils.is_uuid_like(marker):
+        return None
+    try:
+        padded = marker + '=' * (-len(marker) % 4)
+        values = jsonutils.loads(
+            base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (TypeError, ValueError):
+        return None
+    return values if isinstance(values, dict) else None
+
+
 def remove_invalid_filter_options(context, filters,
                                   allowed_search_options):
     """Remove search options that are not valid for non-admin API/context."""